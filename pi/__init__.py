@@ -17,7 +17,24 @@ from .conversions import (
     validate_sensor_range
 )
 from .sensors import AquaponicsSensors, create_sensors_from_env
-from .logger import DataLogger, load_data_from_file, save_data_to_file, append_reading_to_file
+from .async_sensors import AsyncAquaponicsSensors
+from .logger import (
+    DataLogger,
+    load_data_from_file,
+    save_data_to_file,
+    append_reading_to_file,
+    export_data_file,
+    GroupCommitLogger,
+    SqliteDataLogger
+)
+from .storage import JsonArrayStore, JsonLinesStore, SegmentStore, create_store
+from .index import TimestampIndex
+from .timeseries import TimeSeries
+from .columnar import ColumnarStore
+from .sqlite_store import SqliteStore
+from .journal import JournaledStore
+from .rollup import TieredRetention
+from .materialized import MaterializedRollups
 
 __version__ = "1.0.0"
 __author__ = "Aquaponics Monitoring System"
@@ -41,10 +58,27 @@ __all__ = [
     # High-level sensor interface
     "AquaponicsSensors",
     "create_sensors_from_env",
+    "AsyncAquaponicsSensors",
     
     # Data management
     "DataLogger",
     "load_data_from_file",
     "save_data_to_file", 
     "append_reading_to_file",
+    "export_data_file",
+    "GroupCommitLogger",
+    "SqliteDataLogger",
+    
+    # Storage backends
+    "JsonArrayStore",
+    "JsonLinesStore",
+    "SegmentStore",
+    "ColumnarStore",
+    "SqliteStore",
+    "JournaledStore",
+    "TieredRetention",
+    "MaterializedRollups",
+    "create_store",
+    "TimestampIndex",
+    "TimeSeries",
 ]
\ No newline at end of file
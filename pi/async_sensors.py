@@ -0,0 +1,191 @@
+"""
+Asynchronous Sensor Interface
+=============================
+
+asyncio counterpart to AquaponicsSensors, so one event loop can drive
+several tanks' sensors, an HTTP server and a publisher concurrently:
+
+    async with AsyncAquaponicsSensors(create_sensors_from_env()) as sensors:
+        reading = await sensors.read_all()
+
+Blocking HAL calls run on a small thread pool, and every read is bounded
+by a timeout, so a stalled I2C or 1-Wire read yields None instead of
+freezing the loop. The stalled call itself cannot be interrupted and keeps
+its worker until the bus returns; a stalled ADC read also keeps the ADC
+busy until then, so no other read starts on the same I2C bus.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Callable
+
+try:
+    from .sensors import AquaponicsSensors
+except ImportError:
+    # Handle running as script
+    from sensors import AquaponicsSensors
+
+# Seconds a single sensor read may take before it is abandoned
+READ_TIMEOUT = 5.0
+
+# Worker threads per sensor interface: one for the ADC, one for 1-Wire
+MAX_WORKERS = 2
+
+
+class AsyncAquaponicsSensors:
+    """Awaitable sensor readings on top of AquaponicsSensors."""
+    
+    def __init__(self, sensors: Optional[AquaponicsSensors] = None,
+                 timeout: float = READ_TIMEOUT, max_workers: int = MAX_WORKERS):
+        """Initialize async sensor interface.
+        
+        Args:
+            sensors: Synchronous sensor interface to wrap
+                (default: AquaponicsSensors with default settings)
+            timeout: Seconds each read may take before returning None
+            max_workers: Threads running blocking HAL calls
+        """
+        if timeout <= 0:
+            raise ValueError(f"timeout must be positive, got {timeout}")
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        
+        self.sensors = sensors if sensors is not None else AquaponicsSensors()
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="sensor-read")
+        self._adc_lock: Optional[asyncio.Lock] = None
+        
+        # Seconds spent in each stage of the last read_all()
+        self.last_timings: Dict[str, float] = {}
+    
+    async def __aenter__(self) -> "AsyncAquaponicsSensors":
+        return self
+    
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Release the worker threads without waiting for stalled reads."""
+        self.executor.shutdown(wait=False)
+    
+    def _submit(self, read: Callable[..., Any], *args) -> "asyncio.Future":
+        """Start a blocking read on the executor."""
+        return asyncio.get_running_loop().run_in_executor(self.executor, read, *args)
+    
+    async def _wait(self, name: str, future: "asyncio.Future") -> Any:
+        """Wait for a started read, bounded by the timeout.
+        
+        The read is left running if it times out.
+        
+        Returns:
+            The read's result, or None if it timed out
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            print(f"Error reading {name} sensor: timed out after {self.timeout:g}s")
+            return None
+    
+    async def _run(self, name: str, read: Callable[..., Any], *args) -> Any:
+        """Run a blocking read on the executor, bounded by the timeout.
+        
+        Returns:
+            The read's result, or None if it timed out
+        """
+        return await self._wait(name, self._submit(read, *args))
+    
+    async def _run_adc(self, name: str, read: Callable[..., Any], *args) -> Any:
+        """Run an ADC read, one at a time as the channels share the I2C bus.
+        
+        The ADC stays locked until the worker returns, not just until the
+        read times out, so a stalled read is never joined on the bus.
+        """
+        if self._adc_lock is None:
+            # Created here so it binds to the running loop
+            self._adc_lock = asyncio.Lock()
+        lock = self._adc_lock
+        
+        await lock.acquire()
+        try:
+            future = self._submit(read, *args)
+        except BaseException:
+            lock.release()
+            raise
+        future.add_done_callback(lambda _: lock.release())
+        return await self._wait(name, future)
+    
+    async def read_ph(self) -> Optional[float]:
+        """Read pH value from sensor.
+        
+        Returns:
+            pH value (0.0-14.0), or None if reading failed or timed out
+        """
+        return await self._run_adc("pH", self.sensors.read_ph)
+    
+    async def read_temperature(self) -> Optional[float]:
+        """Read water temperature from DS18B20 sensor.
+        
+        Returns:
+            Temperature in Celsius, or None if reading failed or timed out
+        """
+        return await self._run("temperature", self.sensors.read_temperature)
+    
+    async def read_tds(self, temp_c: Optional[float] = None) -> Optional[float]:
+        """Read TDS value from sensor with temperature compensation.
+        
+        Args:
+            temp_c: Water temperature for compensation. If None, the
+                temperature is read concurrently with the TDS channel.
+        
+        Returns:
+            TDS in ppm, or None if reading failed or timed out
+        """
+        if temp_c is not None:
+            voltage = await self._run_adc("TDS", self.sensors.read_tds_voltage)
+        else:
+            voltage, temp_c = await asyncio.gather(
+                self._run_adc("TDS", self.sensors.read_tds_voltage),
+                self.read_temperature())
+        return self.sensors.compensate_tds(voltage, temp_c)
+    
+    async def read_all(self) -> Dict[str, Any]:
+        """Read all sensors and return as structured data.
+        
+        As in AquaponicsSensors.read_all, the temperature conversion
+        overlaps the ADC reads and TDS compensation waits for it.
+        
+        Returns:
+            Dictionary with timestamp and sensor readings
+        """
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        
+        temp_task = asyncio.ensure_future(_timed(timings, "temperature", self.read_temperature()))
+        ph = await _timed(timings, "ph", self.read_ph())
+        tds_voltage = await _timed(timings, "tds",
+                                   self._run_adc("TDS", self.sensors.read_tds_voltage))
+        temp_c = await _timed(timings, "temperature_wait", temp_task)
+        
+        tds = self.sensors.compensate_tds(tds_voltage, temp_c)
+        timings["total"] = time.perf_counter() - start
+        self.last_timings = timings
+        
+        # Create reading with UTC timestamp
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "ph": ph,
+            "tds": tds,
+            "temp_c": temp_c
+        }
+
+
+async def _timed(timings: Dict[str, float], stage: str, read) -> Any:
+    """Await read and record how long it took under timings[stage]."""
+    start = time.perf_counter()
+    try:
+        return await read
+    finally:
+        timings[stage] = time.perf_counter() - start
@@ -12,6 +12,8 @@ and calls OpenAI to generate insights and recommendations.
 Environment Variables:
 - OPENAI_API_KEY (required) - OpenAI API key 
 - OPENAI_MODEL=gpt-4o-mini - Model to use (default: gpt-4o-mini)
+- DATA_FORMAT=json - Storage format used by sensor_logger.py
+- JOURNAL=0 - If "1", include readings still in sensor_logger.py's journal
 
 Usage:
   python3 coach.py
@@ -32,15 +34,32 @@ except ImportError:
     print("Error: requests library not available. Install with: pip install requests")
     sys.exit(1)
 
+try:
+    from .logger import DataLogger
+    from .storage import METRICS
+    from .timeseries import TimeSeries
+except ImportError:
+    # Handle running as script
+    from logger import DataLogger
+    from storage import METRICS
+    from timeseries import TimeSeries
+
 # Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
 
+DATA_FORMAT = os.getenv("DATA_FORMAT", "json")
+JOURNAL = os.getenv("JOURNAL", "0") == "1"
+
 # File paths
-DATA_FILE = Path(__file__).parent.parent / "data.json"
+DATA_JSON = Path(__file__).parent.parent / "data.json"
+DATA_FILE = DATA_JSON if DATA_FORMAT == "json" else DATA_JSON.with_suffix(f".{DATA_FORMAT}")
 COACH_FILE = Path(__file__).parent.parent / "coach.json"
 
+# Longest window analyzed; older readings are never loaded
+ANALYSIS_DAYS = 30
+
 # Target ranges for coaching
 TARGETS = {
     "ph": {"min": 6.6, "max": 7.2, "ideal": 6.9},
@@ -49,72 +68,103 @@ TARGETS = {
 }
 
 
-def load_sensor_data():
-    """Load and parse sensor data from data.json.
+def open_data_logger():
+    """Return the DataLogger of sensor_logger.py's data file."""
+    return DataLogger(DATA_FILE, storage_format=DATA_FORMAT, journal=JOURNAL)
+
+
+def load_sensor_data(data_logger=None):
+    """Load and parse the last 30 days of sensor data from data.json.
+    
+    Streams readings through DataLogger straight into a columnar
+    TimeSeries, so only the analysis window is held in memory and each
+    reading costs a few dozen bytes; readings with malformed timestamps
+    are skipped. Only the medians need these raw values.
+    
+    Args:
+        data_logger (DataLogger): Logger to read (default: open_data_logger())
     
     Returns:
-        list: Array of reading dicts with parsed timestamps
+        TimeSeries: Readings in time order (empty on error)
     """
-    if not DATA_FILE.exists():
+    data_logger = data_logger or open_data_logger()
+    if not data_logger.store.exists():
         print(f"Warning: {DATA_FILE} not found")
-        return []
+        return TimeSeries()
     
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        if not isinstance(data, list):
-            print("Warning: data.json should contain an array")
-            return []
-        
-        # Parse timestamps and filter valid entries
-        parsed_data = []
-        for entry in data:
-            try:
-                if isinstance(entry, dict) and "timestamp" in entry:
-                    timestamp_str = entry["timestamp"]
-                    timestamp = datetime.fromisoformat(timestamp_str.rstrip('Z'))
-                    
-                    parsed_entry = {
-                        "timestamp": timestamp,
-                        "ph": entry.get("ph"),
-                        "tds": entry.get("tds"), 
-                        "temp_c": entry.get("temp_c")
-                    }
-                    parsed_data.append(parsed_entry)
-            except Exception as e:
-                print(f"Warning: Skipping malformed entry: {e}")
-                continue
-        
-        print(f"Loaded {len(parsed_data)} valid readings")
-        return parsed_data
+        since = datetime.now(timezone.utc) - timedelta(days=ANALYSIS_DAYS)
+        series = data_logger.load_series(since)
+        print(f"Loaded {len(series)} valid readings")
+        return series
         
     except Exception as e:
         print(f"Error loading sensor data: {e}")
-        return []
+        return TimeSeries()
 
 
-def compute_stats(data, metric):
+def window_aggregates(data_logger, since):
+    """Aggregate each metric over the readings since a time.
+    
+    Served by DataLogger.aggregate, the query behind summaries.json, as
+    daily buckets merged into one.
+    
+    Args:
+        data_logger (DataLogger): Logger of the data to analyze
+        since (datetime): Start of the window
+    
+    Returns:
+        dict: Metric -> {"count", "min", "max", "mean"} for metrics with values
+    """
+    merged = {}
+    for record in data_logger.aggregate(since, bucket="1d"):
+        for metric in METRICS:
+            day = record[metric]
+            if day is None:
+                continue
+            acc = merged.setdefault(metric, {"count": 0, "total": 0.0,
+                                             "min": day["min"], "max": day["max"]})
+            acc["count"] += day["count"]
+            acc["total"] += day["mean"] * day["count"]
+            acc["min"] = min(acc["min"], day["min"])
+            acc["max"] = max(acc["max"], day["max"])
+    
+    return {
+        metric: {"count": acc["count"], "min": acc["min"], "max": acc["max"],
+                 "mean": acc["total"] / acc["count"]}
+        for metric, acc in merged.items()
+    }
+
+
+def compute_stats(data, metric, aggregates=None):
     """Compute statistics for a metric, ignoring None values.
     
     Args:
-        data (list): Array of readings
+        data (TimeSeries or list): Readings
         metric (str): Metric name ('ph', 'tds', 'temp_c')
+        aggregates (dict): Optional count/min/max/mean of the metric from
+            window_aggregates; only the median is then computed from data
         
     Returns:
         dict: Statistics (count, min, max, avg, median) or None if no data
     """
-    values = [entry[metric] for entry in data if entry[metric] is not None]
+    if isinstance(data, TimeSeries):
+        values = list(data.values(metric))
+    else:
+        values = [entry[metric] for entry in data if entry[metric] is not None]
     
     if not values:
         return None
     
     try:
+        if aggregates is None:
+            aggregates = {"count": len(values), "min": min(values), "max": max(values),
+                          "mean": statistics.mean(values)}
         return {
-            "count": len(values),
-            "min": round(min(values), 2),
-            "max": round(max(values), 2), 
-            "avg": round(statistics.mean(values), 2),
+            "count": aggregates["count"],
+            "min": round(aggregates["min"], 2),
+            "max": round(aggregates["max"], 2), 
+            "avg": round(aggregates["mean"], 2),
             "median": round(statistics.median(values), 2)
         }
     except Exception as e:
@@ -122,40 +172,48 @@ def compute_stats(data, metric):
         return None
 
 
-def analyze_data(data):
+def analyze_data(data, data_logger=None):
     """Analyze sensor data and compute summary statistics.
     
     Args:
-        data (list): Array of readings with parsed timestamps
+        data (TimeSeries or list): Readings
+        data_logger (DataLogger): If given, count/min/max/mean come from
+            its aggregate query and only medians from data
         
     Returns:
         dict: Analysis results with 7-day and 30-day stats
     """
     now = datetime.now(timezone.utc)
     cutoff_7d = now - timedelta(days=7)
-    cutoff_30d = now - timedelta(days=30)
+    cutoff_30d = now - timedelta(days=ANALYSIS_DAYS)
     
-    # Filter data by time periods
-    data_7d = [entry for entry in data if entry["timestamp"] >= cutoff_7d]
-    data_30d = [entry for entry in data if entry["timestamp"] >= cutoff_30d]
+    # Filter data by time periods (bisected slices share the series' arrays)
+    series = data if isinstance(data, TimeSeries) else TimeSeries.from_readings(data)
+    data_7d = series.slice(cutoff_7d)
+    data_30d = series.slice(cutoff_30d)
     
     print(f"Analyzing {len(data_7d)} readings from last 7 days")
     print(f"Analyzing {len(data_30d)} readings from last 30 days")
     
+    aggregates_7d = aggregates_30d = {}
+    if data_logger is not None:
+        aggregates_7d = window_aggregates(data_logger, cutoff_7d)
+        aggregates_30d = window_aggregates(data_logger, cutoff_30d)
+    
     analysis = {
         "last_7_days": {
             "period": "7 days",
             "count": len(data_7d),
-            "ph": compute_stats(data_7d, "ph"),
-            "tds": compute_stats(data_7d, "tds"),
-            "temp": compute_stats(data_7d, "temp_c")
+            "ph": compute_stats(data_7d, "ph", aggregates_7d.get("ph")),
+            "tds": compute_stats(data_7d, "tds", aggregates_7d.get("tds")),
+            "temp": compute_stats(data_7d, "temp_c", aggregates_7d.get("temp_c"))
         },
         "last_30_days": {
             "period": "30 days", 
             "count": len(data_30d),
-            "ph": compute_stats(data_30d, "ph"),
-            "tds": compute_stats(data_30d, "tds"),
-            "temp": compute_stats(data_30d, "temp_c")
+            "ph": compute_stats(data_30d, "ph", aggregates_30d.get("ph")),
+            "tds": compute_stats(data_30d, "tds", aggregates_30d.get("tds")),
+            "temp": compute_stats(data_30d, "temp_c", aggregates_30d.get("temp_c"))
         },
         "targets": TARGETS
     }
@@ -349,12 +407,13 @@ def main():
     print("=" * 40)
     
     # Load and analyze sensor data
-    data = load_sensor_data()
+    data_logger = open_data_logger()
+    data = load_sensor_data(data_logger)
     if not data:
         print("Error: No sensor data available for analysis")
         sys.exit(1)
     
-    analysis = analyze_data(data)
+    analysis = analyze_data(data, data_logger)
     
     # Build prompt and call OpenAI
     prompt = build_coaching_prompt(analysis)
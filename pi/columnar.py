@@ -0,0 +1,379 @@
+"""
+Memory-Mapped Columnar Storage
+==============================
+
+Fixed-width binary store for high-rate sampling. Each column lives in its
+own file inside the store directory:
+
+    timestamp.i64   int64 epoch microseconds, sorted ascending
+    ph.f32          float32, NaN for null
+    tds.f32         float32, NaN for null
+    temp_c.f32      float32, NaN for null
+
+Columns are read through mmap, so opening a large history allocates no
+Python objects until rows are sliced out. Files use the native byte order
+(little-endian on the Raspberry Pi).
+"""
+
+import math
+import mmap
+import os
+import shutil
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator
+
+try:
+    from .index import bound_epoch_us, to_epoch_us, from_epoch_us
+    from .storage import METRICS, count_written
+except ImportError:
+    # Handle running as script
+    from index import bound_epoch_us, to_epoch_us, from_epoch_us
+    from storage import METRICS, count_written
+
+TIMESTAMP_FILE = "timestamp.i64"
+TIMESTAMP_WIDTH = 8
+VALUE_WIDTH = 4
+
+# Rows converted to Python objects at a time when iterating
+ITER_BATCH_ROWS = 4096
+
+
+def _to_value(value: float) -> Optional[float]:
+    """Convert a stored float32 back to a reading value (None for NaN).
+    
+    Values are rounded to 6 significant digits, the precision float32
+    actually holds, so 6.8 reads back as 6.8 rather than 6.800000190734863.
+    """
+    if math.isnan(value):
+        return None
+    return float(f"{value:.6g}")
+
+
+class ColumnSlice:
+    """Zero-copy views over a time range of a columnar store.
+    
+    Use as a context manager; the memoryviews in ``columns`` are only
+    valid until it exits.
+    """
+    
+    def __init__(self, store: 'ColumnarStore', start=None, end=None):
+        """Map the store's columns and bisect to [start, end).
+        
+        Args:
+            store: Store to read
+            start: Inclusive lower bound, or None for no bound
+            end: Exclusive upper bound, or None for no bound
+        """
+        self._maps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
+        
+        rows = store.row_count()
+        timestamps = self._map(store.path / TIMESTAMP_FILE, rows * TIMESTAMP_WIDTH, 'q')
+        lo = 0 if start is None else bisect_left(timestamps, bound_epoch_us(start))
+        hi = rows if end is None else bisect_left(timestamps, bound_epoch_us(end))
+        hi = max(lo, hi)
+        
+        self.timestamps = self._slice(timestamps, lo, hi)
+        self.columns: Dict[str, memoryview] = {
+            metric: self._slice(self._map(store.column_path(metric), rows * VALUE_WIDTH, 'f'), lo, hi)
+            for metric in METRICS
+        }
+        self.lo = lo
+        self.hi = hi
+    
+    def _map(self, path: Path, length: int, fmt: str) -> memoryview:
+        if length == 0:
+            base = memoryview(b'')
+        else:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            base = memoryview(mapped)
+        view = base.cast(fmt)
+        self._views.extend((base, view))
+        return view
+    
+    def _slice(self, view: memoryview, lo: int, hi: int) -> memoryview:
+        sliced = view[lo:hi]
+        self._views.append(sliced)
+        return sliced
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def __enter__(self) -> 'ColumnSlice':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Release the views and unmap the column files."""
+        for view in reversed(self._views):
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views = []
+        self._maps = []
+    
+    def to_readings(self) -> List[Dict[str, Any]]:
+        """Materialize the slice as reading dictionaries."""
+        return list(self.iter_readings())
+    
+    def iter_readings(self, batch_rows: int = ITER_BATCH_ROWS) -> Iterator[Dict[str, Any]]:
+        """Yield the slice as reading dictionaries, converting in batches.
+        
+        Args:
+            batch_rows: Rows converted to Python objects per step
+        """
+        for lo in range(0, len(self), batch_rows):
+            hi = min(lo + batch_rows, len(self))
+            with self.timestamps[lo:hi] as part:
+                epochs = part.tolist()
+            values = {}
+            for metric in METRICS:
+                with self.columns[metric][lo:hi] as part:
+                    values[metric] = part.tolist()
+            
+            for i, epoch_us in enumerate(epochs):
+                reading: Dict[str, Any] = {"timestamp": from_epoch_us(epoch_us).isoformat()}
+                for metric in METRICS:
+                    reading[metric] = _to_value(values[metric][i])
+                yield reading
+
+
+class ColumnarStore:
+    """Directory of fixed-width binary column files read through mmap."""
+    
+    supports_append = True
+    supports_range_reads = True
+    
+    def __init__(self, path: Path):
+        """Initialize columnar store.
+        
+        Args:
+            path: Directory holding the column files
+        """
+        self.path = Path(path)
+        self._recover()
+    
+    def column_path(self, metric: str) -> Path:
+        """Return the file holding a metric column."""
+        return self.path / f"{metric}.f32"
+    
+    def _staging_path(self, suffix: str) -> Path:
+        return self.path.with_name(self.path.name + suffix)
+    
+    def _recover(self) -> None:
+        """Finish a rewrite that was interrupted between its two renames."""
+        staged = self._staging_path('.new')
+        if not self.path.exists() and staged.exists():
+            os.rename(staged, self.path)
+        shutil.rmtree(self._staging_path('.old'), ignore_errors=True)
+    
+    def row_count(self) -> int:
+        """Return the number of complete rows across all columns."""
+        try:
+            rows = os.stat(self.path / TIMESTAMP_FILE).st_size // TIMESTAMP_WIDTH
+            for metric in METRICS:
+                rows = min(rows, os.stat(self.column_path(metric)).st_size // VALUE_WIDTH)
+        except FileNotFoundError:
+            return 0
+        return rows
+    
+    def columns(self, start=None, end=None) -> ColumnSlice:
+        """Return zero-copy column views for readings in [start, end).
+        
+        Args:
+            start: Inclusive lower bound (datetime, ISO string or epoch
+                microseconds), or None for no bound
+            end: Exclusive upper bound, or None for no bound
+        
+        Returns:
+            ColumnSlice context manager
+        """
+        return ColumnSlice(self, start, end)
+    
+    def exists(self) -> bool:
+        return (self.path / TIMESTAMP_FILE).exists()
+    
+    def load(self) -> List[Dict[str, Any]]:
+        return self.load_range()
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        with self.columns(start, end) as view:
+            return view.to_readings()
+    
+    def iter_range(self, start=None, end=None) -> Iterator[Dict[str, Any]]:
+        with self.columns(start, end) as view:
+            yield from view.iter_readings()
+    
+    def accumulate(self, aggregator, start=None, end=None) -> None:
+        """Feed readings in [start, end) to a rollup Aggregator.
+        
+        Values go straight from the column maps to the aggregator in
+        batches; no reading dicts are built.
+        """
+        with self.columns(start, end) as view:
+            for lo in range(0, len(view), ITER_BATCH_ROWS):
+                hi = min(lo + ITER_BATCH_ROWS, len(view))
+                with view.timestamps[lo:hi] as part:
+                    epochs = part.tolist()
+                for metric in aggregator.metrics:
+                    with view.columns[metric][lo:hi] as part:
+                        values = part.tolist()
+                    for epoch_us, value in zip(epochs, values):
+                        value = _to_value(value)
+                        if value is not None:
+                            aggregator.add_value(epoch_us, metric, value)
+                for epoch_us in epochs:
+                    aggregator.open_bucket(epoch_us)
+    
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        encoded = _encode_rows(data)
+        order = sorted(range(len(encoded["timestamp"])), key=encoded["timestamp"].__getitem__)
+        self._rewrite({
+            name: array(column.typecode, (column[i] for i in order)).tobytes()
+            for name, column in encoded.items()
+        })
+    
+    def _rewrite(self, contents: Dict[str, bytes]) -> None:
+        """Replace all column files, swapping directories with two renames."""
+        staged = self._staging_path('.new')
+        old = self._staging_path('.old')
+        shutil.rmtree(staged, ignore_errors=True)
+        staged.mkdir(parents=True)
+        
+        for name, payload in contents.items():
+            filename = TIMESTAMP_FILE if name == "timestamp" else self.column_path(name).name
+            with open(staged / filename, 'wb') as f:
+                f.write(payload)
+            count_written(len(payload))
+        
+        if self.path.exists():
+            os.rename(self.path, old)
+        os.rename(staged, self.path)
+        shutil.rmtree(old, ignore_errors=True)
+    
+    def append(self, reading: Dict[str, Any]) -> None:
+        self.append_many([reading])
+    
+    def append_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        readings = list(readings)
+        encoded = _encode_rows(readings)
+        epochs = encoded["timestamp"]
+        if not epochs:
+            return 0
+        
+        last = self.last_epoch()
+        in_order = all(epochs[i] <= epochs[i + 1] for i in range(len(epochs) - 1))
+        if not in_order or (last is not None and epochs[0] < last):
+            # Out-of-order readings: keep the timestamp column sorted
+            self.save(self.load() + readings)
+            return len(readings)
+        
+        self.path.mkdir(parents=True, exist_ok=True)
+        rows = self.row_count()
+        for name, column in encoded.items():
+            filename = TIMESTAMP_FILE if name == "timestamp" else self.column_path(name).name
+            width = TIMESTAMP_WIDTH if name == "timestamp" else VALUE_WIDTH
+            with open(self.path / filename, 'ab') as f:
+                # Drop any partial row left by an interrupted append
+                f.truncate(rows * width)
+                f.write(column.tobytes())
+            count_written(len(column) * width)
+        return len(readings)
+    
+    def last_epoch(self) -> Optional[int]:
+        """Return the newest timestamp in epoch microseconds, if any."""
+        rows = self.row_count()
+        if rows == 0:
+            return None
+        with open(self.path / TIMESTAMP_FILE, 'rb') as f:
+            f.seek((rows - 1) * TIMESTAMP_WIDTH)
+            return array('q', f.read(TIMESTAMP_WIDTH))[0]
+    
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Return the last n readings, seeking to them in each column file."""
+        rows = self.row_count()
+        count = min(n, rows)
+        if count <= 0:
+            return []
+        
+        def read_column(path: Path, width: int, typecode: str) -> array:
+            with open(path, 'rb') as f:
+                f.seek((rows - count) * width)
+                return array(typecode, f.read(count * width))
+        
+        epochs = read_column(self.path / TIMESTAMP_FILE, TIMESTAMP_WIDTH, 'q')
+        values = {metric: read_column(self.column_path(metric), VALUE_WIDTH, 'f')
+                  for metric in METRICS}
+        
+        readings = []
+        for i, epoch_us in enumerate(epochs):
+            reading: Dict[str, Any] = {"timestamp": from_epoch_us(epoch_us).isoformat()}
+            for metric in METRICS:
+                reading[metric] = _to_value(values[metric][i])
+            readings.append(reading)
+        return readings
+    
+    def first_timestamp(self) -> Optional[str]:
+        if self.row_count() == 0:
+            return None
+        with open(self.path / TIMESTAMP_FILE, 'rb') as f:
+            return from_epoch_us(array('q', f.read(TIMESTAMP_WIDTH))[0]).isoformat()
+    
+    def drop_before(self, cutoff: datetime,
+                    on_drop: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> int:
+        """Remove rows older than the cutoff by copying the retained tail.
+        
+        Args:
+            cutoff: Oldest time to retain
+            on_drop: Optional callback given the dropped readings
+        
+        Returns:
+            Number of rows removed
+        """
+        with self.columns(end=cutoff) as head:
+            dropped = len(head)
+            if dropped == 0:
+                return 0
+            if on_drop is not None:
+                on_drop(head.to_readings())
+        
+        with self.columns(start=cutoff) as tail:
+            contents = {"timestamp": tail.timestamps.tobytes()}
+            contents.update({metric: tail.columns[metric].tobytes() for metric in METRICS})
+        
+        self._rewrite(contents)
+        return dropped
+    
+    def size_bytes(self) -> int:
+        if not self.path.is_dir():
+            return 0
+        return sum(f.stat().st_size for f in self.path.iterdir() if f.is_file())
+
+
+def _encode_rows(readings: List[Dict[str, Any]]) -> Dict[str, array]:
+    """Encode readings into typed column arrays.
+    
+    Raises:
+        ValueError: If a reading has an unparseable timestamp
+    """
+    columns = {"timestamp": array('q')}
+    columns.update({metric: array('f') for metric in METRICS})
+    
+    for reading in readings:
+        epoch_us = to_epoch_us(reading.get('timestamp', ''))
+        if epoch_us is None:
+            raise ValueError(f"Invalid timestamp {reading.get('timestamp')!r}")
+        columns["timestamp"].append(epoch_us)
+        for metric in METRICS:
+            value = reading.get(metric)
+            columns[metric].append(float('nan') if value is None else float(value))
+    
+    return columns
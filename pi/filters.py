@@ -0,0 +1,110 @@
+"""
+Oversampling Noise Filters
+==========================
+
+Reduce a burst of ADC samples of one channel to a single value and its
+spread. Each filter sorts the whole burst once and works on the sorted
+list with bisect and the statistics module, rather than filtering sample
+by sample as they are read.
+
+- median: the middle sample; spread is the scaled median absolute deviation
+- trimmed-mean: mean after dropping the lowest and highest TRIM_PROPORTION
+  of samples; spread is the standard deviation of the kept samples
+- hampel: mean of the samples within HAMPEL_THRESHOLD scaled MADs of the
+  median (a Hampel identifier over the whole burst); spread is the
+  standard deviation of the kept samples. The MAD is floored at one ADC
+  step, so a quiet burst whose samples mostly agree exactly does not
+  reject the ones a single step away
+"""
+
+import statistics
+from bisect import bisect_left, bisect_right
+from typing import List, NamedTuple, Optional, Sequence
+
+FILTER_METHODS = ("median", "trimmed-mean", "hampel")
+
+# Fraction of samples dropped from each end by the trimmed mean
+TRIM_PROPORTION = 0.2
+
+# Scaled MADs from the median beyond which the Hampel filter rejects a sample
+HAMPEL_THRESHOLD = 3.0
+
+# Scales the MAD to the standard deviation of normally distributed noise
+MAD_SCALE = 1.4826
+
+# Volts per ADS1115 step at the library's default gain (+/-4.096 V over 16 bits)
+ADC_LSB = 4.096 / 32768
+
+
+class Reduced(NamedTuple):
+    """A burst of samples reduced to one value."""
+    
+    value: float
+    spread: float
+    samples: int
+    rejected: int
+
+
+def median_absolute_deviation(ordered: Sequence[float], median: float) -> float:
+    """Return the MAD of sorted samples, scaled to a standard deviation."""
+    return MAD_SCALE * statistics.median([abs(x - median) for x in ordered])
+
+
+def median_filter(ordered: Sequence[float]) -> Reduced:
+    """Reduce sorted samples to their median."""
+    median = statistics.median(ordered)
+    return Reduced(median, median_absolute_deviation(ordered, median), len(ordered), 0)
+
+
+def trimmed_mean(ordered: Sequence[float], proportion: float = TRIM_PROPORTION) -> Reduced:
+    """Reduce sorted samples to the mean of their middle part."""
+    cut = int(len(ordered) * proportion)
+    kept = ordered[cut:len(ordered) - cut] or ordered
+    return Reduced(statistics.fmean(kept), statistics.pstdev(kept),
+                   len(ordered), len(ordered) - len(kept))
+
+
+def hampel(ordered: Sequence[float], threshold: float = HAMPEL_THRESHOLD,
+           mad_floor: float = ADC_LSB) -> Reduced:
+    """Reduce sorted samples to the mean of those near the median."""
+    median = statistics.median(ordered)
+    limit = threshold * max(median_absolute_deviation(ordered, median), mad_floor)
+    # The inliers are one contiguous run of the sorted samples
+    kept = ordered[bisect_left(ordered, median - limit):bisect_right(ordered, median + limit)]
+    return Reduced(statistics.fmean(kept), statistics.pstdev(kept),
+                   len(ordered), len(ordered) - len(kept))
+
+
+def reduce_samples(samples: Sequence[float], method: str = "median") -> Optional[Reduced]:
+    """Reduce a burst of samples with one of FILTER_METHODS.
+    
+    Args:
+        samples: Samples of one channel
+        method: Filter name
+    
+    Returns:
+        Reduced value and spread, or None if there are no samples
+    
+    Raises:
+        ValueError: If method is not one of FILTER_METHODS
+    """
+    validate_filter(method)
+    if not samples:
+        return None
+    
+    ordered: List[float] = sorted(samples)
+    if method == "trimmed-mean":
+        return trimmed_mean(ordered)
+    if method == "hampel":
+        return hampel(ordered)
+    return median_filter(ordered)
+
+
+def validate_filter(method: str) -> None:
+    """Check a filter name.
+    
+    Raises:
+        ValueError: If method is not one of FILTER_METHODS
+    """
+    if method not in FILTER_METHODS:
+        raise ValueError(f"Unknown filter {method!r}, must be one of {', '.join(FILTER_METHODS)}")
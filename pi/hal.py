@@ -6,9 +6,23 @@ Defines protocols and implementations for ADC and temperature sensors.
 Provides both real hardware interfaces and mock implementations for testing.
 """
 
-from typing import Protocol, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Protocol, Optional, Dict, Iterable, List
 import os
 import glob
+import time
+
+# Sysfs directory the w1-therm driver lists 1-Wire devices in
+W1_DEVICES = '/sys/bus/w1/devices/'
+
+# Seconds between 1-Wire bus rescans for newly attached probes
+PROBE_RESCAN_SECONDS = 300.0
+
+# Samples per second the ADS1115 can convert at
+ADS1115_DATA_RATES = (8, 16, 32, 64, 128, 250, 475, 860)
+
+# Allowance for the ADS1115's internal oscillator, which may run up to 10% slow
+CONVERSION_MARGIN = 1.1
 
 
 class ADC(Protocol):
@@ -39,18 +53,30 @@ class OneWireTemp(Protocol):
 
 
 class RealADS1115:
-    """Real ADS1115 ADC implementation using Adafruit libraries."""
+    """Real ADS1115 ADC implementation using Adafruit libraries.
+    
+    The I2C bus and one AnalogIn per channel are opened once and reused,
+    so keep one instance for the life of the process.
+    """
     
-    def __init__(self, address: int = 0x48):
+    def __init__(self, address: int = 0x48, data_rate: Optional[int] = None,
+                 continuous: bool = False):
         """Initialize ADS1115 with specified I2C address.
         
         Args:
             address: I2C address (default 0x48)
+            data_rate: Samples per second, one of ADS1115_DATA_RATES
+                (default: the library's 128)
+            continuous: Convert continuously instead of once per read, so
+                back-to-back samples of a channel need no conversion start;
+                bursts are then paced at the data rate
         """
+        validate_data_rate(data_rate)
         try:
             import busio
             import board
             from adafruit_ads1x15.ads1115 import ADS1115
+            from adafruit_ads1x15.ads1x15 import Mode
             from adafruit_ads1x15.analog_in import AnalogIn
             
             self.i2c = busio.I2C(board.SCL, board.SDA)
@@ -61,70 +87,206 @@ class RealADS1115:
             
         except ImportError as e:
             raise RuntimeError(f"Adafruit libraries not available: {e}")
+        
+        if data_rate is not None:
+            self.adc.data_rate = data_rate
+        self.continuous = continuous
+        if continuous:
+            self.adc.mode = Mode.CONTINUOUS
+        
+        # Map channel numbers to ADS1115 pins
+        self.pin_map = {0: ADS1115.P0, 1: ADS1115.P1,
+                        2: ADS1115.P2, 3: ADS1115.P3}
+        self._channels: Dict[int, object] = {}
+    
+    def _channel(self, channel: int):
+        """Return the cached AnalogIn of a channel."""
+        analog_in = self._channels.get(channel)
+        if analog_in is None:
+            if channel not in self.pin_map:
+                raise ValueError(f"Invalid channel {channel}, must be 0-3")
+            analog_in = self._channels[channel] = self.AnalogIn(self.adc, self.pin_map[channel])
+        return analog_in
     
     def read_voltage(self, channel: int) -> float:
         """Read voltage from ADS1115 channel."""
-        # Map channel numbers to ADS1115 pins
-        pin_map = {0: self.ADS1115.P0, 1: self.ADS1115.P1, 
-                   2: self.ADS1115.P2, 3: self.ADS1115.P3}
+        return self._channel(channel).voltage
+    
+    def read_voltages(self, channels: Iterable[int], samples: int = 1) -> Dict[int, List[float]]:
+        """Take a burst of samples from each channel.
         
-        if channel not in pin_map:
-            raise ValueError(f"Invalid channel {channel}, must be 0-3")
+        Each channel's samples are taken back to back, so the multiplexer
+        switches once per channel. In single-shot mode each sample starts
+        and waits for its own conversion. In continuous mode a read returns
+        the latest finished conversion without waiting, so samples are
+        paced one conversion period (1/data_rate, plus CONVERSION_MARGIN)
+        apart; unpaced reads would return the same conversion repeatedly.
         
-        analog_in = self.AnalogIn(self.adc, pin_map[channel])
-        return analog_in.voltage
+        Args:
+            channels: ADC channel numbers (0-3)
+            samples: Samples per channel
+            
+        Returns:
+            Voltages in sampling order by channel
+        """
+        period = CONVERSION_MARGIN / self.adc.data_rate if self.continuous else 0.0
+        voltages = {}
+        for channel in channels:
+            analog_in = self._channel(channel)
+            readings = voltages[channel] = []
+            due = time.monotonic()
+            for _ in range(samples):
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                readings.append(analog_in.voltage)
+                due = time.monotonic() + period
+        return voltages
 
 
-class RealDS18B20:
-    """Real DS18B20 temperature sensor implementation."""
+def parse_w1_slave(lines: List[str]) -> Optional[float]:
+    """Parse the two lines of a DS18B20 w1_slave file.
     
-    def __init__(self):
-        """Initialize DS18B20 sensor."""
-        self.device_folder = '/sys/bus/w1/devices/'
+    Args:
+        lines: File lines, a CRC line ending in YES/NO and a data line with t=
+        
+    Returns:
+        Temperature in Celsius, or None if the CRC failed or the data is malformed
+    """
+    # Check if reading is valid
+    if len(lines) < 2 or lines[0].strip()[-3:] != 'YES':
+        return None
     
-    def read_celsius(self) -> Optional[float]:
-        """Read temperature from DS18B20 via 1-Wire interface."""
+    # Extract temperature
+    temp_line = lines[1]
+    equals_pos = temp_line.find('t=')
+    if equals_pos == -1:
+        return None
+    
+    try:
+        return float(temp_line[equals_pos + 2:]) / 1000.0
+    except ValueError:
+        return None
+
+
+class DS18B20Probes:
+    """All DS18B20 probes on the 1-Wire bus, read in parallel.
+    
+    Probes are discovered once and cached; the bus is rescanned after
+    rescan_seconds, when no probe was found, or when a probe disappears.
+    Each w1_slave read blocks for a ~750 ms temperature conversion, so
+    probes are read concurrently and a cycle takes about one conversion
+    however many probes are attached.
+    """
+    
+    def __init__(self, device_folder: str = W1_DEVICES,
+                 rescan_seconds: float = PROBE_RESCAN_SECONDS):
+        """Initialize probe manager.
+        
+        Args:
+            device_folder: Sysfs directory listing 1-Wire devices
+            rescan_seconds: Seconds between rescans for new probes
+        """
+        self.device_folder = device_folder
+        self.rescan_seconds = rescan_seconds
+        self._probe_ids: List[str] = []
+        self._scanned_at: Optional[float] = None
+    
+    def rescan(self) -> List[str]:
+        """Discover attached probes (device IDs starting with 28-)."""
+        device_dirs = glob.glob(os.path.join(self.device_folder, '28-*'))
+        self._probe_ids = sorted(os.path.basename(path) for path in device_dirs)
+        self._scanned_at = time.monotonic()
+        return list(self._probe_ids)
+    
+    @property
+    def probe_ids(self) -> List[str]:
+        """IDs of the attached probes, e.g. ['28-0316a2795c2f'], rescanning if due."""
+        if (self._scanned_at is None or not self._probe_ids
+                or time.monotonic() - self._scanned_at >= self.rescan_seconds):
+            return self.rescan()
+        return list(self._probe_ids)
+    
+    def read_probe(self, probe_id: str) -> Optional[float]:
+        """Read one probe's temperature in Celsius.
+        
+        Returns:
+            Temperature in Celsius, or None if the read failed
+        """
+        device_file = os.path.join(self.device_folder, probe_id, 'w1_slave')
         try:
-            # Find DS18B20 device (starts with 28-)
-            device_files = glob.glob(f"{self.device_folder}28-*")
-            if not device_files:
-                return None
-            
-            # Use first found device
-            device_file = os.path.join(device_files[0], 'w1_slave')
-            
             with open(device_file, 'r') as f:
                 lines = f.readlines()
+        except OSError:
+            # Probe unplugged or bus fault; look for it again next time
+            self._scanned_at = None
+            return None
+        return parse_w1_slave(lines)
+    
+    def read_all(self, probe_ids: Optional[List[str]] = None) -> Dict[str, Optional[float]]:
+        """Read probes concurrently.
+        
+        Args:
+            probe_ids: Probes to read (default: every attached probe)
             
-            # Check if reading is valid
-            if len(lines) < 2 or lines[0].strip()[-3:] != 'YES':
-                return None
-            
-            # Extract temperature
-            temp_line = lines[1]
-            equals_pos = temp_line.find('t=')
-            if equals_pos == -1:
+        Returns:
+            Temperature in Celsius (None if the read failed) by probe ID
+        """
+        if probe_ids is None:
+            probe_ids = self.probe_ids
+        if len(probe_ids) <= 1:
+            return {probe_id: self.read_probe(probe_id) for probe_id in probe_ids}
+        
+        with ThreadPoolExecutor(max_workers=len(probe_ids)) as pool:
+            return dict(zip(probe_ids, pool.map(self.read_probe, probe_ids)))
+
+
+class RealDS18B20:
+    """Real DS18B20 temperature sensor implementation."""
+    
+    def __init__(self, probe_id: Optional[str] = None, device_folder: str = W1_DEVICES):
+        """Initialize DS18B20 sensor.
+        
+        Args:
+            probe_id: Probe to report as the water temperature
+                (default: the first probe by ID)
+            device_folder: Sysfs directory listing 1-Wire devices
+        """
+        self.device_folder = device_folder
+        self.probe_id = probe_id
+        self.probes = DS18B20Probes(device_folder)
+    
+    def read_celsius(self) -> Optional[float]:
+        """Read temperature from DS18B20 via 1-Wire interface."""
+        probe_id = self.probe_id
+        if probe_id is None:
+            probe_ids = self.probes.probe_ids
+            if not probe_ids:
                 return None
-            
-            temp_string = temp_line[equals_pos + 2:]
-            temp_c = float(temp_string) / 1000.0
-            
-            return temp_c
-            
-        except (FileNotFoundError, ValueError, IndexError):
-            return None
+            probe_id = probe_ids[0]
+        return self.probes.read_probe(probe_id)
+    
+    def read_probes(self) -> Dict[str, Optional[float]]:
+        """Read every attached probe concurrently, keyed on probe ID."""
+        return self.probes.read_all()
 
 
 class MockADC:
     """Mock ADC implementation for testing."""
     
-    def __init__(self, address: int = 0x48):
+    def __init__(self, address: int = 0x48, data_rate: Optional[int] = None,
+                 continuous: bool = False):
         """Initialize mock ADC.
         
         Args:
             address: Simulated I2C address
+            data_rate: Simulated samples per second
+            continuous: Simulated continuous-conversion mode
         """
+        validate_data_rate(data_rate)
         self.address = address
+        self.data_rate = data_rate
+        self.continuous = continuous
         # Deterministic mock voltages for testing
         self.mock_voltages = {
             0: 2.5,  # pH sensor - neutral pH ~ 7.0
@@ -139,6 +301,10 @@ class MockADC:
             raise ValueError(f"Invalid channel {channel}, must be 0-3")
         
         return self.mock_voltages.get(channel, 0.0)
+    
+    def read_voltages(self, channels: Iterable[int], samples: int = 1) -> Dict[int, List[float]]:
+        """Return samples copies of each channel's mock voltage."""
+        return {channel: [self.read_voltage(channel)] * samples for channel in channels}
 
 
 class MockOneWireTemp:
@@ -151,33 +317,68 @@ class MockOneWireTemp:
     def read_celsius(self) -> Optional[float]:
         """Return mock temperature reading."""
         return self.mock_temp
+    
+    def read_probes(self) -> Dict[str, Optional[float]]:
+        """Return the mock reading as a single probe."""
+        return {"28-mock": self.mock_temp}
+
+
+def validate_data_rate(data_rate: Optional[int]) -> None:
+    """Check an ADS1115 data rate.
+    
+    Raises:
+        ValueError: If data_rate is set and not one of ADS1115_DATA_RATES
+    """
+    if data_rate is not None and data_rate not in ADS1115_DATA_RATES:
+        raise ValueError(f"Invalid data rate {data_rate}, must be one of "
+                         f"{', '.join(map(str, ADS1115_DATA_RATES))}")
+
+
+def sample_voltages(adc: ADC, channels: Iterable[int], samples: int = 1) -> Dict[int, List[float]]:
+    """Take samples from each channel, in a burst if the ADC supports it.
+    
+    Args:
+        adc: ADC to sample
+        channels: ADC channel numbers
+        samples: Samples per channel
+        
+    Returns:
+        Voltages in sampling order by channel
+    """
+    if hasattr(adc, 'read_voltages'):
+        return adc.read_voltages(channels, samples)
+    return {channel: [adc.read_voltage(channel) for _ in range(samples)] for channel in channels}
 
 
-def create_adc(address: int = 0x48, mock: bool = False) -> ADC:
+def create_adc(address: int = 0x48, mock: bool = False, data_rate: Optional[int] = None,
+               continuous: bool = False) -> ADC:
     """Factory function to create ADC instance.
     
     Args:
         address: I2C address for ADS1115
         mock: If True, return mock implementation
+        data_rate: Samples per second (default: the library's 128)
+        continuous: Use continuous-conversion mode
         
     Returns:
         ADC instance (real or mock)
     """
     if mock or os.getenv('MOCK_HARDWARE', '0') == '1':
-        return MockADC(address)
+        return MockADC(address, data_rate, continuous)
     
     try:
-        return RealADS1115(address)
+        return RealADS1115(address, data_rate, continuous)
     except RuntimeError:
         # Fall back to mock if hardware unavailable
-        return MockADC(address)
+        return MockADC(address, data_rate, continuous)
 
 
-def create_temp_sensor(mock: bool = False) -> OneWireTemp:
+def create_temp_sensor(mock: bool = False, probe_id: Optional[str] = None) -> OneWireTemp:
     """Factory function to create temperature sensor instance.
     
     Args:
         mock: If True, return mock implementation
+        probe_id: DS18B20 probe to report (default: the first found)
         
     Returns:
         OneWireTemp instance (real or mock)
@@ -186,7 +387,7 @@ def create_temp_sensor(mock: bool = False) -> OneWireTemp:
         return MockOneWireTemp()
     
     # Check if 1-Wire is available
-    if not os.path.exists('/sys/bus/w1/devices/'):
+    if not os.path.exists(W1_DEVICES):
         return MockOneWireTemp()
     
-    return RealDS18B20()
\ No newline at end of file
+    return RealDS18B20(probe_id)
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Timestamp Index for Sensor Readings
+===================================
+
+Sorted epoch-microsecond index over a list of readings. Range queries
+bisect the integer timestamp column instead of comparing ISO strings
+against every reading, so a window costs O(log N + k).
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone, timedelta
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+
+try:
+    from .storage import parse_timestamp
+except ImportError:
+    # Handle running as script
+    from storage import parse_timestamp
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+TimeBound = Union[datetime, str, int, None]
+
+
+def to_epoch_us(value: Union[datetime, str, int]) -> Optional[int]:
+    """Convert a timestamp to integer microseconds since the Unix epoch.
+    
+    Args:
+        value: Aware or naive (assumed UTC) datetime, ISO 8601 string, or
+            an epoch-microsecond int which is returned unchanged
+    
+    Returns:
+        Epoch microseconds, or None if the timestamp cannot be parsed
+    """
+    if isinstance(value, int):
+        return value
+    
+    if isinstance(value, datetime):
+        dt = value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+    else:
+        dt = parse_timestamp(value)
+        if dt is None:
+            return None
+    
+    return (dt - EPOCH) // ONE_MICROSECOND
+
+
+def from_epoch_us(epoch_us: int) -> datetime:
+    """Convert epoch microseconds back to an aware UTC datetime."""
+    return EPOCH + timedelta(microseconds=epoch_us)
+
+
+def to_utc_datetime(value: Union[datetime, str, int]) -> datetime:
+    """Normalize a range bound to an aware UTC datetime.
+    
+    Raises:
+        ValueError: If the bound cannot be parsed
+    """
+    return from_epoch_us(bound_epoch_us(value))
+
+
+def bound_epoch_us(value: Union[datetime, str, int]) -> int:
+    """Convert a range bound to epoch microseconds.
+    
+    Raises:
+        ValueError: If the bound cannot be parsed
+    """
+    epoch_us = to_epoch_us(value)
+    if epoch_us is None:
+        raise ValueError(f"Invalid timestamp bound {value!r}")
+    return epoch_us
+
+
+def bisect_readings(readings: List[Dict[str, Any]], bound: TimeBound) -> int:
+    """Return the position of the first reading at or after bound.
+    
+    The readings must already be in time order (as returned by load_data).
+    Only the O(log N) timestamps probed by the search are parsed; one that
+    cannot be parsed counts as older than the bound.
+    
+    Args:
+        readings: Sensor readings sorted by timestamp
+        bound: Time to search for
+    
+    Returns:
+        Position in readings
+    """
+    target = bound_epoch_us(bound)
+    lo, hi = 0, len(readings)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        epoch_us = to_epoch_us(readings[mid].get('timestamp', ''))
+        if epoch_us is None or epoch_us < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class TimestampIndex:
+    """Sorted epoch timestamp column over a list of readings."""
+    
+    def __init__(self, readings: List[Dict[str, Any]]):
+        """Build index over readings.
+        
+        Readings whose timestamp cannot be parsed are left out. Input that
+        is already in time order (as returned by load_data) is indexed
+        without re-sorting.
+        
+        Args:
+            readings: Sensor readings with 'timestamp' as ISO string or datetime
+        """
+        pairs = []
+        for reading in readings:
+            epoch_us = to_epoch_us(reading.get('timestamp', ''))
+            if epoch_us is not None:
+                pairs.append((epoch_us, reading))
+        
+        if any(pairs[i][0] > pairs[i + 1][0] for i in range(len(pairs) - 1)):
+            pairs.sort(key=lambda pair: pair[0])
+        
+        self.epochs: List[int] = [pair[0] for pair in pairs]
+        self.readings: List[Dict[str, Any]] = [pair[1] for pair in pairs]
+    
+    def __len__(self) -> int:
+        return len(self.epochs)
+    
+    def bounds(self, start: TimeBound = None, end: TimeBound = None) -> Tuple[int, int]:
+        """Return list positions [lo, hi) for readings in [start, end).
+        
+        Args:
+            start: Inclusive lower bound, or None for no bound
+            end: Exclusive upper bound, or None for no bound
+        
+        Returns:
+            Tuple of (lo, hi) positions
+        """
+        lo = 0 if start is None else bisect_left(self.epochs, bound_epoch_us(start))
+        hi = len(self.epochs) if end is None else bisect_left(self.epochs, bound_epoch_us(end))
+        return lo, max(lo, hi)
+    
+    def range(self, start: TimeBound = None, end: TimeBound = None) -> List[Dict[str, Any]]:
+        """Return readings with start <= timestamp < end, in time order."""
+        lo, hi = self.bounds(start, end)
+        return self.readings[lo:hi]
+
+
+class TimestampSet:
+    """Sorted set of stored epoch timestamps, for duplicate checks.
+    
+    Kept as one packed int64 array, 8 bytes per reading, so millions of
+    readings fit in a few megabytes. Membership is a bisect and adding a
+    reading newer than all others is an O(1) append.
+    """
+    
+    def __init__(self, epochs: Iterable[int] = ()):
+        """Build set from epoch-microsecond timestamps in any order."""
+        self.epochs = array('q', epochs)
+        if any(self.epochs[i] > self.epochs[i + 1] for i in range(len(self.epochs) - 1)):
+            self.epochs = array('q', sorted(set(self.epochs)))
+    
+    @classmethod
+    def from_readings(cls, readings: Iterable[Dict[str, Any]]) -> 'TimestampSet':
+        """Build set from readings, skipping unparseable timestamps."""
+        epochs = (to_epoch_us(reading.get('timestamp', '')) for reading in readings)
+        return cls(epoch_us for epoch_us in epochs if epoch_us is not None)
+    
+    def __len__(self) -> int:
+        return len(self.epochs)
+    
+    def __contains__(self, epoch_us: int) -> bool:
+        i = bisect_left(self.epochs, epoch_us)
+        return i < len(self.epochs) and self.epochs[i] == epoch_us
+    
+    def add(self, epoch_us: int) -> None:
+        """Add a timestamp, keeping the set sorted."""
+        if not self.epochs or epoch_us > self.epochs[-1]:
+            self.epochs.append(epoch_us)
+            return
+        i = bisect_left(self.epochs, epoch_us)
+        if i == len(self.epochs) or self.epochs[i] != epoch_us:
+            self.epochs.insert(i, epoch_us)
+    
+    def drop_before(self, epoch_us: int) -> None:
+        """Remove timestamps older than epoch_us."""
+        del self.epochs[:bisect_left(self.epochs, epoch_us)]
+    
+    def newest(self) -> Optional[int]:
+        """Return the newest timestamp, if any."""
+        return self.epochs[-1] if self.epochs else None
@@ -0,0 +1,313 @@
+"""
+Write-Ahead Journal
+===================
+
+Wraps a storage backend so the reading cycle only appends one fsync'd
+JSON line to a small journal file. A scheduled compaction step folds the
+journal into the main store, applies retention and publishes exports, so
+the expensive rewrite happens off the reading path. Readers see the main
+store and the journal merged.
+
+Pointed at a RAM-backed directory (e.g. /dev/shm) with durable=False, the
+journal becomes a staging buffer: readings cost no SD card writes until a
+compaction flushes them, at the price of losing unflushed readings on a
+power cut.
+"""
+
+import os
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; journal locking is then a no-op
+    fcntl = None
+
+try:
+    from .index import TimestampIndex, from_epoch_us, to_epoch_us
+    from .storage import (METRICS, ReadingStore, JsonLinesStore, count_written, encode_line,
+                          filter_range, newest_readings, replace_readings, sort_readings)
+except ImportError:
+    # Handle running as script
+    from index import TimestampIndex, from_epoch_us, to_epoch_us
+    from storage import (METRICS, ReadingStore, JsonLinesStore, count_written, encode_line,
+                         filter_range, newest_readings, replace_readings, sort_readings)
+
+
+def journal_path(data_file: Path) -> Path:
+    """Return the journal path for a data file or store directory."""
+    return Path(str(data_file) + '.journal')
+
+
+def _record_key(reading: Dict[str, Any]) -> Tuple:
+    """Identify a reading by its instant and metric values.
+    
+    Values are compared to 4 decimals, as the columnar store keeps them
+    as float32.
+    """
+    values = tuple(round(value, 4) if isinstance(value, (int, float)) else value
+                   for value in (reading.get(metric) for metric in METRICS))
+    return (to_epoch_us(reading.get('timestamp', '')),) + values
+
+
+def _read_lines(path: Path) -> List[Dict[str, Any]]:
+    """Return the readings of a journal file in file order."""
+    return list(JsonLinesStore(path).iter_file()) if path.exists() else []
+
+
+class JournaledStore:
+    """Storage backend whose appends go to a write-ahead journal.
+    
+    While a compaction runs, the journal is moved aside to a
+    ``.compacting`` file and new appends start a fresh journal, so the
+    reading cycle never waits for the rewrite. Compactions hold a lock of
+    their own for the whole fold, so two never run at once.
+    """
+    
+    supports_append = True
+    
+    def __init__(self, main: ReadingStore, path: Optional[Path] = None, durable: bool = True):
+        """Initialize journaled store.
+        
+        Args:
+            main: Store the journal is compacted into
+            path: Journal file path (default: next to the main store)
+            durable: If True, fsync every append. Set False for a journal
+                on tmpfs, whose appends are then not counted as data
+                file writes.
+        """
+        self.main = main
+        self.durable = durable
+        self.path = main.path
+        self.journal_file = Path(path) if path is not None else journal_path(main.path)
+        self.compacting_file = Path(str(self.journal_file) + '.compacting')
+        self.lock_file = Path(str(self.journal_file) + '.lock')
+        self.compact_lock_file = Path(str(self.journal_file) + '.compact.lock')
+        self.supports_range_reads = main.supports_range_reads
+    
+    @contextmanager
+    def _locked(self, lock_file: Optional[Path] = None) -> Iterator[None]:
+        """Hold an exclusive lock against concurrent appends and compaction.
+        
+        Args:
+            lock_file: Lock to take (default: the journal lock)
+        """
+        if fcntl is None:
+            yield
+            return
+        
+        lock_file = lock_file or self.lock_file
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_file, 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    
+    def journal_readings(self) -> List[Dict[str, Any]]:
+        """Return readings not yet compacted into the main store."""
+        return sort_readings(_read_lines(self.compacting_file) + _read_lines(self.journal_file))
+    
+    def _pending(self, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Return journaled readings in a range that the main store does not hold yet.
+        
+        Only the ``.compacting`` file can overlap the main store, while a
+        compaction folds it or after one was interrupted.
+        """
+        compacting = filter_range(_read_lines(self.compacting_file), start, end)
+        journal = filter_range(_read_lines(self.journal_file), start, end)
+        return sort_readings(self._unseen(compacting) + journal)
+    
+    def exists(self) -> bool:
+        return (self.main.exists() or self.journal_file.exists()
+                or self.compacting_file.exists())
+    
+    def load(self) -> List[Dict[str, Any]]:
+        return self.load_range()
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        stored = self.main.load_range(start, end) if self.main.exists() else []
+        pending = self._pending(start, end)
+        return sort_readings(stored + pending) if pending else stored
+    
+    def iter_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        pending = self._pending(start, end)
+        if self.main.exists():
+            yield from self.main.iter_range(start, end)
+        yield from pending
+    
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Return the last n readings across the main store and the journal."""
+        if n <= 0:
+            return []
+        if not self.main.exists():
+            stored = []
+        elif hasattr(self.main, 'tail'):
+            stored = self.main.tail(n)
+        else:
+            stored = self.main.load()[-n:]
+        return newest_readings(stored + self._pending(), n)
+    
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        with self._locked():
+            self.main.save(data)
+            for path in (self.journal_file, self.compacting_file):
+                if path.exists():
+                    path.unlink()
+    
+    def append(self, reading: Dict[str, Any]) -> None:
+        self.append_many([reading])
+    
+    def append_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        """Append readings to the journal and fsync it.
+        
+        Returns:
+            Number of readings appended
+        """
+        payload = ''.join(encode_line(reading) for reading in readings)
+        if not payload:
+            return 0
+        
+        with self._locked():
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_file, 'a') as f:
+                f.write(payload)
+                if self.durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+        if self.durable:
+            count_written(len(payload.encode('utf-8')))
+        return payload.count('\n')
+    
+    def replace_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        """Overwrite stored readings that share a timestamp with a given reading.
+        
+        The journal is compacted first, so every stored reading is in the
+        main store.
+        
+        Returns:
+            Number of readings replaced
+        """
+        readings = list(readings)
+        self.compact()
+        return replace_readings(self.main, readings)
+    
+    def compact(self, cutoff: Optional[datetime] = None,
+                on_drop: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                on_fold: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> int:
+        """Fold journaled readings into the main store.
+        
+        Readings of an interrupted compaction that already reached the
+        main store are skipped. Appends go on to a fresh journal while the
+        fold runs.
+        
+        Args:
+            cutoff: If given, also drop readings older than this from the
+                main store
+            on_drop: Optional callback given the readings dropped by the
+                cutoff
+            on_fold: Optional callback given the readings folded into the
+                main store, once the fold is complete
+        
+        Returns:
+            Number of readings folded into the main store
+        """
+        with self._locked(self.compact_lock_file):
+            with self._locked():
+                # Left by an interrupted compaction, possibly partly folded
+                recovered = _read_lines(self.compacting_file)
+                if self.journal_file.exists():
+                    if self.compacting_file.exists():
+                        with open(self.journal_file, 'r') as src, open(self.compacting_file, 'a') as dest:
+                            dest.write(src.read())
+                        self.journal_file.unlink()
+                    else:
+                        os.rename(self.journal_file, self.compacting_file)
+            
+            fresh = _read_lines(self.compacting_file)[len(recovered):]
+            pending = sort_readings(self._unseen(recovered) + fresh)
+            
+            if self.main.supports_append:
+                if pending:
+                    self.main.append_many(pending)
+                if cutoff is not None:
+                    self._drop_before(cutoff, on_drop)
+            else:
+                # Whole-file stores fold and prune in a single rewrite
+                data = self.main.load() if self.main.exists() else []
+                stored = len(data)
+                data.extend(pending)
+                if cutoff is not None:
+                    index = TimestampIndex(data)
+                    if on_drop is not None:
+                        on_drop(index.range(end=cutoff))
+                    data = index.range(cutoff)
+                if pending or len(data) != stored:
+                    self.main.save(data)
+            
+            if self.compacting_file.exists():
+                self.compacting_file.unlink()
+            if pending and on_fold is not None:
+                on_fold(pending)
+            return len(pending)
+    
+    def _unseen(self, pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop readings that the main store already holds.
+        
+        Readings are matched as whole records, each stored reading
+        accounting for one pending reading, so readings that only share a
+        timestamp are kept.
+        """
+        if not pending or not self.main.exists():
+            return pending
+        
+        index = TimestampIndex(pending)
+        if not index.epochs:
+            return []
+        stored = Counter(_record_key(reading) for reading in self.main.iter_range(
+            from_epoch_us(index.epochs[0]), from_epoch_us(index.epochs[-1] + 1)))
+        unseen = []
+        for reading in index.readings:
+            key = _record_key(reading)
+            if stored[key] > 0:
+                stored[key] -= 1
+            else:
+                unseen.append(reading)
+        return unseen
+    
+    def _drop_before(self, cutoff: datetime,
+                     on_drop: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> None:
+        """Apply retention to the main store."""
+        if hasattr(self.main, 'drop_before'):
+            self.main.drop_before(cutoff, on_drop=on_drop)
+            return
+        
+        data = self.main.load() if self.main.exists() else []
+        index = TimestampIndex(data)
+        kept = index.range(cutoff)
+        if len(kept) != len(data):
+            if on_drop is not None:
+                on_drop(index.range(end=cutoff))
+            self.main.save(kept)
+    
+    def first_timestamp(self) -> Optional[str]:
+        timestamps = [r.get('timestamp') for r in self.journal_readings()[:1]]
+        if self.main.exists():
+            timestamps.append(self.main.first_timestamp())
+        timestamps = [t for t in timestamps if t]
+        return min(timestamps) if timestamps else None
+    
+    def size_bytes(self) -> int:
+        total = self.main.size_bytes()
+        for path in (self.journal_file, self.compacting_file):
+            if path.exists():
+                total += path.stat().st_size
+        return total
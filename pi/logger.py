@@ -6,26 +6,136 @@ Handles loading, saving, and pruning time series sensor data.
 Provides atomic operations and data integrity guarantees.
 """
 
+import argparse
 import json
-import os
-import tempfile
+import sys
+import time
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Sequence, Tuple
+
+try:
+    from .metadata import DataMetadata, metadata_path, read_metadata, write_metadata
+    from .journal import JournaledStore
+    from .materialized import MaterializedRollups
+    from .rollup import TieredRetention, Aggregator, BUCKETS, AGGREGATE_FUNCS, ROLLUP_RESOLUTIONS
+    from .timeseries import TimeSeries
+    from .index import (TimestampIndex, TimestampSet, TimeBound, bisect_readings, from_epoch_us,
+                        to_epoch_us, to_utc_datetime)
+    from .storage import (
+        JsonArrayStore, ReadingStore, SegmentStore, StorageFormatError, STORAGE_FORMATS, METRICS,
+        COMPRESSION_SUFFIXES, atomic_write, bytes_written, create_store, iter_json_array,
+        path_version, replace_readings, store_version
+    )
+except ImportError:
+    # Handle running as script
+    from metadata import DataMetadata, metadata_path, read_metadata, write_metadata
+    from journal import JournaledStore
+    from materialized import MaterializedRollups
+    from rollup import TieredRetention, Aggregator, BUCKETS, AGGREGATE_FUNCS, ROLLUP_RESOLUTIONS
+    from timeseries import TimeSeries
+    from index import (TimestampIndex, TimestampSet, TimeBound, bisect_readings, from_epoch_us,
+                       to_epoch_us, to_utc_datetime)
+    from storage import (
+        JsonArrayStore, ReadingStore, SegmentStore, StorageFormatError, STORAGE_FORMATS, METRICS,
+        COMPRESSION_SUFFIXES, atomic_write, bytes_written, create_store, iter_json_array,
+        path_version, replace_readings, store_version
+    )
+
+# Append-only stores are rewritten once the oldest reading is this far past
+# the retention cutoff, so pruning happens about once a day, not per append.
+PRUNE_SLACK = timedelta(days=1)
+
+# A store over its byte budget is trimmed to this fraction of it, so the
+# quota is enforced once per few days of readings rather than per append.
+QUOTA_TARGET = 0.9
+
+# What appending a reading whose timestamp is already stored does: drop the
+# new reading, overwrite the stored one, or fill the stored one's nulls
+DEDUP_POLICIES = ("keep-first", "keep-last", "merge")
 
 
 class DataLogger:
     """Manages sensor data persistence with automatic pruning."""
     
-    def __init__(self, data_file: Path, window_days: int = 60):
+    def __init__(self, data_file: Path, window_days: int = 60,
+                 storage_format: Optional[str] = None,
+                 segment_granularity: str = "day", journal: bool = False,
+                 rollup_days: int = 0, hourly_days: int = 3650,
+                 compress_after_days: int = 0, compression: str = "gzip",
+                 materialize_stats: bool = False, buffer_dir: Optional[Path] = None,
+                 max_bytes: int = 0, dedup: Optional[str] = None):
         """Initialize data logger.
         
         Args:
-            data_file: Path to JSON data file
+            data_file: Path to JSON data file (a directory for segments
+                and columnar)
             window_days: Number of days of data to retain
+            storage_format: Storage backend ("json", "jsonl", "segments",
+                "columnar" or "sqlite"). If None, inferred from the data
+                file path.
+            segment_granularity: Segment length for the segments backend,
+                "day" or "hour"
+            journal: If True, appends go to a write-ahead journal that
+                compact() folds into the data file
+            rollup_days: If positive, readings leaving the retention window
+                are demoted to 5-minute aggregates kept up to this age in
+                days, instead of being discarded
+            hourly_days: Age in days up to which hourly aggregates of aged
+                out 5-minute aggregates are kept (with rollup_days)
+            compress_after_days: If positive, segments older than this many
+                days are compressed (segments backend only)
+            compression: Cold segment compression, "gzip" or "lzma"
+            materialize_stats: If True, every append also updates running
+                hourly and daily statistics kept next to the data file
+            buffer_dir: If given, appends are staged in a journal in this
+                RAM-backed directory (e.g. /dev/shm/aquaponics) and reach
+                the data file only when compact() flushes them. Readings
+                not yet flushed are lost on a power cut.
+            max_bytes: If positive, byte budget of the data store. Once it
+                is exceeded cold segments are compressed, then the oldest
+                readings are dropped (demoted to the rollup tiers if
+                enabled).
+            dedup: If given, one of DEDUP_POLICIES applied to appended
+                readings whose timestamp is already stored (or repeated
+                in the batch); by default such readings are appended
         """
         self.data_file = Path(data_file)
         self.window_days = window_days
+        self.store: ReadingStore = create_store(
+            self.data_file, storage_format, segment_granularity
+        )
+        self.buffered = buffer_dir is not None
+        if self.buffered:
+            self.store = JournaledStore(
+                self.store, Path(buffer_dir) / f"{self.data_file.name}.journal", durable=False)
+        elif journal:
+            self.store = JournaledStore(self.store)
+        self.compress_after_days = compress_after_days
+        self.compression = compression
+        self.max_bytes = max_bytes
+        if dedup is not None and dedup not in DEDUP_POLICIES:
+            raise ValueError(f"Unknown dedup policy {dedup!r}, "
+                             f"must be one of {', '.join(DEDUP_POLICIES)}")
+        self.dedup = dedup
+        self._stored: Optional[TimestampSet] = None
+        self._stored_version: Optional[Tuple] = None
+        self.tiers: Optional[TieredRetention] = None
+        if rollup_days > 0:
+            self.tiers = TieredRetention(self.data_file, rollup_days, hourly_days)
+        self.materialized: Optional[MaterializedRollups] = None
+        if materialize_stats:
+            self.materialized = MaterializedRollups(self.data_file)
+        self.meta_file = metadata_path(self.data_file)
+        # Sidecar as this logger last wrote it, keyed on the file's fingerprint
+        self._meta_cache: Optional[Tuple[Tuple, Dict[str, Any]]] = None
+        self._retained_since: Optional[str] = None
+        self._index: Optional[TimestampIndex] = None
+        self._index_version: Optional[Tuple] = None
+        
+        # Bytes written to the data files, and the readings that reached them
+        self.io_stats = {"readings_written": 0, "bytes_written": 0}
         
         # Ensure parent directory exists
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
@@ -36,22 +146,72 @@ class DataLogger:
         Returns:
             List of sensor reading dictionaries, sorted by timestamp
         """
-        if not self.data_file.exists():
-            return []
+        return self._load_range()
+    
+    def iter_readings(self, since: TimeBound = None, until: TimeBound = None,
+                      fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield readings with since <= timestamp < until without loading them all.
         
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list):
-                print(f"Warning: {self.data_file} contains invalid data format")
-                return []
+        Readings are decoded incrementally from the store (the JSON array
+        format uses an incremental decoder), so memory stays bounded by
+        one reading rather than the whole history. They come in storage
+        order, which is time order unless readings were appended out of
+        order.
+        
+        Args:
+            since: Inclusive lower bound (datetime, ISO string or epoch
+                microseconds), or None for no bound
+            until: Exclusive upper bound, or None for no bound
+            fields: If given, only these fields (plus timestamp) are kept
             
-            # Sort by timestamp to ensure chronological order
-            data.sort(key=lambda x: x.get('timestamp', ''))
+        Yields:
+            Sensor reading dictionaries
+        """
+        if not self.store.exists():
+            return
+        
+        start = to_utc_datetime(since) if since is not None else None
+        end = to_utc_datetime(until) if until is not None else None
+        keys = None if fields is None else ('timestamp',) + tuple(fields)
+        
+        try:
+            for reading in self.store.iter_range(start, end):
+                if keys is not None and isinstance(reading, dict):
+                    reading = {key: reading.get(key) for key in keys}
+                yield reading
+                
+        except StorageFormatError:
+            print(f"Warning: {self.data_file} contains invalid data format")
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading data from {self.data_file}: {e}")
+    
+    def load_series(self, since: TimeBound = None, until: TimeBound = None) -> TimeSeries:
+        """Load readings with since <= timestamp < until as a TimeSeries.
+        
+        Readings are streamed straight into the typed columns, so the
+        list-of-dicts form is never materialized.
+        
+        Args:
+            since: Inclusive lower bound, or None for no bound
+            until: Exclusive upper bound, or None for no bound
             
-            return data
+        Returns:
+            TimeSeries of the readings, in time order
+        """
+        return TimeSeries.from_readings(self.iter_readings(since, until))
+    
+    def _load_range(self, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Load readings in [start, end) from the store, reporting errors."""
+        if not self.store.exists():
+            return []
+        
+        try:
+            return self.store.load_range(start, end)
             
+        except StorageFormatError:
+            print(f"Warning: {self.data_file} contains invalid data format")
+            return []
         except (json.JSONDecodeError, IOError) as e:
             print(f"Error loading data from {self.data_file}: {e}")
             return []
@@ -65,86 +225,639 @@ class DataLogger:
         Returns:
             True if save successful, False otherwise
         """
+        self._index = None
+        self._stored = None
+        self._meta_cache = None
+        
         try:
-            # Sort data by timestamp
-            data.sort(key=lambda x: x.get('timestamp', ''))
-            
-            # Write to temporary file first for atomic operation
-            temp_fd, temp_path = tempfile.mkstemp(
-                suffix='.json',
-                dir=self.data_file.parent
-            )
-            
-            try:
-                with os.fdopen(temp_fd, 'w') as f:
-                    json.dump(data, f, indent=2)
-                
-                # Atomic rename
-                os.rename(temp_path, self.data_file)
-                return True
-                
-            except Exception:
-                # Clean up temp file on error
-                try:
-                    os.unlink(temp_path)
-                except OSError:
-                    pass
-                raise
+            self.store.save(data)
                 
         except Exception as e:
             print(f"Error saving data to {self.data_file}: {e}")
             return False
+        
+        self._write_metadata(DataMetadata.from_readings(data))
+        return True
     
     def append_reading(self, reading: Dict[str, Any]) -> bool:
         """Append a new sensor reading to the data file.
         
+        Append-only backends write a single record and only rewrite the
+        file once the oldest reading has aged out of the retention window.
+        
         Args:
             reading: Sensor reading dictionary with timestamp
             
         Returns:
             True if append successful, False otherwise
         """
-        # Validate reading has required fields
-        if not isinstance(reading, dict) or 'timestamp' not in reading:
-            print("Error: Reading must be a dict with 'timestamp' field")
-            return False
+        return self.append_readings([reading])
+    
+    def append_readings(self, readings: Iterable[Dict[str, Any]]) -> bool:
+        """Append a batch of sensor readings with a single write.
+        
+        The batch costs one store write (or one load/save for the JSON
+        array format) and one retention pass, however many rows it has.
+        Nothing is written if any reading is invalid.
+        
+        Args:
+            readings: Sensor reading dictionaries with timestamps
+            
+        Returns:
+            True if append successful, False otherwise
+        """
+        readings = list(readings)
+        written = bytes_written()
+        success = self._append_readings(readings)
+        if not success:
+            # The timestamp set may list readings that were not stored
+            self._stored = None
+            self._meta_cache = None
+        elif self._stored is not None:
+            # The set was kept up to date with this write
+            self._stored_version = store_version(self.store)
+        
+        # Buffered readings count once compact() flushes them
+        self.io_stats["bytes_written"] += bytes_written() - written
+        if success and not self.buffered:
+            self.io_stats["readings_written"] += len(readings)
+        return success
+    
+    def _append_readings(self, readings: List[Dict[str, Any]]) -> bool:
+        """Validate and store readings; see append_readings()."""
+        
+        # Validate readings have required fields
+        for reading in readings:
+            if not isinstance(reading, dict) or 'timestamp' not in reading:
+                print("Error: Reading must be a dict with 'timestamp' field")
+                return False
+        
+        if not readings:
+            return True
+        
+        self._index = None
+        
+        if self.dedup is not None:
+            try:
+                readings = self._deduplicate(readings)
+            except Exception as e:
+                print(f"Error checking readings for duplicates in {self.data_file}: {e}")
+                return False
+            if not readings:
+                return True
+        
+        if self.buffered:
+            # The sidecar and materialized statistics are left stale until
+            # the flush, so staging a reading writes nothing to the card
+            self._meta_cache = None
+            try:
+                self.store.append_many(readings)
+            except Exception as e:
+                print(f"Error buffering readings for {self.data_file}: {e}")
+                return False
+            return True
+        
+        if self.store.supports_append:
+            meta = self._current_metadata()
+            written = bytes_written()
+            
+            try:
+                self.store.append_many(readings)
+            except Exception as e:
+                print(f"Error appending readings to {self.data_file}: {e}")
+                return False
+            
+            if meta is not None:
+                for reading in readings:
+                    meta.add(reading)
+                # Appends grow the store by what they wrote; no need to stat it
+                grown = None if hasattr(self.store, 'metadata') else bytes_written() - written
+                self._write_metadata(meta, grown)
+            else:
+                meta = self.rebuild_metadata()
+            
+            self._materialize(readings)
+            if not self._prune_if_due():
+                return False
+            if isinstance(self.store, JournaledStore):
+                # Journaled stores are held to the quota when compacted
+                return True
+            return self._enforce_quota(meta.size_bytes)
         
         # Load existing data
         data = self.load_data()
         
-        # Append new reading
-        data.append(reading)
+        # Append new readings
+        data.extend(readings)
         
         # Prune old data
         data = self.prune_data(data)
         
         # Save updated data
-        return self.save_data(data)
+        if not self.save_data(data):
+            return False
+        self._materialize(readings)
+        return self._enforce_quota()
+    
+    def _deduplicate(self, readings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply the dedup policy to readings about to be appended.
+        
+        A reading newer than everything stored (the usual case) costs one
+        comparison. Older ones are looked up in a TimestampSet of the
+        stored timestamps, built on first need and kept up to date (and
+        rebuilt if another writer changes the store), so each check is a
+        bisect. Duplicates of stored readings are dropped
+        (keep-first) or written over the stored ones (keep-last, merge).
+        
+        Returns:
+            Readings new to the store, one per timestamp, in input order
+        """
+        batch: Dict[int, Dict[str, Any]] = {}
+        unparsed = []
+        for reading in readings:
+            epoch_us = to_epoch_us(reading.get('timestamp', ''))
+            if epoch_us is None:
+                # Left for the store to reject
+                unparsed.append(reading)
+            elif epoch_us in batch:
+                batch[epoch_us] = self._resolve(batch[epoch_us], reading)
+            else:
+                batch[epoch_us] = reading
+        
+        newest = self._newest_epoch()
+        stored: Dict[int, Dict[str, Any]] = {}
+        if newest is not None and any(epoch_us <= newest for epoch_us in batch):
+            epochs = self._stored_epochs()
+            stored = {e: r for e, r in batch.items() if e <= newest and e in epochs}
+        
+        if stored and self.dedup != "keep-first":
+            self._upsert(stored)
+        
+        fresh = [reading for epoch_us, reading in batch.items() if epoch_us not in stored]
+        if self._stored is not None:
+            for epoch_us in batch:
+                self._stored.add(epoch_us)
+        return fresh + unparsed
+    
+    def _resolve(self, old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine two readings with the same timestamp by the dedup policy."""
+        if self.dedup == "keep-first":
+            return old
+        if self.dedup == "keep-last":
+            return new
+        merged = dict(old)
+        merged.update((key, value) for key, value in new.items() if value is not None)
+        return merged
+    
+    def _newest_epoch(self) -> Optional[int]:
+        """Return the newest stored timestamp in epoch microseconds, if any."""
+        if self._stored_current():
+            return self._stored.newest()
+        if not self.store.exists():
+            return None
+        
+        # The last line is not the newest reading once one arrived late, but
+        # the metadata tracks the largest timestamp whatever the order
+        meta = self._current_metadata()
+        if meta is not None:
+            return to_epoch_us(meta.last_timestamp or '')
+        return self._stored_epochs().newest()
+    
+    def _stored_epochs(self) -> TimestampSet:
+        """Return the set of stored timestamps, streaming the store once."""
+        if not self._stored_current():
+            self._stored_version = store_version(self.store)
+            self._stored = TimestampSet.from_readings(self.store.iter_range())
+        return self._stored
+    
+    def _stored_current(self) -> bool:
+        """Return True if the timestamp set matches the files on disk.
+        
+        A set left stale by another writer is dropped.
+        """
+        if self._stored is not None and self._stored_version != store_version(self.store):
+            self._stored = None
+        return self._stored is not None
+    
+    def _upsert(self, readings: Dict[int, Dict[str, Any]]) -> None:
+        """Write readings over the stored readings with their timestamps.
+        
+        Args:
+            readings: Incoming readings keyed on epoch microseconds
+        """
+        lo, hi = min(readings), max(readings)
+        stored = {to_epoch_us(r.get('timestamp', '')): r
+                  for r in self.store.load_range(from_epoch_us(lo), from_epoch_us(hi + 1))}
+        
+        pairs = [(stored[e], self._resolve(stored[e], r)) for e, r in readings.items() if e in stored]
+        meta = self._current_metadata()
+        replace_readings(self.store, [new for _, new in pairs])
+        
+        if meta is not None and not hasattr(self.store, 'metadata'):
+            for old, new in pairs:
+                meta.replace(old, new)
+            self._write_metadata(meta)
+    
+    def _materialize(self, readings: List[Dict[str, Any]]) -> None:
+        """Fold appended readings into the materialized statistics."""
+        if self.materialized is None:
+            return
+        try:
+            self.materialized.add(readings, stored=lambda: self.store.iter_range())
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not update materialized statistics: {e}")
+    
+    def _prune_if_due(self) -> bool:
+        """Apply retention to an append-only store when it is cheap to do so.
+        
+        Segment stores unlink expired segments, checked only when the
+        cutoff crosses into a new segment. Single-file stores are rewritten
+        once their head is past the cutoff.
+        """
+        if self.window_days <= 0 or isinstance(self.store, JournaledStore):
+            # Journaled stores apply retention when compacted
+            return True
+        
+        cutoff = self._retention_cutoff()
+        
+        if isinstance(self.store, SegmentStore):
+            segment = self.store.segment_name(cutoff.isoformat())
+            if segment != self._retained_since:
+                self._drop_before(cutoff)
+                self.compress_cold()
+                self._retained_since = segment
+            return True
+        
+        oldest = self.store.first_timestamp()
+        if oldest is None or oldest >= (cutoff - PRUNE_SLACK).isoformat():
+            return True
+        
+        if hasattr(self.store, 'drop_before'):
+            self._drop_before(cutoff)
+            return True
+        
+        data = self.load_data()
+        return self.save_data(self.prune_data(data))
+    
+    def _drop_before(self, cutoff: datetime) -> None:
+        """Drop expired readings in place, keeping the metadata in step."""
+        dropped: List[Dict[str, Any]] = []
+        
+        if hasattr(self.store, 'metadata'):
+            # Store computes its own statistics, no sidecar to adjust
+            self.store.drop_before(cutoff, on_drop=self._on_drop(dropped))
+        else:
+            meta = self._current_metadata()
+            self.store.drop_before(cutoff, on_drop=dropped.extend)
+            
+            if dropped and meta is not None:
+                meta.remove(dropped, self.store.first_timestamp())
+                self._write_metadata(meta)
+            elif dropped:
+                self.rebuild_metadata()
+        
+        if self._stored is not None:
+            first = to_epoch_us(self.store.first_timestamp() or '')
+            if first is None:
+                self._stored = TimestampSet()
+            else:
+                self._stored.drop_before(first)
+            self._stored_version = store_version(self.store)
+        
+        if self.tiers is not None:
+            self.tiers.demote(dropped)
+    
+    def compress_cold(self) -> int:
+        """Compress segments older than compress_after_days.
+        
+        The hot tail stays uncompressed so appends remain cheap; readers
+        decompress cold segments transparently.
+        
+        Returns:
+            Number of segments compressed
+        """
+        store = self.store.main if isinstance(self.store, JournaledStore) else self.store
+        if self.compress_after_days <= 0 or not hasattr(store, 'compress_before'):
+            return 0
+        
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.compress_after_days)
+        meta = self._current_metadata()
+        
+        try:
+            compressed = store.compress_before(cutoff, self.compression)
+        except Exception as e:
+            print(f"Error compressing cold data in {self.data_file}: {e}")
+            return 0
+        
+        # Compression only changes the size, so the sidecar stays valid
+        if compressed and meta is not None:
+            self._write_metadata(meta)
+        return compressed
+    
+    def _enforce_quota(self, size: Optional[int] = None) -> bool:
+        """Bring the data store back under max_bytes once it outgrows it.
+        
+        Checking is free on append: the size is the running total kept in
+        the metadata. Over budget, cold segments are compressed first; if
+        that is not enough, the oldest readings (whole segments for the
+        segments backend) are dropped until the store is within
+        QUOTA_TARGET of the budget, demoted to the rollup tiers if enabled.
+        
+        Args:
+            size: Current size of the data store, if already known
+        
+        Returns:
+            True if the store is within budget or was trimmed, False on error
+        """
+        if self.max_bytes <= 0:
+            return True
+        
+        store = self.store.main if isinstance(self.store, JournaledStore) else self.store
+        if size is None:
+            size = store.size_bytes()
+        if size <= self.max_bytes:
+            return True
+        
+        self._index = None
+        self._stored = None
+        self._meta_cache = None
+        initial = size
+        try:
+            if hasattr(store, 'compress_before'):
+                # Compress everything but the segment being appended to
+                meta = self._current_metadata()
+                if store.compress_before(datetime.now(timezone.utc), self.compression):
+                    size = store.size_bytes()
+                    if meta is not None:
+                        self._write_metadata(meta)
+            
+            if size > self.max_bytes:
+                cutoff = self._quota_cutoff(store, size)
+                if cutoff is not None:
+                    self._drop_oldest(cutoff)
+                if hasattr(store, 'vacuum'):
+                    store.vacuum()
+                size = store.size_bytes()
+        except Exception as e:
+            print(f"Error enforcing storage quota on {self.data_file}: {e}")
+            return False
+        
+        print(f"Storage quota: trimmed {self.data_file} from {initial} to {size} bytes "
+              f"(max {self.max_bytes})")
+        return True
+    
+    def _quota_cutoff(self, store: ReadingStore, size: int) -> Optional[datetime]:
+        """Return the time to drop readings before to fit QUOTA_TARGET.
+        
+        Assumes readings cost about the same number of bytes each. The
+        newest reading (and the newest segment) is always kept.
+        """
+        meta = self._current_metadata()
+        count = meta.count if meta is not None else sum(1 for _ in store.iter_range())
+        if count <= 1:
+            return None
+        
+        excess = size - int(self.max_bytes * QUOTA_TARGET)
+        skip = min(count - 1, -(-excess * count // size))
+        first_kept = next(islice(store.iter_range(), skip, None), None)
+        if first_kept is None:
+            return None
+        cutoff = to_utc_datetime(first_kept['timestamp'])
+        
+        if isinstance(store, SegmentStore):
+            segments = store.segments()
+            name = store.segment_name(first_kept['timestamp'])
+            span = store.segment_span(store.path / name)
+            newest = store.segment_span(segments[-1]) if segments else None
+            if span is not None and newest is not None:
+                cutoff = min(span[1], newest[0])
+        if self.tiers is not None:
+            # As with retention, never split a bucket between raw data and rollups
+            cutoff = self.tiers.align(cutoff)
+        return cutoff
+    
+    def _drop_oldest(self, cutoff: datetime) -> None:
+        """Drop readings older than cutoff, demoting them if rollups are on."""
+        if isinstance(self.store, JournaledStore):
+            dropped: List[Dict[str, Any]] = []
+            self._meta_cache = None
+            self.store.compact(cutoff, on_drop=self._on_drop(dropped),
+                               on_fold=self._on_fold())
+            if self.tiers is not None:
+                self.tiers.demote(dropped)
+        elif hasattr(self.store, 'drop_before'):
+            self._drop_before(cutoff)
+        else:
+            self.save_data(self.prune_data(self.load_data(), cutoff))
+    
+    def _on_drop(self, dropped: List[Dict[str, Any]]) -> Optional[Callable]:
+        """Return a callback collecting dropped readings, if they are needed."""
+        return dropped.extend if self.tiers is not None else None
+    
+    def _on_fold(self) -> Optional[Callable]:
+        """Return a callback materializing flushed readings, if buffered."""
+        return self._materialize if self.buffered and self.materialized is not None else None
     
-    def prune_data(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _retention_cutoff(self) -> datetime:
+        """Return the oldest time raw readings are retained from.
+        
+        With rollups the cutoff is aligned to a 5-minute boundary so a
+        bucket is never split between raw data and its aggregate.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.window_days)
+        if self.tiers is not None:
+            cutoff = self.tiers.align(cutoff)
+        return cutoff
+    
+    def prune_data(self, data: List[Dict[str, Any]],
+                   cutoff: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Remove data older than the retention window.
         
+        With rollups enabled, removed readings are demoted to the 5-minute
+        tier rather than discarded.
+        
         Args:
             data: List of sensor readings
+            cutoff: Oldest time to keep (default: the retention cutoff)
             
         Returns:
             Pruned list with only recent data
         """
-        if not data or self.window_days <= 0:
+        if not data or (cutoff is None and self.window_days <= 0):
             return data
         
         # Calculate cutoff timestamp
-        cutoff_time = datetime.now(timezone.utc) - timedelta(days=self.window_days)
-        cutoff_iso = cutoff_time.isoformat()
+        cutoff_time = cutoff if cutoff is not None else self._retention_cutoff()
         
-        # Filter data to keep only recent readings
-        pruned_data = []
-        for reading in data:
-            timestamp = reading.get('timestamp', '')
-            if timestamp >= cutoff_iso:
-                pruned_data.append(reading)
+        # Bisect to the first reading inside the window, reusing the index
+        # when data is the stored list it was built from
+        if self._index_covers(data):
+            expired, kept = self._index.range(end=cutoff_time), self._index.range(cutoff_time)
+        elif all(data[i].get('timestamp', '') <= data[i + 1].get('timestamp', '')
+                 for i in range(len(data) - 1)):
+            split = bisect_readings(data, cutoff_time)
+            expired, kept = data[:split], data[split:]
+        else:
+            index = TimestampIndex(data)
+            expired, kept = index.range(end=cutoff_time), index.range(cutoff_time)
+        
+        if self.tiers is not None:
+            self.tiers.demote(expired)
+        return kept
+    
+    def _index_covers(self, data: List[Dict[str, Any]]) -> bool:
+        """Return True if the current index holds exactly these readings."""
+        if not self._index_current() or len(self._index) != len(data):
+            return False
+        return all(a is b for a, b in zip(self._index.readings, data))
+    
+    def rollups(self, resolution: str = "1h", start: TimeBound = None,
+                end: TimeBound = None) -> List[Dict[str, Any]]:
+        """Get downsampled history from a rollup tier.
+        
+        Args:
+            resolution: "5m" or "1h"
+            start: Inclusive lower bound on the bucket start, or None
+            end: Exclusive upper bound on the bucket start, or None
+            
+        Returns:
+            Rollup records with per-metric mean/min/max/count, or an empty
+            list if rollups are disabled
+        """
+        if self.tiers is None:
+            return []
+        start_dt = to_utc_datetime(start) if start is not None else None
+        end_dt = to_utc_datetime(end) if end is not None else None
+        return self.tiers.load_range(resolution, start_dt, end_dt)
+    
+    def aggregate(self, start: TimeBound = None, end: TimeBound = None, bucket: str = "1h",
+                  metrics: Sequence[str] = METRICS,
+                  funcs: Sequence[str] = AGGREGATE_FUNCS) -> List[Dict[str, Any]]:
+        """Compute bucketed aggregates of readings with start <= timestamp < end.
+        
+        Runs as a single streaming pass that keeps only per-bucket running
+        totals. SQLite aggregates in SQL and the columnar store reads its
+        column maps directly, so neither builds reading dicts. History
+        that has aged out of the raw window is served from the rollup
+        tiers no coarser than the bucket.
+        
+        Args:
+            start: Inclusive lower bound, or None for no bound
+            end: Exclusive upper bound, or None for no bound
+            bucket: Bucket length, "5m", "1h" or "1d" (UTC aligned)
+            metrics: Metrics to aggregate
+            funcs: Aggregates per metric: "mean", "min", "max", "count"
+            
+        Returns:
+            One record per bucket, sorted by bucket start, with the bucket
+            start as 'timestamp' and a dict of aggregates (or None if the
+            bucket had no values) per metric
+            
+        Raises:
+            ValueError: If the bucket, a metric or a func is unknown
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket!r}, must be one of {', '.join(BUCKETS)}")
+        unknown = ([m for m in metrics if m not in METRICS]
+                   + [f for f in funcs if f not in AGGREGATE_FUNCS])
+        if unknown:
+            raise ValueError(f"Unknown metric or aggregate {unknown[0]!r}")
+        
+        aggregator = Aggregator(BUCKETS[bucket], metrics)
+        start_dt = to_utc_datetime(start) if start is not None else None
+        end_dt = to_utc_datetime(end) if end is not None else None
+        
+        try:
+            if self.tiers is not None:
+                # Rollup buckets all end before the oldest raw reading
+                oldest = self.store.first_timestamp()
+                tier_end = to_utc_datetime(oldest) if oldest else end_dt
+                if end_dt is not None and tier_end is not None:
+                    tier_end = min(tier_end, end_dt)
+                for resolution, seconds in ROLLUP_RESOLUTIONS.items():
+                    if seconds <= BUCKETS[bucket]:
+                        for record in self.tiers.load_range(resolution, start_dt, tier_end):
+                            aggregator.add(record)
+            
+            if hasattr(self.store, 'accumulate'):
+                self.store.accumulate(aggregator, start_dt, end_dt)
+            elif self.store.exists():
+                for reading in self.store.iter_range(start_dt, end_dt):
+                    if isinstance(reading, dict):
+                        aggregator.add(reading)
+                        
+        except StorageFormatError:
+            print(f"Warning: {self.data_file} contains invalid data format")
+            return []
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error aggregating data from {self.data_file}: {e}")
+            return []
+        
+        return aggregator.results(funcs)
+    
+    def bucket_stats(self, when: TimeBound, resolution: str = "1d") -> Optional[Dict[str, Any]]:
+        """Get the materialized statistics of the hour or day holding a time.
+        
+        A lookup in the running statistics kept by materialize_stats; past
+        buckets are never recomputed, even after their raw readings have
+        aged out.
+        
+        Args:
+            when: Any time inside the bucket
+            resolution: "1h" or "1d"
+            
+        Returns:
+            Bucket start as 'timestamp' and per-metric count, mean, std,
+            min and max (None for a metric with no values), or None if
+            the bucket has no readings or statistics are not materialized
+        """
+        if self.materialized is None:
+            return None
+        return self.materialized.resolution(resolution).get(when)
+    
+    def bucket_stats_range(self, start: TimeBound = None, end: TimeBound = None,
+                           resolution: str = "1d") -> List[Dict[str, Any]]:
+        """Get materialized statistics of buckets starting in [start, end)."""
+        if self.materialized is None:
+            return []
+        return self.materialized.resolution(resolution).load_range(start, end)
+    
+    def range(self, start: TimeBound = None, end: TimeBound = None) -> List[Dict[str, Any]]:
+        """Get readings with start <= timestamp < end.
+        
+        The first query builds a sorted epoch timestamp index over the
+        stored readings; later queries bisect it in O(log N + k) until the
+        store's files change, by this or another process. Stores with
+        native range reads (segments, columnar) only load the part of the
+        data overlapping the range.
         
-        return pruned_data
+        Args:
+            start: Inclusive lower bound (datetime, ISO string or epoch
+                microseconds), or None for no bound
+            end: Exclusive upper bound, or None for no bound
+            
+        Returns:
+            List of readings in the range, in time order
+        """
+        if not self._index_current() and self.store.supports_range_reads:
+            start_dt = to_utc_datetime(start) if start is not None else None
+            end_dt = to_utc_datetime(end) if end is not None else None
+            return TimestampIndex(self._load_range(start_dt, end_dt)).range(start, end)
+        
+        return self.get_index().range(start, end)
+    
+    def get_index(self) -> TimestampIndex:
+        """Return the timestamp index over all stored readings."""
+        if not self._index_current():
+            # Fingerprint first, so a write during the load forces a rebuild
+            version = store_version(self.store)
+            self._index = TimestampIndex(self.load_data())
+            self._index_version = version
+        return self._index
+    
+    def _index_current(self) -> bool:
+        """Return True if the index was built from the store as it is now."""
+        return self._index is not None and self._index_version == store_version(self.store)
     
     def get_recent_data(self, days: int) -> List[Dict[str, Any]]:
         """Get data from the last N days.
@@ -155,63 +868,404 @@ class DataLogger:
         Returns:
             List of readings from the specified time period
         """
-        data = self.load_data()
-        
         if days <= 0:
-            return data
+            return self.load_data()
         
         # Calculate cutoff timestamp
         cutoff_time = datetime.now(timezone.utc) - timedelta(days=days)
-        cutoff_iso = cutoff_time.isoformat()
         
-        # Filter data
-        recent_data = []
-        for reading in data:
-            timestamp = reading.get('timestamp', '')
-            if timestamp >= cutoff_iso:
-                recent_data.append(reading)
+        return self.range(cutoff_time)
+    
+    def latest(self, n: int = 1) -> List[Dict[str, Any]]:
+        """Get the newest readings without parsing the whole history.
         
-        return recent_data
+        Line formats read backwards from the end of the store. The JSON
+        array format is served from the tail kept in the metadata sidecar
+        when it matches the data, and falls back to a full load only with
+        a stale sidecar or n beyond the sidecar's tail.
+        
+        Args:
+            n: Number of readings to return
+            
+        Returns:
+            Up to n newest readings, oldest first
+        """
+        if n <= 0 or not self.store.exists():
+            return []
+        
+        try:
+            if hasattr(self.store, 'tail'):
+                return self.store.tail(n)
+            
+            meta = self._current_metadata()
+            if meta is not None and (n <= len(meta.tail) or len(meta.tail) >= meta.count):
+                return meta.tail[-n:]
+            
+            data = self.load_data()
+            self._write_metadata(DataMetadata.from_readings(data))
+            return data[-n:]
+            
+        except StorageFormatError:
+            print(f"Warning: {self.data_file} contains invalid data format")
+            return []
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error reading latest readings from {self.data_file}: {e}")
+            return []
     
     def get_data_stats(self) -> Dict[str, Any]:
         """Get statistics about the data file.
         
+        Served from the metadata sidecar, which is rebuilt with a full
+        load only when it is missing or does not match the data size.
+        
         Returns:
             Dictionary with data statistics
         """
-        data = self.load_data()
+        meta = self._current_metadata()
+        if meta is None:
+            meta = self.rebuild_metadata()
         
-        if not data:
+        if meta.count == 0:
             return {
                 "total_readings": 0,
-                "file_exists": self.data_file.exists(),
+                "file_exists": self.store.exists(),
                 "file_size_bytes": 0,
                 "oldest_reading": None,
                 "newest_reading": None,
-                "days_covered": 0
+                "days_covered": 0,
+                "null_counts": meta.null_counts
             }
         
-        timestamps = [r.get('timestamp', '') for r in data if r.get('timestamp')]
-        timestamps.sort()
-        
         # Calculate days covered
         days_covered = 0
-        if len(timestamps) >= 2:
+        if meta.first_timestamp and meta.last_timestamp:
             try:
-                oldest = datetime.fromisoformat(timestamps[0].replace('Z', '+00:00'))
-                newest = datetime.fromisoformat(timestamps[-1].replace('Z', '+00:00'))
+                oldest = datetime.fromisoformat(meta.first_timestamp.replace('Z', '+00:00'))
+                newest = datetime.fromisoformat(meta.last_timestamp.replace('Z', '+00:00'))
                 days_covered = (newest - oldest).days
             except ValueError:
                 pass
         
         return {
-            "total_readings": len(data),
-            "file_exists": self.data_file.exists(),
-            "file_size_bytes": self.data_file.stat().st_size if self.data_file.exists() else 0,
-            "oldest_reading": timestamps[0] if timestamps else None,
-            "newest_reading": timestamps[-1] if timestamps else None,
-            "days_covered": days_covered
+            "total_readings": meta.count,
+            "file_exists": self.store.exists(),
+            "file_size_bytes": meta.size_bytes,
+            "oldest_reading": meta.first_timestamp,
+            "newest_reading": meta.last_timestamp,
+            "days_covered": days_covered,
+            "null_counts": meta.null_counts
         }
+    
+    def rebuild_metadata(self) -> DataMetadata:
+        """Recompute the metadata sidecar from a full load of the data.
+        
+        Returns:
+            The rebuilt metadata
+        """
+        meta = DataMetadata.from_readings(self.load_data())
+        self._write_metadata(meta)
+        return meta
+    
+    def _current_metadata(self) -> Optional[DataMetadata]:
+        """Return the sidecar metadata if it matches the stored data.
+        
+        A sidecar this logger wrote and nothing has replaced since is
+        trusted without measuring the store; other writers going through
+        a DataLogger rewrite the sidecar too.
+        """
+        if hasattr(self.store, 'metadata'):
+            return self.store.metadata()
+        
+        if self._meta_cache is not None and self._meta_cache[0] == path_version(self.meta_file):
+            # Nothing rewrote the sidecar since this logger did, and its size
+            # was advanced by the bytes written; no need to measure the store
+            return DataMetadata.from_dict(self._meta_cache[1])
+        
+        meta = read_metadata(self.meta_file)
+        if meta is None or meta.size_bytes != self.store.size_bytes():
+            return None
+        return meta
+    
+    def _write_metadata(self, meta: DataMetadata, grown: Optional[int] = None) -> None:
+        """Record the current data size in the metadata and persist it.
+        
+        Args:
+            meta: Metadata matching the stored data
+            grown: Bytes just appended to the store, if known; the recorded
+                size is advanced by this instead of measuring the store
+        """
+        meta.size_bytes = self.store.size_bytes() if grown is None else meta.size_bytes + grown
+        if not self.store.exists() or hasattr(self.store, 'metadata'):
+            return
+        if hasattr(self.store, 'tail'):
+            # Line formats serve latest() from the end of the file
+            meta.tail = []
+        
+        try:
+            write_metadata(self.meta_file, meta)
+            self._meta_cache = (path_version(self.meta_file), meta.to_dict())
+        except OSError as e:
+            self._meta_cache = None
+            print(f"Warning: Could not write metadata to {self.meta_file}: {e}")
+    
+    def compact(self, publish_file: Optional[Path] = None) -> bool:
+        """Fold the journal into the data file, prune it and publish it.
+        
+        Meant to run from a schedule (run_cycle.sh or cron) rather than
+        on every reading. Without a journal this just applies retention.
+        With a buffer_dir this is the flush that writes staged readings to
+        the data file; run it on an interval and before shutdown.
+        
+        Args:
+            publish_file: If given, export the compacted data to this JSON
+                array file for the dashboard
+            
+        Returns:
+            True if compaction (and publishing) succeeded, False otherwise
+        """
+        self._index = None
+        self._stored = None
+        self._meta_cache = None
+        cutoff = self._retention_cutoff() if self.window_days > 0 else None
+        dropped: List[Dict[str, Any]] = []
+        written = bytes_written()
+        
+        try:
+            if isinstance(self.store, JournaledStore):
+                folded = self.store.compact(cutoff, on_drop=self._on_drop(dropped),
+                                            on_fold=self._on_fold())
+                print(f"Compacted {folded} journaled readings into {self.data_file}")
+                if self.buffered:
+                    self.io_stats["readings_written"] += folded
+                if self.tiers is not None:
+                    self.tiers.demote(dropped)
+            elif cutoff is not None and self.store.exists():
+                data = self.store.load()
+                kept = self.prune_data(data)
+                if len(kept) != len(data):
+                    self.store.save(kept)
+        except Exception as e:
+            print(f"Error compacting {self.data_file}: {e}")
+            return False
+        
+        if not self._enforce_quota():
+            return False
+        self.rebuild_metadata()
+        self.compress_cold()
+        self.io_stats["bytes_written"] += bytes_written() - written
+        
+        if publish_file is not None and Path(publish_file) != self.data_file:
+            return self.export_json(publish_file)
+        return True
+    
+    def flush_due(self, max_age: timedelta) -> bool:
+        """Return True if the oldest buffered reading has waited max_age.
+        
+        Always False without a buffer_dir.
+        """
+        if not self.buffered:
+            return False
+        
+        pending = self.store.journal_readings()
+        oldest = to_epoch_us(pending[0].get('timestamp', '')) if pending else None
+        if oldest is None:
+            return bool(pending)
+        return to_epoch_us(datetime.now(timezone.utc) - max_age) >= oldest
+    
+    def bytes_per_reading(self) -> float:
+        """Return bytes written to the data files per reading stored so far.
+        
+        Counts appends, compaction and metadata writes made through this
+        logger; readings staged in a buffer_dir count once flushed.
+        """
+        readings = self.io_stats["readings_written"]
+        return self.io_stats["bytes_written"] / readings if readings else 0.0
+    
+    def export_json(self, dest_file: Path) -> bool:
+        """Export readings as a pretty-printed JSON array.
+        
+        The dashboard and schema expect the array format, so append-only
+        stores are converted with this before publishing. Readings are
+        streamed to the file one at a time; only a store holding
+        out-of-order readings is loaded whole to sort it.
+        
+        Args:
+            dest_file: Path of the JSON file to write
+            
+        Returns:
+            True if export successful, False otherwise
+        """
+        dest_file = Path(dest_file)
+        
+        try:
+            try:
+                atomic_write(dest_file, self._write_json_array, suffix='.json')
+            except _OutOfOrder:
+                data = self.load_data()
+                atomic_write(dest_file, lambda f: json.dump(data, f, indent=2), suffix='.json')
+            return True
+        except Exception as e:
+            print(f"Error exporting data to {dest_file}: {e}")
+            return False
+    
+    def _write_json_array(self, f) -> None:
+        """Stream readings as the same text json.dump(data, indent=2) writes.
+        
+        Raises:
+            _OutOfOrder: If the stored readings are not in time order
+        """
+        previous = None
+        separator = '[\n  '
+        for reading in self.iter_readings():
+            timestamp = reading.get('timestamp', '')
+            if previous is not None and timestamp < previous:
+                raise _OutOfOrder()
+            previous = timestamp
+            
+            f.write(separator)
+            f.write(json.dumps(reading, indent=2).replace('\n', '\n  '))
+            separator = ',\n  '
+        
+        f.write('[]' if previous is None else '\n]')
+
+
+class _OutOfOrder(Exception):
+    """Raised when a streamed export meets readings out of time order."""
+
+
+class GroupCommitLogger:
+    """Buffers appends in memory and commits them to a DataLogger in groups.
+    
+    The buffer is flushed with one append_readings() call once it holds
+    max_rows readings or its oldest reading has waited max_delay seconds.
+    Buffered readings are not visible to readers until flushed, so call
+    flush() (or use the logger as a context manager) before exiting.
+    """
+    
+    def __init__(self, data_logger: DataLogger, max_rows: int = 1000,
+                 max_delay: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize group commit buffer.
+        
+        Args:
+            data_logger: Logger the buffered readings are committed to
+            max_rows: Flush once this many readings are buffered
+            max_delay: Flush once the oldest buffered reading is this many
+                seconds old
+            clock: Monotonic time source in seconds
+        """
+        self.data_logger = data_logger
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._clock = clock
+        self._buffer: List[Dict[str, Any]] = []
+        self._buffered_since: Optional[float] = None
+    
+    @property
+    def pending(self) -> int:
+        """Number of buffered readings not yet committed."""
+        return len(self._buffer)
+    
+    def append_reading(self, reading: Dict[str, Any]) -> bool:
+        """Buffer a reading, flushing if a threshold is reached.
+        
+        Returns:
+            False if a triggered flush failed, True otherwise
+        """
+        return self.append_readings([reading])
+    
+    def append_readings(self, readings: Iterable[Dict[str, Any]]) -> bool:
+        """Buffer readings, flushing if a threshold is reached.
+        
+        Returns:
+            False if a triggered flush failed, True otherwise
+        """
+        if self._buffered_since is None:
+            self._buffered_since = self._clock()
+        self._buffer.extend(readings)
+        
+        if self.flush_due():
+            return self.flush()
+        return True
+    
+    def flush_due(self) -> bool:
+        """Return True if the buffer has reached a size or time threshold."""
+        if not self._buffer:
+            return False
+        return (len(self._buffer) >= self.max_rows
+                or self._clock() - self._buffered_since >= self.max_delay)
+    
+    def flush(self) -> bool:
+        """Commit all buffered readings with a single write.
+        
+        The buffer is kept on failure so the next flush retries it.
+        
+        Returns:
+            True if the buffer was committed, False otherwise
+        """
+        if not self._buffer:
+            return True
+        
+        if not self.data_logger.append_readings(self._buffer):
+            return False
+        
+        self._buffer = []
+        self._buffered_since = None
+        return True
+    
+    def __enter__(self) -> 'GroupCommitLogger':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+
+class SqliteDataLogger(DataLogger):
+    """DataLogger backed by a SQLite database in WAL mode.
+    
+    Appends are single-row INSERTs, range reads use the timestamp index
+    and retention is a DELETE, so other processes can read the database
+    concurrently. Statistics come from SQL aggregates instead of a
+    metadata sidecar.
+    """
+    
+    def __init__(self, data_file: Path, window_days: int = 60):
+        """Initialize SQLite data logger.
+        
+        Args:
+            data_file: Path to SQLite database file
+            window_days: Number of days of data to retain
+        """
+        super().__init__(data_file, window_days, storage_format="sqlite")
+    
+    def import_json(self, json_file: Path) -> int:
+        """Import readings from a data.json array file.
+        
+        Only readings newer than the newest stored reading are inserted,
+        so re-running the import after a partial run is harmless.
+        
+        Args:
+            json_file: Path to JSON array data file
+            
+        Returns:
+            Number of readings imported
+        """
+        data = self.prune_data(DataLogger(json_file, storage_format="json").load_data())
+        
+        newest = to_epoch_us(self.store.last_timestamp() or '')
+        if newest is not None:
+            data = TimestampIndex(data).range(newest + 1)
+        
+        try:
+            imported = self.store.append_many(data)
+        except Exception as e:
+            print(f"Error importing {json_file} into {self.data_file}: {e}")
+            return 0
+        
+        self._index = None
+        self._stored = None
+        self._meta_cache = None
+        return imported
 
 
 def load_data_from_file(file_path: Path) -> List[Dict[str, Any]]:
@@ -296,10 +1350,23 @@ def validate_data_integrity(file_path: Path) -> Dict[str, Any]:
     }
     
     try:
-        data = load_data_from_file(file_path)
-        results["total_readings"] = len(data)
+        previous = None
+        out_of_order = False
+        
+        store = create_store(Path(file_path))
+        if not store.exists():
+            return results
+        
+        # Stream the raw elements so validation runs in bounded memory;
+        # decode errors propagate to the handler below
+        if isinstance(store, JsonArrayStore):
+            elements = iter_json_array(store.path)
+        else:
+            elements = store.iter_range()
         
-        for i, reading in enumerate(data):
+        for i, reading in enumerate(elements):
+            results["total_readings"] += 1
+            
             # Check required fields
             if not isinstance(reading, dict):
                 results["errors"].append(f"Reading {i}: Not a dictionary")
@@ -324,10 +1391,13 @@ def validate_data_integrity(file_path: Path) -> Dict[str, Any]:
                     results["errors"].append(f"Reading {i}: {field} is not numeric")
             
             results["valid_readings"] += 1
+            
+            # Track chronological order
+            if previous is not None and reading["timestamp"] < previous:
+                out_of_order = True
+            previous = reading["timestamp"]
         
-        # Check chronological order
-        timestamps = [r.get("timestamp", "") for r in data]
-        if timestamps != sorted(timestamps):
+        if out_of_order:
             results["warnings"].append("Readings are not in chronological order")
         
     except Exception as e:
@@ -336,4 +1406,123 @@ def validate_data_integrity(file_path: Path) -> Dict[str, Any]:
     
     results["valid"] = len(results["errors"]) == 0
     
-    return results
\ No newline at end of file
+    return results
+
+
+def export_data_file(src_file: Path, dest_file: Path,
+                     storage_format: Optional[str] = None) -> bool:
+    """Convert a data file of any storage format to the JSON array format.
+    
+    Args:
+        src_file: Path to source data file
+        dest_file: Path to JSON file to write
+        storage_format: Source storage format, or None to infer from suffix
+        
+    Returns:
+        True if export successful, False otherwise
+    """
+    logger = DataLogger(src_file, storage_format=storage_format)
+    return logger.export_json(dest_file)
+
+
+def main():
+    """Command line entry point for data file maintenance."""
+    parser = argparse.ArgumentParser(description="Aquaponics data file maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser(
+        "export", help="Export a data file to the dashboard JSON array format")
+    export_parser.add_argument("src", type=Path, help="Source data file")
+    export_parser.add_argument("dest", type=Path, help="Destination JSON file")
+    export_parser.add_argument("--format", choices=STORAGE_FORMATS,
+                               help="Source storage format (default: from suffix)")
+    
+    meta_parser = subparsers.add_parser(
+        "rebuild-meta", help="Rebuild the metadata sidecar of a data file")
+    meta_parser.add_argument("data_file", type=Path, help="Data file or segment directory")
+    meta_parser.add_argument("--format", choices=STORAGE_FORMATS,
+                             help="Storage format (default: from suffix)")
+    
+    compact_parser = subparsers.add_parser(
+        "compact", help="Fold the write-ahead journal into a data file and prune it")
+    compact_parser.add_argument("data_file", type=Path, help="Data file or store directory")
+    compact_parser.add_argument("--format", choices=STORAGE_FORMATS,
+                                help="Storage format (default: from suffix)")
+    compact_parser.add_argument("--window-days", type=int, default=60,
+                                help="Days of data to retain (default: 60)")
+    compact_parser.add_argument("--publish", type=Path,
+                                help="Also export the result to this JSON array file")
+    compact_parser.add_argument("--rollup-days", type=int, default=0,
+                                help="Demote expired readings to 5-minute aggregates "
+                                     "kept this many days (default: 0, off)")
+    compact_parser.add_argument("--hourly-days", type=int, default=3650,
+                                help="Days to keep hourly aggregates (default: 3650)")
+    compact_parser.add_argument("--compress-after-days", type=int, default=0,
+                                help="Compress segments older than this (default: 0, off)")
+    compact_parser.add_argument("--compression", choices=COMPRESSION_SUFFIXES, default="gzip",
+                                help="Cold segment compression (default: gzip)")
+    compact_parser.add_argument("--buffer-dir", type=Path,
+                                help="Flush readings staged in this RAM directory")
+    compact_parser.add_argument("--max-bytes", type=int, default=0,
+                                help="Byte budget of the data store (default: 0, unlimited)")
+    
+    latest_parser = subparsers.add_parser(
+        "latest", help="Print the newest readings of a data file as JSON Lines")
+    latest_parser.add_argument("data_file", type=Path, help="Data file or store directory")
+    latest_parser.add_argument("-n", type=int, default=1,
+                               help="Number of readings to print (default: 1)")
+    latest_parser.add_argument("--format", choices=STORAGE_FORMATS,
+                               help="Storage format (default: from suffix)")
+    
+    merge_parser = subparsers.add_parser(
+        "merge", help="Append every reading of one data file to another")
+    merge_parser.add_argument("src", type=Path, help="Source data file")
+    merge_parser.add_argument("dest", type=Path, help="Destination data file")
+    merge_parser.add_argument("--window-days", type=int, default=60,
+                              help="Days of data to retain (default: 60)")
+    merge_parser.add_argument("--dedup", choices=DEDUP_POLICIES,
+                              help="Policy for readings already in dest (default: append)")
+    
+    import_parser = subparsers.add_parser(
+        "import-sqlite", help="Import a data.json array file into a SQLite database")
+    import_parser.add_argument("src", type=Path, help="Source JSON array data file")
+    import_parser.add_argument("dest", type=Path, help="SQLite database file")
+    import_parser.add_argument("--window-days", type=int, default=60,
+                               help="Days of data to retain (default: 60)")
+    
+    args = parser.parse_args()
+    
+    if args.command == "export":
+        success = export_data_file(args.src, args.dest, args.format)
+        sys.exit(0 if success else 1)
+    
+    if args.command == "rebuild-meta":
+        meta = DataLogger(args.data_file, storage_format=args.format).rebuild_metadata()
+        print(f"Rebuilt metadata: {meta.count} readings, {meta.size_bytes} bytes")
+    
+    if args.command == "compact":
+        data_logger = DataLogger(args.data_file, args.window_days,
+                                 storage_format=args.format, journal=True,
+                                 rollup_days=args.rollup_days, hourly_days=args.hourly_days,
+                                 compress_after_days=args.compress_after_days,
+                                 compression=args.compression, buffer_dir=args.buffer_dir,
+                                 max_bytes=args.max_bytes)
+        sys.exit(0 if data_logger.compact(args.publish) else 1)
+    
+    if args.command == "latest":
+        for reading in DataLogger(args.data_file, storage_format=args.format).latest(args.n):
+            print(json.dumps(reading))
+    
+    if args.command == "merge":
+        readings = DataLogger(args.src).load_data()
+        if not DataLogger(args.dest, args.window_days, dedup=args.dedup).append_readings(readings):
+            sys.exit(1)
+        print(f"Merged {len(readings)} readings into {args.dest}")
+    
+    if args.command == "import-sqlite":
+        imported = SqliteDataLogger(args.dest, args.window_days).import_json(args.src)
+        print(f"Imported {imported} readings into {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Materialized Bucket Statistics
+==============================
+
+Running per-hour and per-day statistics maintained on every append, so
+the average, standard deviation and extremes of any past hour or day are
+a lookup instead of a scan. They are kept next to the data file and
+outlive raw readings dropped by retention.
+
+Each resolution is a JSON Lines file of bucket records:
+
+    {"timestamp": "2024-01-15T00:00:00+00:00",
+     "ph": {"count": 48, "sum": 331.2, "sumsq": 2285.3, "min": 6.8, "max": 7.0}, ...}
+
+Only the last line, the open (newest) bucket, is ever rewritten. Older
+buckets are sealed: readings that arrive late for them are appended as
+delta records that reads merge by bucket start, so a sealed bucket is
+never recomputed.
+"""
+
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+
+try:
+    from .index import TimeBound, bound_epoch_us, to_epoch_us, from_epoch_us
+    from .rollup import HOURLY, DAILY
+    from .storage import METRICS, JsonLinesStore, read_last_record, rewrite_tail
+except ImportError:
+    # Handle running as script
+    from index import TimeBound, bound_epoch_us, to_epoch_us, from_epoch_us
+    from rollup import HOURLY, DAILY
+    from storage import METRICS, JsonLinesStore, read_last_record, rewrite_tail
+
+MATERIALIZED_RESOLUTIONS = {"1h": HOURLY, "1d": DAILY}
+
+# Running statistics of one metric in one bucket
+Moments = Dict[str, float]
+
+
+def _merge(into: Dict[str, Moments], metric: str, moments: Moments) -> None:
+    """Merge running statistics of a metric into a bucket."""
+    entry = into.get(metric)
+    if entry is None:
+        into[metric] = dict(moments)
+        return
+    entry["count"] += moments["count"]
+    entry["sum"] += moments["sum"]
+    entry["sumsq"] += moments["sumsq"]
+    entry["min"] = min(entry["min"], moments["min"])
+    entry["max"] = max(entry["max"], moments["max"])
+
+
+def bucket_stats(moments: Optional[Moments]) -> Optional[Dict[str, Any]]:
+    """Turn running statistics into count, mean, population std, min and max."""
+    if not moments or not moments["count"]:
+        return None
+    count = moments["count"]
+    mean = moments["sum"] / count
+    variance = max(0.0, moments["sumsq"] / count - mean * mean)
+    return {
+        "count": count,
+        "mean": mean,
+        "std": math.sqrt(variance),
+        "min": moments["min"],
+        "max": moments["max"],
+    }
+
+
+class MaterializedRollup:
+    """One resolution of incrementally maintained bucket statistics."""
+    
+    def __init__(self, path: Path, bucket_seconds: int):
+        """Initialize materialized rollup.
+        
+        Args:
+            path: JSON Lines file of bucket records
+            bucket_seconds: Bucket length in seconds
+        """
+        self.path = Path(path)
+        self.bucket_us = bucket_seconds * 1_000_000
+        self._cache: Optional[Tuple[int, int, Dict[int, Dict[str, Moments]]]] = None
+    
+    def exists(self) -> bool:
+        return self.path.exists()
+    
+    def _partials(self, readings: Iterable[Dict[str, Any]]) -> Dict[int, Dict[str, Moments]]:
+        """Accumulate readings into per-bucket running statistics."""
+        buckets: Dict[int, Dict[str, Moments]] = {}
+        for reading in readings:
+            epoch_us = to_epoch_us(reading.get('timestamp', ''))
+            if epoch_us is None:
+                continue
+            bucket = buckets.setdefault(epoch_us - epoch_us % self.bucket_us, {})
+            for metric in METRICS:
+                value = reading.get(metric)
+                if isinstance(value, (int, float)):
+                    _merge(bucket, metric, {"count": 1, "sum": value, "sumsq": value * value,
+                                            "min": value, "max": value})
+        return buckets
+    
+    def _open_bucket(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Return the byte offset and record of the open (last) bucket."""
+        offset, record = read_last_record(self.path)
+        if record is None or to_epoch_us(record.get('timestamp', '')) is None:
+            return offset, None
+        return offset, record
+    
+    def add(self, readings: Iterable[Dict[str, Any]]) -> int:
+        """Fold readings into the bucket statistics.
+        
+        The open bucket's line is rewritten in place; newer buckets are
+        appended after it and readings for sealed buckets are written as
+        delta records before it.
+        
+        Returns:
+            Number of bucket records written
+        """
+        partials = self._partials(readings)
+        if not partials:
+            return 0
+        
+        offset, open_record = self._open_bucket()
+        open_us = None if open_record is None else to_epoch_us(open_record['timestamp'])
+        
+        records = []
+        for start_us in sorted(partials):
+            if open_us is not None and start_us < open_us:
+                records.append(self._record(start_us, partials[start_us]))
+        if open_record is not None:
+            for metric, moments in partials.get(open_us, {}).items():
+                _merge(open_record, metric, moments)
+            records.append(open_record)
+        for start_us in sorted(partials):
+            if open_us is None or start_us > open_us:
+                records.append(self._record(start_us, partials[start_us]))
+        
+        rewrite_tail(self.path, offset, records)
+        return len(records)
+    
+    @staticmethod
+    def _record(start_us: int, moments: Dict[str, Moments]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"timestamp": from_epoch_us(start_us).isoformat()}
+        record.update(moments)
+        return record
+    
+    def buckets(self) -> Dict[int, Dict[str, Moments]]:
+        """Return merged running statistics keyed on bucket start.
+        
+        The file is parsed again only when it changes, so repeated lookups
+        are dict reads.
+        """
+        if not self.path.exists():
+            return {}
+        
+        stat = os.stat(self.path)
+        if self._cache is not None and self._cache[:2] == (stat.st_mtime_ns, stat.st_size):
+            return self._cache[2]
+        
+        buckets: Dict[int, Dict[str, Moments]] = {}
+        for record in JsonLinesStore(self.path).iter_file():
+            start_us = to_epoch_us(record.get('timestamp', ''))
+            if start_us is None:
+                continue
+            bucket = buckets.setdefault(start_us, {})
+            for metric in METRICS:
+                if isinstance(record.get(metric), dict):
+                    _merge(bucket, metric, record[metric])
+        
+        self._cache = (stat.st_mtime_ns, stat.st_size, buckets)
+        return buckets
+    
+    def get(self, when: TimeBound) -> Optional[Dict[str, Any]]:
+        """Return the statistics of the bucket holding a time, if any."""
+        epoch_us = bound_epoch_us(when)
+        bucket = self.buckets().get(epoch_us - epoch_us % self.bucket_us)
+        if bucket is None:
+            return None
+        return self._stats(epoch_us - epoch_us % self.bucket_us, bucket)
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Return statistics of buckets starting in [start, end), oldest first."""
+        lo = None if start is None else bound_epoch_us(start)
+        hi = None if end is None else bound_epoch_us(end)
+        buckets = self.buckets()
+        return [
+            self._stats(start_us, buckets[start_us]) for start_us in sorted(buckets)
+            if (lo is None or start_us >= lo) and (hi is None or start_us < hi)
+        ]
+    
+    @staticmethod
+    def _stats(start_us: int, bucket: Dict[str, Moments]) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"timestamp": from_epoch_us(start_us).isoformat()}
+        for metric in METRICS:
+            stats[metric] = bucket_stats(bucket.get(metric))
+        return stats
+
+
+class MaterializedRollups:
+    """Hourly and daily statistics kept next to a data file."""
+    
+    def __init__(self, data_file: Path):
+        """Initialize materialized rollups.
+        
+        Args:
+            data_file: Data file the rollup files sit next to
+        """
+        self.rollups = {
+            name: MaterializedRollup(Path(f"{data_file}.stats-{name}.jsonl"), seconds)
+            for name, seconds in MATERIALIZED_RESOLUTIONS.items()
+        }
+    
+    def add(self, readings: List[Dict[str, Any]],
+            stored: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None) -> None:
+        """Fold newly appended readings into every resolution.
+        
+        Args:
+            readings: Readings just appended to the data file
+            stored: Optional callback yielding every stored reading
+                (including the new ones), used once to seed a resolution
+                whose file does not exist yet
+        """
+        for rollup in self.rollups.values():
+            if stored is not None and not rollup.exists():
+                rollup.add(stored())
+            else:
+                rollup.add(readings)
+    
+    def resolution(self, name: str) -> MaterializedRollup:
+        """Return one resolution ("1h" or "1d")."""
+        if name not in self.rollups:
+            raise ValueError(f"Unknown resolution {name!r}, "
+                             f"must be one of {', '.join(self.rollups)}")
+        return self.rollups[name]
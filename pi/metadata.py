@@ -0,0 +1,146 @@
+"""
+Data File Metadata Sidecar
+==========================
+
+Small JSON record kept next to the data file with the reading count,
+first/last timestamps, per-metric null counts and the data size. It is
+updated on every append and prune so statistics never need a full load.
+For the JSON array format, which cannot be read from the end, it also
+holds the newest few readings for latest-reading queries.
+"""
+
+import json
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+try:
+    from .storage import METRICS, atomic_write
+except ImportError:
+    # Handle running as script
+    from storage import METRICS, atomic_write
+
+METADATA_VERSION = 1
+
+# Newest readings kept in a JSON array store's sidecar for latest-reading queries
+TAIL_ROWS = 16
+
+
+def metadata_path(data_file: Path) -> Path:
+    """Return the sidecar path for a data file or segment directory."""
+    return Path(str(data_file) + '.meta.json')
+
+
+class DataMetadata:
+    """Running summary of the readings held in a store."""
+    
+    def __init__(self):
+        """Initialize empty metadata."""
+        self.count = 0
+        self.first_timestamp: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+        self.null_counts: Dict[str, int] = {metric: 0 for metric in METRICS}
+        self.size_bytes = 0
+        self.tail: List[Dict[str, Any]] = []
+    
+    @classmethod
+    def from_readings(cls, readings: List[Dict[str, Any]]) -> 'DataMetadata':
+        """Build metadata from a full list of readings."""
+        meta = cls()
+        for reading in readings:
+            meta.add(reading)
+        return meta
+    
+    def add(self, reading: Dict[str, Any]) -> None:
+        """Account for one appended reading."""
+        self.count += 1
+        
+        timestamp = reading.get('timestamp')
+        if timestamp:
+            if self.first_timestamp is None or timestamp < self.first_timestamp:
+                self.first_timestamp = timestamp
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+            
+            pos = bisect_right([r.get('timestamp', '') for r in self.tail], timestamp)
+            self.tail.insert(pos, reading)
+            del self.tail[:-TAIL_ROWS]
+        
+        for metric in METRICS:
+            if reading.get(metric) is None:
+                self.null_counts[metric] += 1
+    
+    def remove(self, readings: List[Dict[str, Any]], first_timestamp: Optional[str]) -> None:
+        """Account for readings dropped from the head of the store.
+        
+        Args:
+            readings: Readings that were removed
+            first_timestamp: Timestamp of the oldest reading still stored
+        """
+        self.count = max(0, self.count - len(readings))
+        for reading in readings:
+            for metric in METRICS:
+                if reading.get(metric) is None:
+                    self.null_counts[metric] = max(0, self.null_counts[metric] - 1)
+        
+        self.first_timestamp = first_timestamp
+        if self.count == 0:
+            self.last_timestamp = None
+            self.tail = []
+        elif first_timestamp is not None:
+            self.tail = [r for r in self.tail if r.get('timestamp', '') >= first_timestamp]
+    
+    def replace(self, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """Account for a stored reading overwritten by one with its timestamp."""
+        for metric in METRICS:
+            self.null_counts[metric] += ((new.get(metric) is None)
+                                         - (old.get(metric) is None))
+        
+        timestamp = old.get('timestamp')
+        self.tail = [new if r.get('timestamp') == timestamp else r for r in self.tail]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": METADATA_VERSION,
+            "count": self.count,
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+            "null_counts": self.null_counts,
+            "size_bytes": self.size_bytes,
+            "tail": self.tail,
+        }
+    
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> 'DataMetadata':
+        meta = cls()
+        meta.count = int(record["count"])
+        meta.first_timestamp = record.get("first_timestamp")
+        meta.last_timestamp = record.get("last_timestamp")
+        meta.null_counts.update(record.get("null_counts", {}))
+        meta.size_bytes = int(record["size_bytes"])
+        meta.tail = list(record.get("tail", []))
+        return meta
+
+
+def read_metadata(path: Path) -> Optional[DataMetadata]:
+    """Read a metadata sidecar.
+    
+    Args:
+        path: Sidecar file path
+    
+    Returns:
+        DataMetadata, or None if the sidecar is missing or unreadable
+    """
+    try:
+        with open(path, 'r') as f:
+            record = json.load(f)
+        if record.get("version") != METADATA_VERSION:
+            return None
+        return DataMetadata.from_dict(record)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def write_metadata(path: Path, meta: DataMetadata) -> None:
+    """Write a metadata sidecar atomically."""
+    atomic_write(path, lambda f: json.dump(meta.to_dict(), f, separators=(',', ':')), suffix='.json')
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Storage Format Migration
+========================
+
+Moves readings from one storage backend to another, e.g. a large legacy
+data.json to data.sqlite, without loading either into memory:
+
+    python -m pi.migrate --from json --to sqlite
+
+Readings are streamed in batches into a staging store next to the
+destination (``data.sqlite.migrating``), and readings logged while the
+copy runs are picked up by catch-up passes, so the logger can keep running.
+The staging store is then checked against the source by row count and an
+order-independent checksum, and renamed into place in one step. An
+interrupted migration resumes after the number of readings already
+staged, so readings sharing a timestamp are neither skipped nor copied
+twice.
+
+Point DATA_FORMAT at the new format right after the switch; readings
+logged to the old store in between are copied by running the migration
+again with --catch-up.
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .index import to_epoch_us
+    from .metadata import DataMetadata, metadata_path, write_metadata
+    from .storage import METRICS, STORAGE_FORMATS, ReadingStore, create_store, infer_storage_format
+except ImportError:
+    # Handle running as script
+    from index import to_epoch_us
+    from metadata import DataMetadata, metadata_path, write_metadata
+    from storage import METRICS, STORAGE_FORMATS, ReadingStore, create_store, infer_storage_format
+
+# Formats readings can be migrated to; the JSON array is produced by
+# `logger.py export` instead, as it is rewritten whole on every batch
+MIGRATE_FORMATS = tuple(f for f in STORAGE_FORMATS if f != "json")
+
+# Readings appended to the staging store per write
+BATCH_SIZE = 1000
+
+# Extra passes over the source for readings logged during the copy
+CATCH_UP_PASSES = 3
+
+# Data file paths, named as sensor_logger.py names them
+DATA_JSON = Path(__file__).parent.parent / "data.json"
+
+
+def data_file_for(storage_format: str) -> Path:
+    """Return the default data path of a storage format."""
+    return DATA_JSON if storage_format == "json" else DATA_JSON.with_suffix(f".{storage_format}")
+
+
+def staging_path(dest: Path) -> Path:
+    """Return the staging path a migration to dest writes to."""
+    return Path(str(dest) + '.migrating')
+
+
+def reading_checksum(reading: Dict[str, Any]) -> Optional[int]:
+    """Hash a reading independently of how a backend stores it.
+    
+    Timestamps are compared as epoch microseconds and values to 6
+    significant digits, which float32 columns hold exactly.
+    
+    Returns:
+        64-bit hash, or None if the timestamp cannot be parsed
+    """
+    epoch_us = to_epoch_us(reading.get('timestamp', ''))
+    if epoch_us is None:
+        return None
+    
+    fields = [str(epoch_us)]
+    for metric in METRICS:
+        value = reading.get(metric)
+        if value is None:
+            fields.append('')
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            fields.append(format(float(value), '.6g'))
+        else:
+            fields.append(str(value))
+    digest = hashlib.blake2b('|'.join(fields).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def store_digest(readings: Iterable[Dict[str, Any]], limit: Optional[int] = None,
+                 meta: Optional[DataMetadata] = None) -> Tuple[int, int]:
+    """Return the count and order-independent checksum of readings.
+    
+    Readings with unparseable timestamps are left out, as the migration
+    does not copy them.
+    
+    Args:
+        readings: Readings to digest
+        limit: Only digest this many readings, the ones a migration copied
+        meta: Optional metadata to accumulate the digested readings into
+    
+    Returns:
+        (count, checksum)
+    """
+    count = 0
+    checksum = 0
+    for reading in readings:
+        if limit is not None and count >= limit:
+            break
+        value = reading_checksum(reading)
+        if value is None:
+            continue
+        count += 1
+        checksum = (checksum + value) % (1 << 64)
+        if meta is not None:
+            meta.add(reading)
+    return count, checksum
+
+
+def copy_readings(source: ReadingStore, dest: ReadingStore, after_us: Optional[int] = None,
+                  batch_size: int = BATCH_SIZE, skip: int = 0) -> Tuple[int, Optional[int]]:
+    """Stream readings newer than after_us from source to dest in batches.
+    
+    Each batch is appended in time order, so a columnar destination takes
+    its append fast path even when the source is slightly out of order.
+    
+    Args:
+        source: Store to read
+        dest: Store to append to
+        after_us: Only copy readings after this epoch-microsecond time
+        batch_size: Readings per append
+        skip: Number of copyable readings, in source order, to pass over
+            because an earlier run or pass already copied them
+    
+    Returns:
+        (readings copied, newest copied epoch microseconds or after_us)
+    """
+    copied = 0
+    newest = after_us
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    for reading in source.iter_range():
+        epoch_us = to_epoch_us(reading.get('timestamp', ''))
+        if epoch_us is None or (after_us is not None and epoch_us <= after_us):
+            continue
+        if skip > 0:
+            skip -= 1
+            continue
+        batch.append((epoch_us, reading))
+        newest = epoch_us if newest is None else max(newest, epoch_us)
+        if len(batch) >= batch_size:
+            copied += _append_sorted(dest, batch)
+            batch = []
+    if batch:
+        copied += _append_sorted(dest, batch)
+    return copied, newest
+
+
+def _append_sorted(dest: ReadingStore, batch: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """Append a batch of (epoch_us, reading) pairs in time order."""
+    batch.sort(key=lambda pair: pair[0])
+    return dest.append_many(reading for _, reading in batch)
+
+
+def staged_count(store: ReadingStore) -> int:
+    """Return the number of readings in a staging store, 0 if it is absent."""
+    if not store.exists():
+        return 0
+    if hasattr(store, 'metadata'):
+        return store.metadata().count
+    if hasattr(store, 'row_count'):
+        return store.row_count()
+    return store_digest(store.iter_range())[0]
+
+
+def newest_epoch(store: ReadingStore) -> Optional[int]:
+    """Return the newest reading's time in epoch microseconds, if any."""
+    if not store.exists():
+        return None
+    newest = store.tail(1) if hasattr(store, 'tail') else store.load()[-1:]
+    return to_epoch_us(newest[0].get('timestamp', '')) if newest else None
+
+
+def migrate(src: Path, dest: Path, src_format: Optional[str] = None,
+            dest_format: Optional[str] = None, batch_size: int = BATCH_SIZE,
+            segment_granularity: str = "day", restart: bool = False,
+            catch_up: bool = False) -> bool:
+    """Copy every reading of src into a new dest store and switch to it.
+    
+    Args:
+        src: Source data file or store directory
+        dest: Destination path; must not exist yet unless catch_up is set
+        src_format: Source storage format (default: from the path)
+        dest_format: Destination storage format (default: from the path)
+        batch_size: Readings per append
+        segment_granularity: Segment length for a segments destination
+        restart: Discard a staging store left by an interrupted run
+        catch_up: Append to an already migrated dest the source readings
+            newer than its newest one
+    
+    Returns:
+        True if the migration completed and verified, False otherwise
+    """
+    src, dest = Path(src), Path(dest)
+    src_format = src_format or infer_storage_format(src)
+    dest_format = dest_format or infer_storage_format(dest)
+    
+    source = create_store(src, src_format, segment_granularity)
+    if not source.exists():
+        print(f"Error: {src} not found")
+        return False
+    if catch_up:
+        if not dest.exists():
+            print(f"Error: {dest} not found, nothing to catch up")
+            return False
+        target = create_store(dest, dest_format, segment_granularity)
+        copied, _ = copy_readings(source, target, newest_epoch(target), batch_size)
+        print(f"Copied {copied} new readings from {src} to {dest}")
+        return True
+    if dest.exists():
+        print(f"Error: {dest} already exists")
+        return False
+    
+    staged = staging_path(dest)
+    if restart:
+        _remove(staged)
+    staging = create_store(staged, dest_format, segment_granularity)
+    
+    try:
+        # Readings are copied in source order, so the number staged is
+        # where the copy stopped
+        done = staged_count(staging)
+        if done:
+            print(f"Resuming migration into {staged} after {done} readings")
+        
+        copied = 0
+        for _ in range(1 + CATCH_UP_PASSES):
+            passed, _ = copy_readings(source, staging, batch_size=batch_size, skip=done)
+            done += passed
+            copied += passed
+            if not passed:
+                break
+        print(f"Copied {copied} readings from {src} to {staged}")
+        
+        # Readings logged after the last pass are left for --catch-up
+        expected = store_digest(source.iter_range(), done)
+        meta = DataMetadata()
+        actual = store_digest(staging.iter_range(), meta=meta) if staging.exists() else (0, 0)
+    except Exception as e:
+        print(f"Error migrating {src} to {dest}: {e}")
+        return False
+    
+    if actual != expected:
+        print(f"Error: verification failed, {src} has {expected[0]} readings "
+              f"(checksum {expected[1]:016x}) but {staged} has {actual[0]} "
+              f"(checksum {actual[1]:016x}); rerun with --restart")
+        return False
+    
+    if not staging.exists():
+        print(f"Error: {src} holds no readings to migrate")
+        return False
+    
+    os.rename(staged, dest)
+    print(f"Verified {actual[0]} readings (checksum {actual[1]:016x}), switched to {dest}")
+    
+    target = create_store(dest, dest_format, segment_granularity)
+    if not hasattr(target, 'metadata'):
+        meta.size_bytes = target.size_bytes()
+        try:
+            write_metadata(metadata_path(dest), meta)
+        except OSError as e:
+            print(f"Warning: Could not write metadata for {dest}: {e}")
+    return True
+
+
+def _remove(path: Path) -> None:
+    """Delete a staging file or directory if present."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def main():
+    """Command line entry point for storage migration."""
+    parser = argparse.ArgumentParser(
+        description="Migrate sensor data between storage formats",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python -m pi.migrate --from json --to jsonl
+  python -m pi.migrate --from json --to segments --segment-granularity hour
+  python -m pi.migrate --from json --to sqlite --catch-up   # after switching DATA_FORMAT
+"""
+    )
+    parser.add_argument("--from", dest="src_format", choices=STORAGE_FORMATS, required=True,
+                        help="Source storage format")
+    parser.add_argument("--to", dest="dest_format", choices=MIGRATE_FORMATS, required=True,
+                        help="Destination storage format")
+    parser.add_argument("--src", type=Path,
+                        help="Source data file (default: data.json or data.<format>)")
+    parser.add_argument("--dest", type=Path,
+                        help="Destination data file (default: data.<format>)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Readings per write (default: {BATCH_SIZE})")
+    parser.add_argument("--segment-granularity", choices=("day", "hour"), default="day",
+                        help="Segment length for --to segments (default: day)")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard an interrupted migration instead of resuming it")
+    parser.add_argument("--catch-up", action="store_true",
+                        help="Copy readings logged since an earlier migration into --dest")
+    
+    args = parser.parse_args()
+    if args.src_format == args.dest_format:
+        parser.error("--from and --to must differ")
+    
+    success = migrate(args.src or data_file_for(args.src_format),
+                      args.dest or data_file_for(args.dest_format),
+                      args.src_format, args.dest_format, args.batch_size,
+                      args.segment_granularity, args.restart, args.catch_up)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Tiered Retention Rollups
+========================
+
+Downsampled history kept after raw readings leave the retention window.
+Readings that age out are demoted to 5-minute aggregates, and 5-minute
+aggregates that age out are folded into hourly aggregates, so years of
+history stay small and quick to query.
+
+Each tier is a JSON Lines file next to the data file with one record per
+bucket, keyed on the bucket start:
+
+    {"timestamp": "2024-01-15T10:05:00+00:00",
+     "ph": {"mean": 6.9, "min": 6.8, "max": 7.0, "count": 5}, ...}
+
+A metric with no values in the bucket is null. The newest bucket also
+records in "through" the newest input timestamp folded into the tier (the
+watermark). A later batch merges its older part into that bucket by
+rewriting the last line, appends newer buckets after it, and skips inputs
+at or before the watermark, so demoting the same readings twice never
+double counts. Older lines without "through" are taken as sealed.
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Sequence, Tuple
+
+try:
+    from .index import TimestampIndex, to_epoch_us, from_epoch_us
+    from .storage import METRICS, JsonLinesStore, read_last_record, rewrite_tail
+except ImportError:
+    # Handle running as script
+    from index import TimestampIndex, to_epoch_us, from_epoch_us
+    from storage import METRICS, JsonLinesStore, read_last_record, rewrite_tail
+
+# Bucket lengths of the rollup tiers, finest first
+FIVE_MINUTES = 300
+HOURLY = 3600
+DAILY = 86400
+ROLLUP_RESOLUTIONS = {"5m": FIVE_MINUTES, "1h": HOURLY}
+
+# Bucket lengths and aggregates accepted by aggregate queries
+BUCKETS = {"5m": FIVE_MINUTES, "1h": HOURLY, "1d": DAILY}
+AGGREGATE_FUNCS = ("mean", "min", "max", "count")
+
+
+def bucket_start_us(epoch_us: int, bucket_seconds: int) -> int:
+    """Round epoch microseconds down to the start of their bucket."""
+    bucket_us = bucket_seconds * 1_000_000
+    return epoch_us - epoch_us % bucket_us
+
+
+def align_down(dt: datetime, bucket_seconds: int) -> datetime:
+    """Round a datetime down to a bucket boundary."""
+    return from_epoch_us(bucket_start_us(to_epoch_us(dt), bucket_seconds))
+
+
+class Aggregator:
+    """Streaming per-bucket sum/min/max/count of each metric.
+    
+    Accepts raw readings, rollup records and pre-aggregated partials
+    (e.g. from a SQL GROUP BY), so raw data and stored rollups merge into
+    the same buckets in one pass without keeping the readings around.
+    """
+    
+    def __init__(self, bucket_seconds: int, metrics: Iterable[str] = METRICS):
+        """Initialize aggregator.
+        
+        Args:
+            bucket_seconds: Bucket length in seconds
+            metrics: Metrics to aggregate
+        """
+        self.bucket_us = bucket_seconds * 1_000_000
+        self.metrics = tuple(metrics)
+        # Bucket start -> metric -> running [sum, min, max, count]
+        self.buckets: Dict[int, Dict[str, List[float]]] = {}
+    
+    def open_bucket(self, epoch_us: int) -> Dict[str, List[float]]:
+        """Return the accumulators of the bucket holding a timestamp."""
+        return self.buckets.setdefault(epoch_us - epoch_us % self.bucket_us, {})
+    
+    def add_partial(self, epoch_us: int, metric: str, total: float,
+                    low: float, high: float, count: int) -> None:
+        """Merge a partial aggregate into the bucket holding epoch_us."""
+        acc = self.open_bucket(epoch_us)
+        entry = acc.get(metric)
+        if entry is None:
+            acc[metric] = [total, low, high, count]
+        else:
+            entry[0] += total
+            entry[1] = min(entry[1], low)
+            entry[2] = max(entry[2], high)
+            entry[3] += count
+    
+    def add_value(self, epoch_us: int, metric: str, value: float) -> None:
+        """Add one raw value."""
+        self.add_partial(epoch_us, metric, value, value, value, 1)
+    
+    def add(self, record: Dict[str, Any]) -> None:
+        """Add a raw reading or a rollup record.
+        
+        Raw readings carry numeric metric values, rollup records carry
+        metric dicts with mean/min/max/count.
+        """
+        epoch_us = to_epoch_us(record.get('timestamp', ''))
+        if epoch_us is None:
+            return
+        
+        self.open_bucket(epoch_us)
+        for metric in self.metrics:
+            value = record.get(metric)
+            if value is None:
+                continue
+            if isinstance(value, dict):
+                count = value["count"]
+                self.add_partial(epoch_us, metric, value["mean"] * count,
+                                 value["min"], value["max"], count)
+            else:
+                self.add_partial(epoch_us, metric, value, value, value, 1)
+    
+    def results(self, funcs: Sequence[str] = AGGREGATE_FUNCS,
+                precision: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return one record per bucket, sorted by bucket start.
+        
+        Args:
+            funcs: Aggregates to include per metric ("mean", "min", "max",
+                "count")
+            precision: If given, round means to this many decimals
+        
+        Returns:
+            Records with the bucket start as 'timestamp' and a dict of
+            aggregates (or None if the bucket had no values) per metric
+        """
+        records = []
+        for start_us in sorted(self.buckets):
+            record: Dict[str, Any] = {"timestamp": from_epoch_us(start_us).isoformat()}
+            for metric in self.metrics:
+                entry = self.buckets[start_us].get(metric)
+                if entry is None:
+                    record[metric] = None
+                    continue
+                total, low, high, count = entry
+                mean = total / count
+                values = {
+                    "mean": mean if precision is None else round(mean, precision),
+                    "min": low,
+                    "max": high,
+                    "count": count,
+                }
+                record[metric] = {func: values[func] for func in funcs}
+            records.append(record)
+        return records
+
+
+def aggregate(records: Iterable[Dict[str, Any]], bucket_seconds: int) -> List[Dict[str, Any]]:
+    """Aggregate raw readings or finer rollup records into buckets.
+    
+    Args:
+        records: Raw readings (numeric metric values) or rollup records
+            (metric dicts with mean/min/max/count), in any order
+        bucket_seconds: Bucket length in seconds
+    
+    Returns:
+        Rollup records sorted by bucket start
+    """
+    aggregator = Aggregator(bucket_seconds)
+    for record in records:
+        aggregator.add(record)
+    return aggregator.results(precision=4)
+
+
+class RollupTier:
+    """One resolution of downsampled history stored as JSON Lines."""
+    
+    def __init__(self, path: Path, bucket_seconds: int):
+        """Initialize rollup tier.
+        
+        Args:
+            path: Tier file path
+            bucket_seconds: Bucket length in seconds
+        """
+        self.store = JsonLinesStore(path)
+        self.bucket_seconds = bucket_seconds
+    
+    def _last_bucket(self) -> Tuple[int, Optional[Dict[str, Any]], Optional[int]]:
+        """Return the byte offset, record and watermark of the newest bucket."""
+        try:
+            offset, record = read_last_record(self.store.path)
+        except OSError:
+            return 0, None, None
+        start_us = None if record is None else to_epoch_us(record.get('timestamp', ''))
+        if start_us is None:
+            return offset, None, None
+        
+        through = to_epoch_us(record.get('through') or '')
+        if through is None:
+            through = start_us + self.bucket_seconds * 1_000_000 - 1
+        return offset, record, through
+    
+    def watermark(self) -> Optional[int]:
+        """Return the newest input timestamp in the tier in epoch microseconds, if any."""
+        return self._last_bucket()[2]
+    
+    def add(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Aggregate records into this tier's buckets.
+        
+        Records at or before the watermark are already counted and are
+        skipped. Records in the newest bucket are merged into it by
+        rewriting the last line, later buckets are appended.
+        
+        Returns:
+            Number of buckets written
+        """
+        offset, last, watermark = self._last_bucket()
+        aggregator = Aggregator(self.bucket_seconds)
+        newest = watermark
+        for record in records:
+            epoch_us = to_epoch_us(record.get('timestamp', ''))
+            if epoch_us is None or (watermark is not None and epoch_us <= watermark):
+                continue
+            aggregator.add(record)
+            newest = epoch_us if newest is None else max(newest, epoch_us)
+        
+        if not aggregator.buckets:
+            return 0
+        
+        rollups = []
+        if last is not None:
+            if to_epoch_us(last['timestamp']) in aggregator.buckets:
+                aggregator.add(last)
+            else:
+                # The newest bucket is sealed as it is, minus its watermark
+                rollups.append({k: v for k, v in last.items() if k != 'through'})
+        
+        rollups += aggregator.results(precision=4)
+        rollups[-1]['through'] = from_epoch_us(newest).isoformat()
+        rewrite_tail(self.store.path, offset, rollups)
+        return len(rollups)
+    
+    def drop_before(self, cutoff: datetime) -> List[Dict[str, Any]]:
+        """Remove buckets starting before the cutoff.
+        
+        Returns:
+            The removed rollup records
+        """
+        oldest = self.store.first_timestamp()
+        if oldest is None or to_epoch_us(oldest) >= to_epoch_us(cutoff):
+            return []
+        
+        index = TimestampIndex(self.store.load())
+        dropped = index.range(end=cutoff)
+        self.store.save(index.range(cutoff))
+        return dropped
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        if not self.store.exists():
+            return []
+        records = TimestampIndex(self.store.load()).range(start, end)
+        if records and 'through' in records[-1]:
+            records[-1] = {k: v for k, v in records[-1].items() if k != 'through'}
+        return records
+
+
+class TieredRetention:
+    """Demotes aged-out readings through the 5-minute and hourly tiers."""
+    
+    def __init__(self, data_file: Path, rollup_days: int, hourly_days: int):
+        """Initialize tiered retention.
+        
+        Args:
+            data_file: Data file the tiers sit next to
+            rollup_days: Age in days up to which 5-minute aggregates are kept
+            hourly_days: Age in days up to which hourly aggregates are kept
+        """
+        self.rollup_days = rollup_days
+        self.hourly_days = hourly_days
+        self.tiers = {
+            name: RollupTier(Path(f"{data_file}.{name}.jsonl"), seconds)
+            for name, seconds in ROLLUP_RESOLUTIONS.items()
+        }
+    
+    @staticmethod
+    def align(cutoff: datetime) -> datetime:
+        """Align a raw retention cutoff so no 5-minute bucket is split."""
+        return align_down(cutoff, FIVE_MINUTES)
+    
+    def demote(self, readings: List[Dict[str, Any]], now: Optional[datetime] = None) -> None:
+        """Roll aged-out raw readings up and age out the rollup tiers.
+        
+        Args:
+            readings: Raw readings removed from the retention window
+            now: Current time (default: now)
+        """
+        now = now or datetime.now(timezone.utc)
+        five_minute = self.tiers["5m"]
+        hourly = self.tiers["1h"]
+        
+        if readings:
+            five_minute.add(readings)
+        
+        expired = five_minute.drop_before(align_down(now - timedelta(days=self.rollup_days), HOURLY))
+        if expired:
+            hourly.add(expired)
+        hourly.drop_before(now - timedelta(days=self.hourly_days))
+    
+    def load_range(self, resolution: str, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Return rollup records of one resolution ("5m" or "1h")."""
+        if resolution not in self.tiers:
+            raise ValueError(f"Unknown resolution {resolution!r}, "
+                             f"must be one of {', '.join(self.tiers)}")
+        return self.tiers[resolution].load_range(start, end)
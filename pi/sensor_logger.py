@@ -20,7 +20,43 @@ Environment Variables (with defaults):
 - PH_SLOPE=-3.333 - pH calibration slope (user calibrates)
 - PH_INTERCEPT=12.5 - pH calibration intercept (user calibrates)
 - TDS_MULTIPLIER=0.5 - TDS scaling factor (NaCl scale, user calibrates)
+- TEMP_PROBE= - DS18B20 probe ID (28-...) logged as temp_c when several probes
+  share the 1-Wire bus (default: the first found)
+- ADC_DATA_RATE= - ADS1115 samples per second: 8, 16, 32, 64, 128, 250, 475
+  or 860 (default: 128)
+- ADC_CONTINUOUS=0 - If "1", run the ADS1115 in continuous-conversion mode;
+  burst samples are then paced one conversion apart at ADC_DATA_RATE
+- OVERSAMPLE=1 - ADC samples taken per pH/TDS reading; above 1 they are
+  reduced to one voltage by OVERSAMPLE_FILTER and their spread is printed
+- OVERSAMPLE_FILTER=median - median, trimmed-mean or hampel (mean of the
+  samples within 3 MADs of the median)
 - GIT_PUSH=0 - If "1", run git add/commit/push after each reading
+- DATA_FORMAT=json - Storage format: "json" (data.json), "jsonl" (data.jsonl),
+  "segments" (data.segments/ directory of per-day files), "columnar"
+  (data.columnar/ directory of memory-mapped binary columns) or "sqlite"
+  (data.sqlite WAL-mode database)
+- SEGMENT_GRANULARITY=day - Segment length for DATA_FORMAT=segments (day or hour)
+- JOURNAL=0 - If "1", append each reading to a small fsync'd journal and fold
+  it into the data file with a scheduled compaction (logger.py compact)
+- COMPACT_HOURS=6 - Compaction interval in daemon mode when JOURNAL=1
+- ROLLUP_DAYS=0 - If set, readings older than WINDOW_DAYS are demoted to
+  5-minute aggregates kept for this many days instead of being deleted
+- HOURLY_DAYS=3650 - Days to keep hourly aggregates when ROLLUP_DAYS is set
+- COMPRESS_AFTER_DAYS=0 - If set, compress DATA_FORMAT=segments segments older
+  than this many days (read back transparently)
+- COMPRESSION=gzip - Cold segment compression, gzip or lzma
+- MATERIALIZE_STATS=0 - If "1", keep running hourly and daily statistics
+  (mean, std, min, max) updated on every reading
+- BUFFER_DIR= - If set (e.g. /dev/shm/aquaponics), stage readings in this
+  RAM-backed directory and flush them to the SD card every FLUSH_MINUTES and
+  on shutdown; unflushed readings are lost on a power cut
+- FLUSH_MINUTES=360 - Age of the oldest staged reading that triggers a flush
+- DEDUP= - If set to keep-first, keep-last or merge, a reading whose timestamp
+  is already stored (e.g. a retried cycle) is dropped, overwrites the stored
+  one, or fills in its null fields, instead of being appended again
+- MAX_DATA_BYTES=0 - If set, byte budget of the data store: once exceeded, cold
+  segments are compressed, then the oldest readings dropped (demoted to the
+  rollup tiers with ROLLUP_DAYS)
 
 Usage:
   python3 sensor_logger.py [--once]
@@ -31,10 +67,11 @@ Usage:
 
 import argparse
 import os
+import signal
 import subprocess
 import sys
 import time
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # Import sensor modules
@@ -51,9 +88,40 @@ except ImportError:
 # Configuration from environment
 WINDOW_DAYS = int(os.getenv("WINDOW_DAYS", "60"))
 GIT_PUSH = os.getenv("GIT_PUSH", "0") == "1"
+DATA_FORMAT = os.getenv("DATA_FORMAT", "json")
+SEGMENT_GRANULARITY = os.getenv("SEGMENT_GRANULARITY", "day")
+JOURNAL = os.getenv("JOURNAL", "0") == "1"
+COMPACT_HOURS = float(os.getenv("COMPACT_HOURS", "6"))
+ROLLUP_DAYS = int(os.getenv("ROLLUP_DAYS", "0"))
+HOURLY_DAYS = int(os.getenv("HOURLY_DAYS", "3650"))
+COMPRESS_AFTER_DAYS = int(os.getenv("COMPRESS_AFTER_DAYS", "0"))
+COMPRESSION = os.getenv("COMPRESSION", "gzip")
+MATERIALIZE_STATS = os.getenv("MATERIALIZE_STATS", "0") == "1"
+BUFFER_DIR = Path(os.environ["BUFFER_DIR"]) if os.getenv("BUFFER_DIR") else None
+FLUSH_MINUTES = float(os.getenv("FLUSH_MINUTES", "360"))
+MAX_DATA_BYTES = int(os.getenv("MAX_DATA_BYTES", "0"))
+DEDUP = os.getenv("DEDUP") or None
 
-# Data file path
-DATA_FILE = Path(__file__).parent.parent / "data.json"
+# Data file paths. DATA_JSON is what the dashboard reads; other storage
+# formats keep their own file and are exported to it before publishing.
+DATA_JSON = Path(__file__).parent.parent / "data.json"
+DATA_FILE = DATA_JSON if DATA_FORMAT == "json" else DATA_JSON.with_suffix(f".{DATA_FORMAT}")
+
+
+# Sensor interface shared by every reading of this process
+_sensors = None
+
+
+def get_sensors():
+    """Return the process's sensor interface, opening the I2C bus on first use.
+    
+    The daemon keeps one ADS1115 session and its channel objects across
+    cycles instead of reopening the bus for every reading.
+    """
+    global _sensors
+    if _sensors is None:
+        _sensors = create_sensors_from_env()
+    return _sensors
 
 
 def take_reading() -> bool:
@@ -63,25 +131,42 @@ def take_reading() -> bool:
         True if reading successful, False otherwise
     """
     try:
-        # Create sensors interface
-        sensors = create_sensors_from_env()
+        sensors = get_sensors()
         
         # Take reading
         reading = sensors.read_all()
         
         print(f"Reading: {reading}")
+        print(f"Sensor timings: {sensors.format_timings()}")
+        if sensors.last_noise:
+            print(f"Sensor noise: {sensors.format_noise()}")
         
         # Save to data file
-        data_logger = DataLogger(DATA_FILE, WINDOW_DAYS)
+        data_logger = DataLogger(DATA_FILE, WINDOW_DAYS, DATA_FORMAT, SEGMENT_GRANULARITY,
+                                 journal=JOURNAL, rollup_days=ROLLUP_DAYS,
+                                 hourly_days=HOURLY_DAYS,
+                                 compress_after_days=COMPRESS_AFTER_DAYS,
+                                 compression=COMPRESSION,
+                                 materialize_stats=MATERIALIZE_STATS,
+                                 buffer_dir=BUFFER_DIR, max_bytes=MAX_DATA_BYTES,
+                                 dedup=DEDUP)
         success = data_logger.append_reading(reading)
         
-        if success:
+        if success and BUFFER_DIR is not None:
+            print(f"Staged reading in {BUFFER_DIR} "
+                  f"({data_logger.io_stats['bytes_written']} bytes written to {DATA_FILE.parent})")
+            if data_logger.flush_due(timedelta(minutes=FLUSH_MINUTES)):
+                success = flush_buffer(data_logger)
+        elif success:
             # Get stats for logging
             stats = data_logger.get_data_stats()
-            print(f"Saved {stats['total_readings']} readings to {DATA_FILE}")
+            print(f"Saved {stats['total_readings']} readings to {DATA_FILE} "
+                  f"({data_logger.bytes_per_reading():.0f} bytes written per reading)")
             
-            # Optional git push
-            if GIT_PUSH:
+            # Optional git push (journaled data is published by compaction)
+            if GIT_PUSH and not JOURNAL:
+                if DATA_FILE != DATA_JSON:
+                    data_logger.export_json(DATA_JSON)
                 git_push_data()
         else:
             print("Failed to save reading")
@@ -99,7 +184,7 @@ def git_push_data():
         return
     
     try:
-        repo_root = DATA_FILE.parent
+        repo_root = DATA_JSON.parent
         
         # Check if we're in a git repository
         result = subprocess.run(
@@ -166,6 +251,44 @@ def git_push_data():
         print(f"Error during git push: {e}")
 
 
+def compact_data() -> bool:
+    """Fold the reading journal (or RAM buffer) into the data file and publish data.json.
+    
+    Returns:
+        True if compaction successful, False otherwise
+    """
+    data_logger = DataLogger(DATA_FILE, WINDOW_DAYS, DATA_FORMAT, SEGMENT_GRANULARITY,
+                             journal=True, rollup_days=ROLLUP_DAYS, hourly_days=HOURLY_DAYS,
+                             compress_after_days=COMPRESS_AFTER_DAYS, compression=COMPRESSION,
+                             buffer_dir=BUFFER_DIR, max_bytes=MAX_DATA_BYTES)
+    if BUFFER_DIR is not None:
+        return flush_buffer(data_logger)
+    success = data_logger.compact(DATA_JSON)
+    if success:
+        git_push_data()
+    return success
+
+
+def flush_buffer(data_logger: DataLogger) -> bool:
+    """Flush readings staged in BUFFER_DIR to the SD card and publish data.json.
+    
+    Returns:
+        True if the flush succeeded, False otherwise
+    """
+    success = data_logger.compact(DATA_JSON)
+    if success:
+        print(f"Flushed {data_logger.io_stats['readings_written']} readings with "
+              f"{data_logger.io_stats['bytes_written']} bytes written "
+              f"({data_logger.bytes_per_reading():.0f} bytes per reading)")
+        git_push_data()
+    return success
+
+
+def _stop_on_sigterm(signum, frame):
+    """Turn SIGTERM (systemctl stop, shutdown) into a clean daemon exit."""
+    raise KeyboardInterrupt()
+
+
 def run_daemon():
     """Run sensor logger as daemon with 30-minute intervals."""
     print("Aquaponics Sensor Logger")
@@ -174,6 +297,9 @@ def run_daemon():
     print("Press Ctrl+C to stop")
     print()
     
+    last_compaction = time.monotonic()
+    signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    
     try:
         while True:
             print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Taking reading...")
@@ -182,6 +308,10 @@ def run_daemon():
             if not success:
                 print("Reading failed, will retry in 30 minutes")
             
+            if JOURNAL and time.monotonic() - last_compaction >= COMPACT_HOURS * 3600:
+                compact_data()
+                last_compaction = time.monotonic()
+            
             print("Waiting 30 minutes for next reading...")
             time.sleep(30 * 60)  # 30 minutes
             
@@ -190,6 +320,10 @@ def run_daemon():
     except Exception as e:
         print(f"Daemon error: {e}")
         sys.exit(1)
+    finally:
+        if BUFFER_DIR is not None:
+            # Staged readings would not survive the reboot that often follows
+            compact_data()
 
 def main():
     """Main entry point with argument parsing."""
@@ -205,7 +339,25 @@ Environment Variables:
   PH_SLOPE=-3.333    pH calibration slope (default: -3.333)
   PH_INTERCEPT=12.5  pH calibration intercept (default: 12.5)
   TDS_MULTIPLIER=0.5 TDS scaling factor (default: 0.5)
+  TEMP_PROBE=        DS18B20 probe ID logged as temp_c (default: first found)
+  ADC_DATA_RATE=     ADS1115 samples per second (default: 128)
+  ADC_CONTINUOUS=0   ADS1115 continuous-conversion mode (default: 0)
+  OVERSAMPLE=1       ADC samples per pH/TDS reading (default: 1)
+  OVERSAMPLE_FILTER=median  Sample reduction, median, trimmed-mean or hampel (default: median)
   GIT_PUSH=0         Enable git push after readings (default: 0)
+  DATA_FORMAT=json   Storage format, json, jsonl, segments, columnar or sqlite (default: json)
+  SEGMENT_GRANULARITY=day  Segment length, day or hour (default: day)
+  JOURNAL=0          Append to a write-ahead journal, compacted later (default: 0)
+  COMPACT_HOURS=6    Daemon compaction interval with JOURNAL=1 (default: 6)
+  ROLLUP_DAYS=0      Keep 5-minute aggregates of expired readings this long (default: 0, off)
+  HOURLY_DAYS=3650   Keep hourly aggregates this long with ROLLUP_DAYS (default: 3650)
+  COMPRESS_AFTER_DAYS=0  Compress segments older than this (default: 0, off)
+  COMPRESSION=gzip   Cold segment compression, gzip or lzma (default: gzip)
+  MATERIALIZE_STATS=0  Keep running hourly/daily statistics (default: 0)
+  BUFFER_DIR=        Stage readings in this RAM directory, flushed later (default: off)
+  FLUSH_MINUTES=360  Flush staged readings once the oldest is this old (default: 360)
+  MAX_DATA_BYTES=0   Byte budget of the data store (default: 0, unlimited)
+  DEDUP=             Repeated timestamps: keep-first, keep-last or merge (default: append)
 
 Examples:
   python3 sensor_logger.py --once           # Take one reading
@@ -224,8 +376,7 @@ Examples:
         print("=" * 40)
         # Check for mock mode
         try:
-            from . import create_sensors_from_env
-            sensors = create_sensors_from_env()
+            sensors = get_sensors()
             # Check if using mock hardware
             if hasattr(sensors.adc, 'mock_voltages') or hasattr(sensors.temp_sensor, 'mock_temp'):
                 print("Warning: Running in mock mode - no hardware access")
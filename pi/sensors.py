@@ -7,16 +7,20 @@ Uses the Hardware Abstraction Layer (HAL) and pure conversion functions.
 """
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 
 try:
-    from .hal import create_adc, create_temp_sensor, ADC, OneWireTemp
+    from .hal import create_adc, create_temp_sensor, sample_voltages, ADC, OneWireTemp
     from .conversions import voltage_to_ph, voltage_to_tds, validate_sensor_range
+    from .filters import reduce_samples, validate_filter
 except ImportError:
     # Handle running as script
-    from hal import create_adc, create_temp_sensor, ADC, OneWireTemp
+    from hal import create_adc, create_temp_sensor, sample_voltages, ADC, OneWireTemp
     from conversions import voltage_to_ph, voltage_to_tds, validate_sensor_range
+    from filters import reduce_samples, validate_filter
 
 
 class AquaponicsSensors:
@@ -29,7 +33,12 @@ class AquaponicsSensors:
                  ph_slope: float = -3.333,
                  ph_intercept: float = 12.5,
                  tds_multiplier: float = 0.5,
-                 mock: bool = False):
+                 mock: bool = False,
+                 temp_probe: Optional[str] = None,
+                 adc_data_rate: Optional[int] = None,
+                 adc_continuous: bool = False,
+                 oversample: int = 1,
+                 oversample_filter: str = "median"):
         """Initialize sensor interface.
         
         Args:
@@ -40,22 +49,57 @@ class AquaponicsSensors:
             ph_intercept: pH calibration intercept
             tds_multiplier: TDS conversion multiplier
             mock: Use mock hardware for testing
+            temp_probe: DS18B20 probe ID reported as temp_c (default: first found)
+            adc_data_rate: ADS1115 samples per second (default: 128)
+            adc_continuous: Run the ADS1115 in continuous-conversion mode
+            oversample: ADC samples taken per pH/TDS reading
+            oversample_filter: How samples are reduced to one voltage,
+                "median", "trimmed-mean" or "hampel"
         """
+        if oversample < 1:
+            raise ValueError(f"oversample must be at least 1, got {oversample}")
+        validate_filter(oversample_filter)
+        
         self.adc_address = adc_address
         self.ph_channel = ph_channel
         self.tds_channel = tds_channel
         self.ph_slope = ph_slope
         self.ph_intercept = ph_intercept
         self.tds_multiplier = tds_multiplier
+        self.oversample = oversample
+        self.oversample_filter = oversample_filter
         
         # Initialize hardware interfaces
-        self.adc: ADC = create_adc(adc_address, mock=mock)
-        self.temp_sensor: OneWireTemp = create_temp_sensor(mock=mock)
+        self.adc: ADC = create_adc(adc_address, mock=mock, data_rate=adc_data_rate,
+                                   continuous=adc_continuous)
+        self.temp_sensor: OneWireTemp = create_temp_sensor(mock=mock, probe_id=temp_probe)
         
         # Sensor validation ranges
         self.ph_range = (0.0, 14.0)
         self.tds_range = (0.0, 5000.0)  # ppm
         self.temp_range = (-10.0, 60.0)  # Celsius
+        
+        # Seconds spent in each stage of the last read_all()
+        self.last_timings: Dict[str, float] = {}
+        
+        # Filtered voltage spread (V) and rejected samples of the last
+        # oversampled read, by sensor
+        self.last_noise: Dict[str, Dict[str, Any]] = {}
+    
+    def _read_voltage(self, channel: int, name: str) -> float:
+        """Read a channel's voltage, oversampled and filtered if configured."""
+        if self.oversample == 1:
+            return self.adc.read_voltage(channel)
+        
+        samples = sample_voltages(self.adc, [channel], self.oversample)[channel]
+        reduced = reduce_samples(samples, self.oversample_filter)
+        self.last_noise[name] = {
+            "voltage": reduced.value,
+            "spread": reduced.spread,
+            "samples": reduced.samples,
+            "rejected": reduced.rejected,
+        }
+        return reduced.value
     
     def read_ph(self) -> Optional[float]:
         """Read pH value from sensor.
@@ -64,18 +108,30 @@ class AquaponicsSensors:
             pH value (0.0-14.0), or None if reading failed
         """
         try:
-            voltage = self.adc.read_voltage(self.ph_channel)
-            ph = voltage_to_ph(voltage, self.ph_slope, self.ph_intercept)
-            
-            if ph is not None and validate_sensor_range(ph, *self.ph_range, "pH"):
-                return ph
-            
-            return None
-            
+            return self.convert_ph(self._read_voltage(self.ph_channel, "ph"))
         except Exception as e:
             print(f"Error reading pH sensor: {e}")
             return None
     
+    def convert_ph(self, voltage: Optional[float]) -> Optional[float]:
+        """Convert a pH channel voltage using the calibration.
+        
+        Args:
+            voltage: pH channel voltage
+        
+        Returns:
+            pH value, or None if the voltage is missing or out of range
+        """
+        if voltage is None:
+            return None
+        
+        ph = voltage_to_ph(voltage, self.ph_slope, self.ph_intercept)
+        
+        if ph is not None and validate_sensor_range(ph, *self.ph_range, "pH"):
+            return ph
+        
+        return None
+    
     def read_temperature(self) -> Optional[float]:
         """Read water temperature from DS18B20 sensor.
         
@@ -104,39 +160,84 @@ class AquaponicsSensors:
             TDS in ppm, or None if reading failed
         """
         try:
-            voltage = self.adc.read_voltage(self.tds_channel)
+            voltage = self._read_voltage(self.tds_channel, "tds")
             
             # Get temperature for compensation
             if temp_c is None:
                 temp_c = self.read_temperature()
             
-            # Default to 25°C if no temperature available
-            if temp_c is None:
-                temp_c = 25.0
-            
-            tds = voltage_to_tds(voltage, temp_c, self.tds_multiplier)
-            
-            if tds is not None and validate_sensor_range(tds, *self.tds_range, "TDS"):
-                return tds
+            return self.compensate_tds(voltage, temp_c)
             
+        except Exception as e:
+            print(f"Error reading TDS sensor: {e}")
             return None
-            
+    
+    def read_tds_voltage(self) -> Optional[float]:
+        """Sample the TDS channel without temperature compensation.
+        
+        Lets the TDS channel be read while the temperature is still
+        converting; pass the voltage to compensate_tds once it is known.
+        
+        Returns:
+            TDS channel voltage, or None if reading failed
+        """
+        try:
+            return self._read_voltage(self.tds_channel, "tds")
         except Exception as e:
             print(f"Error reading TDS sensor: {e}")
             return None
     
+    def compensate_tds(self, voltage: Optional[float], temp_c: Optional[float]) -> Optional[float]:
+        """Convert a TDS voltage to ppm at the given water temperature.
+        
+        Args:
+            voltage: TDS channel voltage from read_tds_voltage
+            temp_c: Water temperature (default 25°C if None)
+        
+        Returns:
+            TDS in ppm, or None if the voltage is missing or out of range
+        """
+        if voltage is None:
+            return None
+        
+        # Default to 25°C if no temperature available
+        if temp_c is None:
+            temp_c = 25.0
+        
+        tds = voltage_to_tds(voltage, temp_c, self.tds_multiplier)
+        
+        if tds is not None and validate_sensor_range(tds, *self.tds_range, "TDS"):
+            return tds
+        
+        return None
+    
     def read_all(self) -> Dict[str, Any]:
         """Read all sensors and return as structured data.
         
+        The DS18B20 conversion (~750 ms) runs in a worker thread while the
+        ADC channels are sampled, and TDS compensation waits for it, so a
+        cycle takes about as long as the slower of the two. Per-stage
+        durations are left in last_timings, not in the reading.
+        
         Returns:
             Dictionary with timestamp and sensor readings
         """
-        # Read temperature first for TDS compensation
-        temp_c = self.read_temperature()
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
         
-        # Read other sensors
-        ph = self.read_ph()
-        tds = self.read_tds(temp_c)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # Start the slow temperature conversion first for TDS compensation
+            temp_future = pool.submit(_timed, timings, "temperature", self.read_temperature)
+            
+            # Sample the ADC while it converts
+            ph = _timed(timings, "ph", self.read_ph)
+            tds_voltage = _timed(timings, "tds", self.read_tds_voltage)
+            
+            temp_c = _timed(timings, "temperature_wait", temp_future.result)
+        
+        tds = self.compensate_tds(tds_voltage, temp_c)
+        timings["total"] = time.perf_counter() - start
+        self.last_timings = timings
         
         # Create reading with UTC timestamp
         reading = {
@@ -148,6 +249,18 @@ class AquaponicsSensors:
         
         return reading
     
+    def format_noise(self) -> str:
+        """Describe the filtered voltage spread of the last oversampled reads."""
+        return ', '.join(
+            f"{name} ±{noise['spread'] * 1000:.1f} mV over {noise['samples']} samples "
+            f"({noise['rejected']} rejected)"
+            for name, noise in self.last_noise.items())
+    
+    def format_timings(self) -> str:
+        """Describe the last read_all() stage timings in milliseconds."""
+        return ', '.join(f"{stage} {seconds * 1000:.0f} ms"
+                         for stage, seconds in self.last_timings.items())
+    
     def test_sensors(self) -> Dict[str, Any]:
         """Test all sensors and return diagnostic information.
         
@@ -166,16 +279,22 @@ class AquaponicsSensors:
                 "ph_intercept": self.ph_intercept,
                 "tds_multiplier": self.tds_multiplier
             },
+            "oversampling": {
+                "samples": self.oversample,
+                "filter": self.oversample_filter
+            },
             "sensors": {}
         }
         
         # Test pH sensor
         try:
-            ph_voltage = self.adc.read_voltage(self.ph_channel)
-            ph_value = self.read_ph()
+            # One burst per channel, converted like read_all would
+            ph_voltage = self._read_voltage(self.ph_channel, "ph")
+            ph_value = self.convert_ph(ph_voltage)
             results["sensors"]["ph"] = {
                 "voltage": ph_voltage,
                 "value": ph_value,
+                "noise": self.last_noise.get("ph"),
                 "status": "ok" if ph_value is not None else "error"
             }
         except Exception as e:
@@ -192,6 +311,8 @@ class AquaponicsSensors:
                 "value": temp_value,
                 "status": "ok" if temp_value is not None else "error"
             }
+            if hasattr(self.temp_sensor, 'read_probes'):
+                results["sensors"]["temperature"]["probes"] = self.temp_sensor.read_probes()
         except Exception as e:
             results["sensors"]["temperature"] = {
                 "value": None,
@@ -200,11 +321,12 @@ class AquaponicsSensors:
         
         # Test TDS sensor
         try:
-            tds_voltage = self.adc.read_voltage(self.tds_channel)
-            tds_value = self.read_tds()
+            tds_voltage = self._read_voltage(self.tds_channel, "tds")
+            tds_value = self.compensate_tds(tds_voltage, results["sensors"]["temperature"]["value"])
             results["sensors"]["tds"] = {
                 "voltage": tds_voltage,
                 "value": tds_value,
+                "noise": self.last_noise.get("tds"),
                 "status": "ok" if tds_value is not None else "error"
             }
         except Exception as e:
@@ -217,6 +339,15 @@ class AquaponicsSensors:
         return results
 
 
+def _timed(timings: Dict[str, float], stage: str, read: Callable[[], Any]) -> Any:
+    """Call read and record how long it took under timings[stage]."""
+    start = time.perf_counter()
+    try:
+        return read()
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
 def create_sensors_from_env() -> AquaponicsSensors:
     """Create sensor interface using environment variables.
     
@@ -227,6 +358,11 @@ def create_sensors_from_env() -> AquaponicsSensors:
         PH_SLOPE: pH calibration slope (default: -3.333)
         PH_INTERCEPT: pH calibration intercept (default: 12.5)
         TDS_MULTIPLIER: TDS conversion factor (default: 0.5)
+        TEMP_PROBE: DS18B20 probe ID reported as temp_c (default: first found)
+        ADC_DATA_RATE: ADS1115 samples per second (default: 128)
+        ADC_CONTINUOUS: ADS1115 continuous-conversion mode (default: 0)
+        OVERSAMPLE: ADC samples per pH/TDS reading (default: 1)
+        OVERSAMPLE_FILTER: median, trimmed-mean or hampel (default: median)
         MOCK_HARDWARE: Use mock sensors (default: 0)
     
     Returns:
@@ -240,6 +376,11 @@ def create_sensors_from_env() -> AquaponicsSensors:
     ph_intercept = float(os.getenv("PH_INTERCEPT", "12.5"))
     tds_multiplier = float(os.getenv("TDS_MULTIPLIER", "0.5"))
     mock = os.getenv("MOCK_HARDWARE", "0") == "1"
+    temp_probe = os.getenv("TEMP_PROBE") or None
+    adc_data_rate = int(os.environ["ADC_DATA_RATE"]) if os.getenv("ADC_DATA_RATE") else None
+    adc_continuous = os.getenv("ADC_CONTINUOUS", "0") == "1"
+    oversample = int(os.getenv("OVERSAMPLE", "1"))
+    oversample_filter = os.getenv("OVERSAMPLE_FILTER", "median")
     
     return AquaponicsSensors(
         adc_address=adc_address,
@@ -248,5 +389,10 @@ def create_sensors_from_env() -> AquaponicsSensors:
         ph_slope=ph_slope,
         ph_intercept=ph_intercept,
         tds_multiplier=tds_multiplier,
-        mock=mock
+        mock=mock,
+        temp_probe=temp_probe,
+        adc_data_rate=adc_data_rate,
+        adc_continuous=adc_continuous,
+        oversample=oversample,
+        oversample_filter=oversample_filter
     )
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""
+SQLite Storage Backend
+======================
+
+Keeps readings in a single SQLite database in WAL mode, indexed on the
+epoch microsecond timestamp. Appends and range reads are O(log N), and
+the logger daemon, coach.py and the dashboard server can read while a
+reading is being written without any whole-file rewrite.
+"""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple
+
+try:
+    from .index import bound_epoch_us, to_epoch_us
+    from .metadata import DataMetadata
+    from .storage import METRICS
+except ImportError:
+    # Handle running as script
+    from index import bound_epoch_us, to_epoch_us
+    from metadata import DataMetadata
+    from storage import METRICS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    epoch_us INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    ph REAL,
+    tds REAL,
+    temp_c REAL
+);
+CREATE INDEX IF NOT EXISTS readings_epoch_us ON readings (epoch_us);
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    count INTEGER NOT NULL,
+    ph_nulls INTEGER NOT NULL,
+    tds_nulls INTEGER NOT NULL,
+    temp_c_nulls INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS readings_stats_insert AFTER INSERT ON readings BEGIN
+    UPDATE stats SET count = count + 1, ph_nulls = ph_nulls + (NEW.ph IS NULL),
+        tds_nulls = tds_nulls + (NEW.tds IS NULL), temp_c_nulls = temp_c_nulls + (NEW.temp_c IS NULL);
+END;
+CREATE TRIGGER IF NOT EXISTS readings_stats_delete AFTER DELETE ON readings BEGIN
+    UPDATE stats SET count = count - 1, ph_nulls = ph_nulls - (OLD.ph IS NULL),
+        tds_nulls = tds_nulls - (OLD.tds IS NULL), temp_c_nulls = temp_c_nulls - (OLD.temp_c IS NULL);
+END;
+"""
+
+COLUMNS = ("timestamp",) + METRICS
+INSERT_SQL = (f"INSERT INTO readings (epoch_us, {', '.join(COLUMNS)}) "
+              f"VALUES (?{', ?' * len(COLUMNS)})")
+SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM readings"
+
+# Seconds to wait for another process's write lock before failing
+BUSY_TIMEOUT = 30.0
+
+
+def _row(reading: Dict[str, Any]) -> tuple:
+    """Encode a reading as an INSERT parameter tuple.
+    
+    Raises:
+        ValueError: If the reading has an unparseable timestamp
+    """
+    epoch_us = to_epoch_us(reading.get('timestamp', ''))
+    if epoch_us is None:
+        raise ValueError(f"Invalid timestamp {reading.get('timestamp')!r}")
+    return (epoch_us,) + tuple(reading.get(column) for column in COLUMNS)
+
+
+def _where(start, end) -> Tuple[str, List[int]]:
+    """Build the WHERE clause and parameters for [start, end)."""
+    clauses = []
+    params = []
+    if start is not None:
+        clauses.append("epoch_us >= ?")
+        params.append(bound_epoch_us(start))
+    if end is not None:
+        clauses.append("epoch_us < ?")
+        params.append(bound_epoch_us(end))
+    return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+class SqliteStore:
+    """Single-file SQLite database of readings."""
+    
+    supports_append = True
+    supports_range_reads = True
+    
+    def __init__(self, path: Path):
+        """Initialize SQLite store.
+        
+        Args:
+            path: Database file path
+        """
+        self.path = Path(path)
+        self._initialized = False
+    
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use.
+        
+        Connections are short-lived so readers in other processes never
+        hold a stale snapshot of the WAL.
+        """
+        conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._seed_stats(conn)
+            self._initialized = True
+        # WAL keeps the database consistent on power loss with NORMAL
+        # sync; at worst the last few commits are rolled back.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    @staticmethod
+    def _seed_stats(conn: sqlite3.Connection) -> None:
+        """Count the readings once into the stats row if it is missing.
+        
+        Triggers keep the row up to date from then on, in the same
+        transaction as every insert and delete, so metadata() never scans.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM stats").fetchone() is None:
+                null_sums = ', '.join(f"COALESCE(SUM({metric} IS NULL), 0)" for metric in METRICS)
+                conn.execute(f"INSERT INTO stats SELECT 1, COUNT(*), {null_sums} FROM readings")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    def exists(self) -> bool:
+        return self.path.exists()
+    
+    def load(self) -> List[Dict[str, Any]]:
+        return self.load_range()
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_range(start, end))
+    
+    def iter_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        if not self.exists():
+            return
+        
+        where, params = _where(start, end)
+        with closing(self.connect()) as conn:
+            for row in conn.execute(f"{SELECT_SQL}{where} ORDER BY epoch_us", params):
+                yield dict(zip(COLUMNS, row))
+    
+    def accumulate(self, aggregator, start=None, end=None) -> None:
+        """Feed readings in [start, end) to a rollup Aggregator.
+        
+        Buckets are aggregated by SQLite with GROUP BY, so only one row
+        per bucket crosses into Python.
+        """
+        if not self.exists():
+            return
+        
+        where, params = _where(start, end)
+        parts = ', '.join(f"SUM({m}), MIN({m}), MAX({m}), COUNT({m})" for m in aggregator.metrics)
+        sql = (f"SELECT epoch_us - epoch_us % ? AS bucket, {parts} FROM readings{where} "
+               f"GROUP BY bucket ORDER BY bucket")
+        
+        with closing(self.connect()) as conn:
+            for row in conn.execute(sql, [aggregator.bucket_us] + params):
+                bucket_us = row[0]
+                aggregator.open_bucket(bucket_us)
+                for i, metric in enumerate(aggregator.metrics):
+                    total, low, high, count = row[1 + 4 * i:5 + 4 * i]
+                    if count:
+                        aggregator.add_partial(bucket_us, metric, total, low, high, count)
+    
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        rows = [_row(reading) for reading in data]
+        with closing(self.connect()) as conn, conn:
+            conn.execute("DELETE FROM readings")
+            conn.executemany(INSERT_SQL, rows)
+    
+    def append(self, reading: Dict[str, Any]) -> None:
+        self.append_many([reading])
+    
+    def append_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        """Insert readings in a single transaction.
+        
+        Returns:
+            Number of readings inserted
+        """
+        rows = [_row(reading) for reading in readings]
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(INSERT_SQL, rows)
+        return len(rows)
+    
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Return the last n readings via the epoch index."""
+        if n <= 0 or not self.exists():
+            return []
+        with closing(self.connect()) as conn:
+            rows = conn.execute(f"{SELECT_SQL} ORDER BY epoch_us DESC LIMIT ?", (n,)).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in reversed(rows)]
+    
+    def last_timestamp(self) -> Optional[str]:
+        """Return the timestamp of the newest stored reading, if any."""
+        return self._edge_timestamp("DESC")
+    
+    def first_timestamp(self) -> Optional[str]:
+        return self._edge_timestamp("ASC")
+    
+    def _edge_timestamp(self, order: str) -> Optional[str]:
+        if not self.exists():
+            return None
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                f"SELECT timestamp FROM readings ORDER BY epoch_us {order} LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+    
+    def drop_before(self, cutoff: datetime,
+                    on_drop: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> int:
+        """Delete readings older than the cutoff.
+        
+        Args:
+            cutoff: Oldest time to retain
+            on_drop: Optional callback given the dropped readings
+        
+        Returns:
+            Number of readings removed
+        """
+        if not self.exists():
+            return 0
+        
+        cutoff_us = bound_epoch_us(cutoff)
+        with closing(self.connect()) as conn, conn:
+            if on_drop is not None:
+                rows = conn.execute(
+                    f"{SELECT_SQL} WHERE epoch_us < ? ORDER BY epoch_us", (cutoff_us,)
+                ).fetchall()
+                on_drop([dict(zip(COLUMNS, row)) for row in rows])
+            return conn.execute("DELETE FROM readings WHERE epoch_us < ?", (cutoff_us,)).rowcount
+    
+    def replace_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        """Overwrite stored readings that share a timestamp with a given reading.
+        
+        Returns:
+            Number of readings replaced
+        """
+        rows = [_row(reading) for reading in readings]
+        if not rows or not self.exists():
+            return 0
+        
+        replaced = 0
+        with closing(self.connect()) as conn, conn:
+            for row in rows:
+                if conn.execute("DELETE FROM readings WHERE epoch_us = ?", row[:1]).rowcount:
+                    conn.execute(INSERT_SQL, row)
+                    replaced += 1
+        return replaced
+    
+    def vacuum(self) -> None:
+        """Return pages freed by deletes to the filesystem.
+        
+        DELETE only marks pages free for reuse, so the file does not shrink
+        until it is rebuilt; the WAL is truncated afterwards as well.
+        """
+        if not self.exists():
+            return
+        with closing(self.connect()) as conn:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def metadata(self) -> DataMetadata:
+        """Return reading statistics from the trigger-maintained stats row.
+        
+        The count and null counts are one row lookup and the first and last
+        timestamps come from the epoch index, so this is O(log N).
+        """
+        meta = DataMetadata()
+        if not self.exists():
+            return meta
+        
+        null_columns = ', '.join(f"{metric}_nulls" for metric in METRICS)
+        with closing(self.connect()) as conn:
+            row = conn.execute(f"SELECT count, {null_columns} FROM stats").fetchone()
+        
+        meta.count = row[0]
+        meta.null_counts = dict(zip(METRICS, row[1:]))
+        meta.first_timestamp = self.first_timestamp()
+        meta.last_timestamp = self.last_timestamp()
+        meta.size_bytes = self.size_bytes()
+        return meta
+    
+    def size_bytes(self) -> int:
+        total = 0
+        for path in (self.path, Path(str(self.path) + '-wal')):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
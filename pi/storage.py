@@ -0,0 +1,1047 @@
+"""
+Storage Backends for Aquaponics Sensor Data
+===========================================
+
+Defines the on-disk formats used by DataLogger to persist readings.
+Each backend implements the ReadingStore protocol so the logger can
+switch formats without changing its public API.
+"""
+
+import gzip
+import json
+import lzma
+import os
+import tempfile
+from collections import OrderedDict, deque
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Protocol, List, Dict, Any, Optional, Callable, IO, Iterable, Iterator, Tuple
+
+
+STORAGE_FORMATS = ("json", "jsonl", "segments", "columnar", "sqlite")
+
+# Sensor fields carried by each reading besides its timestamp
+METRICS = ("ph", "tds", "temp_c")
+
+# Process-wide cache of parsed data files: path -> (mtime_ns, size, readings),
+# least recently used first
+_PARSE_CACHE: "OrderedDict[str, Tuple[int, int, List[Dict[str, Any]]]]" = OrderedDict()
+
+# Files kept in the parse cache; enough for the data file and a few
+# segments or rollup tiers without holding a whole history in memory
+PARSE_CACHE_SIZE = 4
+
+# Bytes this process has written to data files, for write-amplification stats
+_BYTES_WRITTEN = 0
+
+# Extra lines read by tail() beyond the n requested, so readings appended
+# a little out of time order (late syncs, buffer flushes) still come back
+# newest first
+TAIL_SLACK = 64
+
+# Bytes read per step by the incremental JSON array decoder
+DECODE_CHUNK_SIZE = 64 * 1024
+
+# Compression of cold segments: method name -> file suffix, and the
+# module that reads and writes each suffix
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "lzma": ".xz"}
+_COMPRESSORS = {".gz": gzip, ".xz": lzma}
+
+# Segment file name formats by granularity, e.g. 2024-01-15.jsonl
+SEGMENT_NAME_FORMATS = {
+    "day": "%Y-%m-%d",
+    "hour": "%Y-%m-%dT%H",
+}
+
+
+class StorageFormatError(ValueError):
+    """Raised when a data file does not contain the expected structure."""
+
+
+class ReadingStore(Protocol):
+    """Protocol for sensor reading storage backends."""
+    
+    path: Path
+    supports_append: bool
+    supports_range_reads: bool
+    
+    def exists(self) -> bool:
+        """Return True if the backing file exists."""
+        ...
+    
+    def load(self) -> List[Dict[str, Any]]:
+        """Load all readings, sorted by timestamp.
+        
+        Raises:
+            StorageFormatError: If the file has an unexpected structure
+        """
+        ...
+    
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        """Replace the stored readings atomically."""
+        ...
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Load readings with start <= timestamp < end, sorted by timestamp."""
+        ...
+    
+    def iter_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Yield readings with start <= timestamp < end in storage order.
+        
+        Readings are decoded incrementally so memory stays bounded;
+        storage order is time order unless readings were appended out
+        of order.
+        """
+        ...
+    
+    def append(self, reading: Dict[str, Any]) -> None:
+        """Append a single reading."""
+        ...
+    
+    def append_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        """Append readings with a single write.
+        
+        Returns:
+            Number of readings appended
+        """
+        ...
+    
+    def first_timestamp(self) -> Optional[str]:
+        """Return the timestamp of the first stored reading, if any."""
+        ...
+    
+    def size_bytes(self) -> int:
+        """Return the on-disk size of the store."""
+        ...
+    
+    # Optional: tail(n) -> List[Dict[str, Any]] returns the newest n
+    # readings, oldest first, reading only the end of the store.
+    # Optional: accumulate(aggregator, start, end) feeds [start, end) to a
+    # rollup.Aggregator without building reading dicts.
+    # Optional: vacuum() shrinks the files after drop_before() freed space.
+    # Optional: replace_many(readings) -> int overwrites stored readings
+    # sharing a timestamp with the given ones without a full rewrite.
+
+
+def count_written(nbytes: int) -> None:
+    """Add to the process-wide count of bytes written to data files."""
+    global _BYTES_WRITTEN
+    _BYTES_WRITTEN += nbytes
+
+
+def bytes_written() -> int:
+    """Return the bytes this process has written to data files so far."""
+    return _BYTES_WRITTEN
+
+
+def atomic_write(path: Path, write: Callable[[IO[str]], None], suffix: str = '.tmp') -> None:
+    """Write a file through a temporary file and an atomic rename.
+    
+    Paths ending in .gz or .xz are written compressed.
+    
+    Args:
+        path: Destination file path
+        write: Callback that writes the file contents to an open text file
+        suffix: Suffix for the temporary file
+    """
+    temp_fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=path.parent)
+    compressor = _COMPRESSORS.get(Path(path).suffix)
+    
+    try:
+        if compressor is None:
+            with os.fdopen(temp_fd, 'w') as f:
+                write(f)
+        else:
+            with os.fdopen(temp_fd, 'wb') as raw, compressor.open(raw, 'wt') as f:
+                write(f)
+        count_written(os.path.getsize(temp_path))
+        
+        # Atomic rename
+        os.rename(temp_path, path)
+    
+    except Exception:
+        # Clean up temp file on error
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def path_version(path: Path) -> Tuple:
+    """Fingerprint a file, or the files of a directory, by inode, mtime and size."""
+    try:
+        if not os.path.isdir(path):
+            stat = os.stat(path)
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        entries = []
+        for entry in os.scandir(path):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+    except FileNotFoundError:
+        return ()
+
+
+def store_version(store: 'ReadingStore') -> Tuple:
+    """Fingerprint the files backing a store.
+    
+    Any write through this or another process (an append, a rewrite, a
+    SQLite WAL commit or a journal append) changes the fingerprint, so it
+    tells whether state derived from the store is still current.
+    """
+    paths = [store.path, Path(str(store.path) + '-wal')]
+    if hasattr(store, 'journal_file'):
+        paths.append(store.journal_file)
+    return tuple(path_version(path) for path in paths)
+
+
+def open_text(path: Path) -> IO[str]:
+    """Open a file for reading text, decompressing .gz and .xz files."""
+    compressor = _COMPRESSORS.get(Path(path).suffix)
+    if compressor is None:
+        return open(path, 'r')
+    return compressor.open(path, 'rt')
+
+
+def is_compressed(path: Path) -> bool:
+    """Return True if a file is stored compressed."""
+    return Path(path).suffix in _COMPRESSORS
+
+
+def read_last_lines(path: Path, n: int, block_size: int = 4096) -> List[str]:
+    """Return up to the last n non-empty lines of a file, oldest first.
+    
+    Plain files are read backwards one block at a time, so only the blocks
+    holding those lines are read whatever the file size. Compressed files
+    cannot be read backwards and are scanned forwards instead.
+    
+    Raises:
+        OSError: If the file cannot be read
+    """
+    if n <= 0:
+        return []
+    
+    if is_compressed(path):
+        with open_text(path) as f:
+            return list(deque((line.rstrip('\n') for line in f if line.strip()), maxlen=n))
+    
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b''
+        lines: List[bytes] = []
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            lines = [line for line in tail.split(b'\n') if line.strip()]
+            # Past the first block boundary the first line may be partial
+            if len(lines) > n:
+                break
+    return [line.decode('utf-8') for line in lines[-n:]]
+
+
+def read_last_record(path: Path) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Return the byte offset and decoded record of a JSON Lines file's last line.
+    
+    Truncating the file at the offset and writing from there rewrites the
+    last line in place. A torn last line (e.g. after a power cut mid-write)
+    or one that is not a JSON object is returned as no record, so it is
+    overwritten.
+    """
+    if not Path(path).exists():
+        return 0, None
+    
+    size = os.path.getsize(path)
+    lines = read_last_lines(path, 1)
+    if not lines:
+        return 0, None
+    
+    with open(path, 'rb') as f:
+        f.seek(size - 1)
+        newline = f.read(1) == b'\n'
+    offset = size - len(lines[0].encode('utf-8')) - (1 if newline else 0)
+    
+    try:
+        record = json.loads(lines[0])
+    except json.JSONDecodeError:
+        return offset, None
+    return offset, record if isinstance(record, dict) else None
+
+
+def rewrite_tail(path: Path, offset: int, records: List[Dict[str, Any]]) -> None:
+    """Truncate a JSON Lines file at offset and append records from there."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'r+b' if Path(path).exists() else 'wb') as f:
+        f.truncate(offset)
+        f.seek(offset)
+        payload = ''.join(encode_line(record) for record in records).encode('utf-8')
+        f.write(payload)
+    count_written(len(payload))
+
+
+def sort_readings(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort readings in place by timestamp and return them."""
+    data.sort(key=lambda x: x.get('timestamp', ''))
+    return data
+
+
+def newest_readings(readings: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
+    """Return the n newest readings by parsed timestamp, oldest first.
+    
+    Unlike sort_readings this orders by time rather than by the timestamp
+    string, so mixed UTC offsets compare correctly. Readings whose
+    timestamp cannot be parsed sort oldest.
+    """
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    readings = sorted(readings, key=lambda r: parse_timestamp(r.get('timestamp', '')) or oldest)
+    return readings[-n:] if n > 0 else []
+
+
+def filter_range(data: List[Dict[str, Any]], start: Optional[datetime] = None,
+                 end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Keep readings with start <= timestamp < end.
+    
+    Args:
+        data: List of sensor readings
+        start: Inclusive lower bound, or None for no bound
+        end: Exclusive upper bound, or None for no bound
+        
+    Returns:
+        Filtered list of readings
+    """
+    return list(iter_filter_range(data, start, end))
+
+
+def iter_filter_range(readings: Iterable[Dict[str, Any]], start: Optional[datetime] = None,
+                      end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """Lazily keep readings with start <= timestamp < end.
+    
+    Args:
+        readings: Iterable of sensor readings
+        start: Inclusive lower bound, or None for no bound
+        end: Exclusive upper bound, or None for no bound
+        
+    Yields:
+        Readings inside the range
+    """
+    start_iso = start.isoformat() if start is not None else None
+    end_iso = end.isoformat() if end is not None else None
+    
+    for reading in readings:
+        timestamp = reading.get('timestamp', '')
+        if start_iso is not None and timestamp < start_iso:
+            continue
+        if end_iso is not None and timestamp >= end_iso:
+            continue
+        yield reading
+
+
+def replace_matching(data: List[Dict[str, Any]], readings: Iterable[Dict[str, Any]]) -> int:
+    """Overwrite readings in data that share a timestamp with a given reading.
+    
+    Args:
+        data: Stored readings, modified in place
+        readings: Replacement readings
+    
+    Returns:
+        Number of readings replaced
+    """
+    by_time = {parse_timestamp(r.get('timestamp', '')): r for r in readings}
+    by_time.pop(None, None)
+    
+    replaced = 0
+    for i, reading in enumerate(data):
+        new = by_time.get(parse_timestamp(reading.get('timestamp', '')))
+        if new is not None:
+            data[i] = new
+            replaced += 1
+    return replaced
+
+
+def replace_readings(store: 'ReadingStore', readings: Iterable[Dict[str, Any]]) -> int:
+    """Overwrite stored readings that share a timestamp with a given reading.
+    
+    Uses the store's replace_many() if it has one, otherwise loads and
+    saves the whole store.
+    
+    Returns:
+        Number of readings replaced
+    """
+    if hasattr(store, 'replace_many'):
+        return store.replace_many(readings)
+    
+    data = store.load()
+    replaced = replace_matching(data, readings)
+    if replaced:
+        store.save(data)
+    return replaced
+
+
+def iter_json_array(path: Path, chunk_size: int = DECODE_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of a JSON array file without loading it whole.
+    
+    The file is read in chunks and each element is decoded as soon as it
+    is complete, so memory holds one chunk plus one element.
+    
+    Args:
+        path: JSON file path
+        chunk_size: Characters read per step
+        
+    Yields:
+        Decoded array elements
+        
+    Raises:
+        StorageFormatError: If the file does not contain a JSON array
+    """
+    decoder = json.JSONDecoder()
+    
+    with open(path, 'r') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+        started = False
+        
+        while True:
+            # Skip whitespace and separators, refilling as needed
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                chunk = f.read(chunk_size)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            
+            if pos >= len(buffer):
+                raise StorageFormatError(f"{path} ends inside a JSON array")
+            
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise StorageFormatError(f"{path} does not contain a JSON array")
+                started = True
+                pos += 1
+                continue
+            if char == ']':
+                return
+            if char == ',':
+                pos += 1
+                continue
+            
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                end = None
+            
+            # An element touching the end of the buffer may be truncated
+            # (e.g. a number split across chunks), so read more first
+            if end is None or (end == len(buffer) and not eof):
+                if eof:
+                    raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+                chunk = f.read(chunk_size)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+                continue
+            
+            yield element
+            pos = end
+
+
+def parse_timestamp(timestamp: str) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp into an aware UTC datetime.
+    
+    Args:
+        timestamp: Timestamp string, with Z or numeric offset
+        
+    Returns:
+        UTC datetime, or None if the timestamp cannot be parsed
+    """
+    try:
+        dt = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def cached_parse(path: Path, parse: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Return the parsed readings of a file, parsing only if it changed.
+    
+    Entries are keyed on the file's mtime_ns and size, so a file rewritten
+    by another process is parsed again. The returned list is a copy, but
+    the reading dicts are shared with the cache and must not be mutated.
+    
+    Args:
+        path: Data file path
+        parse: Callback that parses the file into a list of readings
+        
+    Returns:
+        List of readings
+    """
+    cached = cached_readings(path)
+    if cached is not None:
+        return cached
+    
+    stat = os.stat(path)
+    data = parse()
+    _cache_parse(path, stat, data)
+    return list(data)
+
+
+def cached_readings(path: Path) -> Optional[List[Dict[str, Any]]]:
+    """Return a copy of the cached readings for a file if still valid."""
+    entry = _valid_cache_entry(path)
+    return None if entry is None else list(entry[2])
+
+
+def update_parse_cache(path: Path, data: List[Dict[str, Any]]) -> None:
+    """Record the readings just written to a file so the next load is free."""
+    _cache_parse(path, os.stat(path), list(data))
+
+
+def _valid_cache_entry(path: Path) -> Optional[Tuple[int, int, List[Dict[str, Any]]]]:
+    """Return the cache entry for a file if it still matches the file."""
+    key = os.path.abspath(path)
+    entry = _PARSE_CACHE.get(key)
+    if entry is None:
+        return None
+    
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    
+    if (stat.st_mtime_ns, stat.st_size) != entry[:2]:
+        return None
+    _PARSE_CACHE.move_to_end(key)
+    return entry
+
+
+def _cache_parse(path: Path, stat: os.stat_result, data: List[Dict[str, Any]]) -> None:
+    """Store a parse, evicting the least recently used files past the limit."""
+    key = os.path.abspath(path)
+    _PARSE_CACHE[key] = (stat.st_mtime_ns, stat.st_size, data)
+    _PARSE_CACHE.move_to_end(key)
+    while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+        _PARSE_CACHE.popitem(last=False)
+
+
+def invalidate_parse_cache(path: Optional[Path] = None) -> None:
+    """Drop the cached parse of one file, or of all files if path is None."""
+    if path is None:
+        _PARSE_CACHE.clear()
+    else:
+        _PARSE_CACHE.pop(os.path.abspath(path), None)
+
+
+class JsonArrayStore:
+    """Pretty-printed JSON array, the format served to the dashboard."""
+    
+    supports_append = False
+    supports_range_reads = False
+    
+    def __init__(self, path: Path):
+        """Initialize JSON array store.
+        
+        Args:
+            path: Path to the JSON data file
+        """
+        self.path = Path(path)
+    
+    def exists(self) -> bool:
+        return self.path.exists()
+    
+    def load(self) -> List[Dict[str, Any]]:
+        return sort_readings(cached_parse(self.path, self._parse))
+    
+    def _parse(self) -> List[Dict[str, Any]]:
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        
+        if not isinstance(data, list):
+            raise StorageFormatError(f"{self.path} does not contain a JSON array")
+        
+        return sort_readings(data)
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return filter_range(self.load(), start, end)
+    
+    def iter_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        cached = cached_readings(self.path)
+        if cached is not None:
+            readings = iter(cached)
+        else:
+            readings = (r for r in iter_json_array(self.path) if isinstance(r, dict))
+        return iter_filter_range(readings, start, end)
+    
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        sort_readings(data)
+        invalidate_parse_cache(self.path)
+        atomic_write(self.path, lambda f: json.dump(data, f, indent=2), suffix='.json')
+        update_parse_cache(self.path, data)
+    
+    def append(self, reading: Dict[str, Any]) -> None:
+        self.append_many([reading])
+    
+    def append_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        data = self.load() if self.exists() else []
+        count = len(data)
+        data.extend(readings)
+        self.save(data)
+        return len(data) - count
+    
+    def first_timestamp(self) -> Optional[str]:
+        if not self.exists():
+            return None
+        data = self.load()
+        return data[0].get('timestamp') if data else None
+    
+    def size_bytes(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+
+class JsonLinesStore:
+    """Append-only JSON Lines file with one reading per line.
+    
+    Appends write a single line instead of rewriting the whole file, which
+    keeps the per-reading cost constant regardless of history size.
+    """
+    
+    supports_append = True
+    supports_range_reads = False
+    
+    def __init__(self, path: Path):
+        """Initialize JSON Lines store.
+        
+        Args:
+            path: Path to the .jsonl data file
+        """
+        self.path = Path(path)
+    
+    def exists(self) -> bool:
+        return self.path.exists()
+    
+    def load(self) -> List[Dict[str, Any]]:
+        return sort_readings(cached_parse(self.path, lambda: sort_readings(list(self.iter_file()))))
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return filter_range(self.load(), start, end)
+    
+    def iter_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        cached = cached_readings(self.path)
+        readings = iter(cached) if cached is not None else self.iter_file()
+        return iter_filter_range(readings, start, end)
+    
+    def iter_file(self):
+        """Yield readings in file order, skipping malformed lines.
+        
+        A torn final line (e.g. after a power cut mid-append) is skipped
+        rather than invalidating the whole file.
+        """
+        with open_text(self.path) as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    reading = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Warning: Skipping malformed line {line_no} in {self.path}")
+                    continue
+                if isinstance(reading, dict):
+                    yield reading
+    
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        sort_readings(data)
+        
+        def write(f):
+            for reading in data:
+                f.write(encode_line(reading))
+        
+        invalidate_parse_cache(self.path)
+        atomic_write(self.path, write, suffix='.jsonl')
+        update_parse_cache(self.path, data)
+    
+    def append(self, reading: Dict[str, Any]) -> None:
+        self.append_many([reading])
+    
+    def append_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        readings = list(readings)
+        if not readings:
+            return 0
+        
+        entry = _valid_cache_entry(self.path)
+        invalidate_parse_cache(self.path)
+        
+        payload = ''.join(encode_line(reading) for reading in readings)
+        size = len(payload.encode('utf-8'))
+        with open(self.path, 'a') as f:
+            start = os.fstat(f.fileno()).st_size
+            f.write(payload)
+        count_written(size)
+        
+        # Extend the cached parse only if the file held exactly the cached
+        # bytes before this write and exactly ours were added to them;
+        # anything else (another writer) leaves the file to be parsed again
+        if entry is not None and entry[1] == start:
+            stat = os.stat(self.path)
+            if stat.st_size == start + size:
+                _cache_parse(self.path, stat, entry[2] + readings)
+        return len(readings)
+    
+    def first_timestamp(self) -> Optional[str]:
+        """Return the timestamp on the first line without reading the rest."""
+        if not self.path.exists():
+            return None
+        
+        with open_text(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    return json.loads(line).get('timestamp')
+                except (json.JSONDecodeError, AttributeError):
+                    return None
+        
+        return None
+    
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Return the newest n readings, reading backwards from the end.
+        
+        The last n + TAIL_SLACK lines are read and ordered by time, so a
+        reading appended late does not displace newer ones. A torn final
+        line is skipped like in iter_file.
+        """
+        if n <= 0 or not self.path.exists():
+            return []
+        
+        readings = []
+        for line in read_last_lines(self.path, n + TAIL_SLACK):
+            try:
+                reading = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(reading, dict):
+                readings.append(reading)
+        return newest_readings(readings, n)
+    
+    def size_bytes(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+
+class SegmentStore:
+    """Directory of time-partitioned JSON Lines segment files.
+    
+    Each segment holds one UTC day (or hour) of readings, named after the
+    period it covers. Retention unlinks whole expired segments and range
+    reads only open the segments that overlap the requested window.
+    Cold segments can be compressed (2024-01-15.jsonl.gz) and are read
+    transparently; appends always go to the uncompressed file.
+    """
+    
+    supports_append = True
+    supports_range_reads = True
+    
+    def __init__(self, path: Path, granularity: str = "day"):
+        """Initialize segment store.
+        
+        Args:
+            path: Directory holding the segment files
+            granularity: Segment length, "day" or "hour"
+        """
+        if granularity not in SEGMENT_NAME_FORMATS:
+            raise ValueError(f"Invalid granularity {granularity!r}, must be day or hour")
+        
+        self.path = Path(path)
+        self.granularity = granularity
+    
+    def segment_name(self, timestamp: str) -> Optional[str]:
+        """Return the segment file name a timestamp belongs to."""
+        dt = parse_timestamp(timestamp)
+        if dt is None:
+            return None
+        return dt.strftime(SEGMENT_NAME_FORMATS[self.granularity]) + '.jsonl'
+    
+    def segments(self) -> List[Path]:
+        """Return segment files in chronological order."""
+        if not self.path.is_dir():
+            return []
+        segments = list(self.path.glob('*.jsonl'))
+        for suffix in _COMPRESSORS:
+            segments.extend(self.path.glob('*.jsonl' + suffix))
+        return sorted(segments)
+    
+    @staticmethod
+    def segment_span(segment: Path):
+        """Return the (start, end) UTC period covered by a segment file."""
+        stem = segment.name.split('.', 1)[0]
+        for granularity, fmt in SEGMENT_NAME_FORMATS.items():
+            try:
+                start = datetime.strptime(stem, fmt).replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            length = timedelta(days=1) if granularity == "day" else timedelta(hours=1)
+            return start, start + length
+        return None
+    
+    def segments_between(self, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> List[Path]:
+        """Return segments overlapping [start, end)."""
+        selected = []
+        for segment in self.segments():
+            span = self.segment_span(segment)
+            if span is None:
+                continue
+            if start is not None and span[1] <= start:
+                continue
+            if end is not None and span[0] >= end:
+                continue
+            selected.append(segment)
+        return selected
+    
+    def exists(self) -> bool:
+        return bool(self.segments())
+    
+    def load(self) -> List[Dict[str, Any]]:
+        return self.load_range()
+    
+    def load_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        data = []
+        for segment in self.segments_between(start, end):
+            data.extend(JsonLinesStore(segment).load())
+        return filter_range(sort_readings(data), start, end)
+    
+    def iter_range(self, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        for segment in self.segments_between(start, end):
+            yield from JsonLinesStore(segment).iter_range(start, end)
+    
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for reading in sort_readings(data):
+            name = self.segment_name(reading.get('timestamp', ''))
+            if name is None:
+                raise ValueError(f"Invalid timestamp {reading.get('timestamp')!r}")
+            grouped.setdefault(name, []).append(reading)
+        
+        for name, readings in grouped.items():
+            JsonLinesStore(self.path / name).save(readings)
+        
+        for segment in self.segments():
+            if segment.name not in grouped:
+                segment.unlink()
+                invalidate_parse_cache(segment)
+    
+    def append(self, reading: Dict[str, Any]) -> None:
+        self.append_many([reading])
+    
+    def append_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for reading in readings:
+            name = self.segment_name(reading.get('timestamp', ''))
+            if name is None:
+                raise ValueError(f"Invalid timestamp {reading.get('timestamp')!r}")
+            grouped.setdefault(name, []).append(reading)
+        
+        if grouped:
+            self.path.mkdir(parents=True, exist_ok=True)
+        for name, segment_readings in grouped.items():
+            JsonLinesStore(self.path / name).append_many(segment_readings)
+        return sum(len(segment_readings) for segment_readings in grouped.values())
+    
+    def replace_many(self, readings: Iterable[Dict[str, Any]]) -> int:
+        """Overwrite stored readings that share a timestamp with a given reading.
+        
+        Only the segments covering those timestamps are rewritten.
+        
+        Returns:
+            Number of readings replaced
+        """
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for reading in readings:
+            name = self.segment_name(reading.get('timestamp', ''))
+            if name is not None:
+                grouped.setdefault(name.split('.', 1)[0], []).append(reading)
+        
+        replaced = 0
+        for segment in self.segments():
+            period_readings = grouped.get(segment.name.split('.', 1)[0])
+            if period_readings is None:
+                continue
+            store = JsonLinesStore(segment)
+            data = store.load()
+            count = replace_matching(data, period_readings)
+            if count:
+                store.save(data)
+                replaced += count
+        return replaced
+    
+    def drop_before(self, cutoff: datetime,
+                    on_drop: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> int:
+        """Unlink segments that end at or before the cutoff.
+        
+        Args:
+            cutoff: Oldest time to retain
+            on_drop: Optional callback given each expired segment's readings
+                before it is removed
+            
+        Returns:
+            Number of segments removed
+        """
+        removed = 0
+        for segment in self.segments():
+            span = self.segment_span(segment)
+            if span is None or span[1] > cutoff:
+                break
+            if on_drop is not None:
+                on_drop(JsonLinesStore(segment).load())
+            segment.unlink()
+            invalidate_parse_cache(segment)
+            removed += 1
+        return removed
+    
+    def compress_before(self, cutoff: datetime, method: str = "gzip") -> int:
+        """Compress segments that end at or before the cutoff.
+        
+        Readings appended late to an already compressed period are merged
+        into its compressed segment.
+        
+        Args:
+            cutoff: Segments ending at or before this time are compressed
+            method: Compression method, "gzip" or "lzma"
+            
+        Returns:
+            Number of segments compressed
+        """
+        if method not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression {method!r}, "
+                             f"must be one of {', '.join(COMPRESSION_SUFFIXES)}")
+        
+        segments = self.segments()
+        packed_by_period: Dict[str, List[Path]] = {}
+        for segment in segments:
+            if is_compressed(segment):
+                packed_by_period.setdefault(segment.name.split('.', 1)[0], []).append(segment)
+        
+        compressed = 0
+        for segment in segments:
+            span = self.segment_span(segment)
+            if span is None or span[1] > cutoff:
+                break
+            if is_compressed(segment):
+                continue
+            
+            readings = JsonLinesStore(segment).load()
+            packed = packed_by_period.get(segment.name.split('.', 1)[0], [])
+            for existing in packed:
+                # Skip readings an interrupted earlier pass already packed
+                kept = JsonLinesStore(existing).load()
+                seen = {reading.get('timestamp') for reading in kept}
+                readings = kept + [r for r in readings if r.get('timestamp') not in seen]
+            
+            target = segment.with_name(segment.name + COMPRESSION_SUFFIXES[method])
+            JsonLinesStore(target).save(readings)
+            segment.unlink()
+            invalidate_parse_cache(segment)
+            for existing in packed:
+                if existing != target:
+                    existing.unlink()
+                    invalidate_parse_cache(existing)
+            compressed += 1
+        return compressed
+    
+    def first_timestamp(self) -> Optional[str]:
+        for segment in self.segments():
+            timestamp = JsonLinesStore(segment).first_timestamp()
+            if timestamp is not None:
+                return timestamp
+        return None
+    
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        """Return the last n readings, reading only the newest segments."""
+        readings: List[Dict[str, Any]] = []
+        for segment in reversed(self.segments()):
+            if len(readings) >= n:
+                break
+            readings = JsonLinesStore(segment).tail(n - len(readings)) + readings
+        return newest_readings(readings, n)
+    
+    def size_bytes(self) -> int:
+        return sum(segment.stat().st_size for segment in self.segments())
+
+
+def encode_line(reading: Dict[str, Any]) -> str:
+    """Encode a reading as a compact JSON Lines record."""
+    return json.dumps(reading, separators=(',', ':')) + '\n'
+
+
+def infer_storage_format(path: Path) -> str:
+    """Guess the storage format from a data path.
+    
+    Args:
+        path: Data file path
+    
+    Returns:
+        Storage format name
+    """
+    suffix = Path(path).suffix
+    if suffix == '.jsonl':
+        return "jsonl"
+    if suffix == '.columnar':
+        return "columnar"
+    if suffix in ('.sqlite', '.db'):
+        return "sqlite"
+    if suffix == '.segments' or Path(path).is_dir():
+        return "segments"
+    return "json"
+
+
+def create_store(path: Path, storage_format: Optional[str] = None,
+                 segment_granularity: str = "day") -> ReadingStore:
+    """Factory function to create a storage backend.
+    
+    Args:
+        path: Data file path (a directory for segment stores)
+        storage_format: One of STORAGE_FORMATS, or None to infer from the path
+        segment_granularity: Segment length for segment stores, "day" or "hour"
+    
+    Returns:
+        ReadingStore instance
+    """
+    storage_format = storage_format or infer_storage_format(path)
+    
+    if storage_format == "json":
+        return JsonArrayStore(path)
+    if storage_format == "jsonl":
+        return JsonLinesStore(path)
+    if storage_format == "segments":
+        return SegmentStore(path, segment_granularity)
+    if storage_format == "columnar":
+        try:
+            from .columnar import ColumnarStore
+        except ImportError:
+            from columnar import ColumnarStore
+        return ColumnarStore(path)
+    if storage_format == "sqlite":
+        try:
+            from .sqlite_store import SqliteStore
+        except ImportError:
+            from sqlite_store import SqliteStore
+        return SqliteStore(path)
+    
+    raise ValueError(f"Unknown storage format {storage_format!r}, "
+                     f"must be one of {', '.join(STORAGE_FORMATS)}")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+summaries.py - Dashboard Summary Generator
+==========================================
+
+Writes summaries.json next to data.json with the per-day averages plotted
+by the dashboard's 30-day charts (index.html prefers these over averaging
+data.json in the browser). Averages come from DataLogger.aggregate, the
+same query the coach uses.
+
+Environment Variables:
+- DATA_FORMAT=json - Storage format used by sensor_logger.py
+- JOURNAL=0 - If "1", include readings still in sensor_logger.py's journal
+- ROLLUP_DAYS=0 - If positive, days older than the raw window are served
+  from the rollup tiers kept by sensor_logger.py
+
+Usage:
+  python3 summaries.py
+
+Output: ../summaries.json
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+try:
+    from .logger import DataLogger
+    from .rollup import DAILY, align_down
+    from .storage import METRICS, atomic_write
+except ImportError:
+    # Handle running as script
+    from logger import DataLogger
+    from rollup import DAILY, align_down
+    from storage import METRICS, atomic_write
+
+DATA_FORMAT = os.getenv("DATA_FORMAT", "json")
+JOURNAL = os.getenv("JOURNAL", "0") == "1"
+ROLLUP_DAYS = int(os.getenv("ROLLUP_DAYS", "0"))
+
+# File paths
+DATA_JSON = Path(__file__).parent.parent / "data.json"
+DATA_FILE = DATA_JSON if DATA_FORMAT == "json" else DATA_JSON.with_suffix(f".{DATA_FORMAT}")
+SUMMARIES_FILE = Path(__file__).parent.parent / "summaries.json"
+
+# Days of daily averages published for the dashboard
+SUMMARY_DAYS = 30
+
+# Decimal places of each metric's published averages
+PRECISION = {"ph": 3, "tds": 2, "temp_c": 2}
+
+
+def daily_averages(data_logger: DataLogger, days: int = SUMMARY_DAYS,
+                   now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Average each metric per UTC day.
+    
+    Args:
+        data_logger: Logger of the data to summarize
+        days: Number of days, counting today
+        now: Current time (default: now)
+    
+    Returns:
+        One row per day with readings, oldest first:
+        {"date": "YYYY-MM-DD", "ph": ..., "tds": ..., "temp_c": ...}
+    """
+    now = now or datetime.now(timezone.utc)
+    since = align_down(now, DAILY) - timedelta(days=days - 1)
+    
+    rows = []
+    for record in data_logger.aggregate(since, bucket="1d", funcs=("mean",)):
+        row: Dict[str, Any] = {"date": record["timestamp"][:10]}
+        for metric in METRICS:
+            stats = record[metric]
+            row[metric] = None if stats is None else round(stats["mean"], PRECISION[metric])
+        rows.append(row)
+    return rows
+
+
+def build_summaries(data_logger: DataLogger, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build the summaries.json document."""
+    now = now or datetime.now(timezone.utc)
+    return {
+        "generated_at": now.isoformat(),
+        "last30_daily_avg": daily_averages(data_logger, SUMMARY_DAYS, now),
+    }
+
+
+def write_summaries(data_logger: DataLogger, dest_file: Path) -> bool:
+    """Write summaries.json atomically.
+    
+    Returns:
+        True if written successfully, False otherwise
+    """
+    try:
+        summaries = build_summaries(data_logger)
+        atomic_write(Path(dest_file), lambda f: json.dump(summaries, f, indent=2), suffix='.json')
+        print(f"Wrote {len(summaries['last30_daily_avg'])} daily averages to {dest_file}")
+        return True
+    except Exception as e:
+        print(f"Error writing summaries to {dest_file}: {e}")
+        return False
+
+
+def main():
+    """Main entry point for summary generation."""
+    data_logger = DataLogger(DATA_FILE, storage_format=DATA_FORMAT, journal=JOURNAL,
+                             rollup_days=ROLLUP_DAYS)
+    if not data_logger.store.exists():
+        print(f"Warning: {DATA_FILE} not found")
+        sys.exit(1)
+    
+    sys.exit(0 if write_summaries(data_logger, SUMMARIES_FILE) else 1)
+
+
+if __name__ == "__main__":
+    main()
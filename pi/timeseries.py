@@ -0,0 +1,194 @@
+"""
+Columnar In-Memory Time Series
+==============================
+
+Compact container for readings: one ``array('q')`` of epoch microsecond
+timestamps plus one ``array('d')`` per metric, with NaN for null. A
+reading costs 32 bytes instead of a dict with an ISO string and three
+float objects (roughly 400 bytes), and the timestamp column stays sorted
+so time slices are found by bisection.
+
+Convert at the edges with ``TimeSeries.from_readings`` and
+``to_readings``. DataLogger.load_series builds one for coach.py's analysis
+window; summaries.py needs no raw readings and uses DataLogger.aggregate.
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+
+try:
+    from .index import TimeBound, bound_epoch_us, to_epoch_us, from_epoch_us
+    from .storage import METRICS
+except ImportError:
+    # Handle running as script
+    from index import TimeBound, bound_epoch_us, to_epoch_us, from_epoch_us
+    from storage import METRICS
+
+NAN = float('nan')
+
+
+class TimeSeries:
+    """Sorted columnar readings with zero-copy time slices.
+    
+    Slices share the parent's arrays and only narrow the visible row
+    range, so they are read-only; insert into the parent series instead.
+    """
+    
+    def __init__(self, metrics: Iterable[str] = METRICS):
+        """Create an empty series.
+        
+        Args:
+            metrics: Metric columns to hold
+        """
+        self.metrics = tuple(metrics)
+        self.epochs = array('q')
+        self.columns: Dict[str, array] = {metric: array('d') for metric in self.metrics}
+        self._lo = 0
+        self._hi: Optional[int] = None  # None tracks the end of the arrays
+        self._is_slice = False
+    
+    @classmethod
+    def from_readings(cls, readings: Iterable[Dict[str, Any]],
+                      metrics: Iterable[str] = METRICS) -> 'TimeSeries':
+        """Build a series from reading dicts.
+        
+        Readings may arrive in any order and from a generator; each is
+        converted as it is consumed. Readings with an unparseable
+        timestamp are left out.
+        
+        Args:
+            readings: Reading dicts with 'timestamp' as ISO string or datetime
+            metrics: Metric columns to keep
+        
+        Returns:
+            New TimeSeries
+        """
+        series = cls(metrics)
+        in_order = True
+        for reading in readings:
+            epoch_us = to_epoch_us(reading.get('timestamp', ''))
+            if epoch_us is None:
+                continue
+            if series.epochs and epoch_us < series.epochs[-1]:
+                in_order = False
+            series.epochs.append(epoch_us)
+            for metric in series.metrics:
+                value = reading.get(metric)
+                series.columns[metric].append(NAN if value is None else float(value))
+        
+        if not in_order:
+            series._sort()
+        return series
+    
+    def _sort(self) -> None:
+        """Restore the sorted invariant after unordered bulk loading."""
+        order = sorted(range(len(self.epochs)), key=self.epochs.__getitem__)
+        self.epochs = array('q', (self.epochs[i] for i in order))
+        for metric in self.metrics:
+            column = self.columns[metric]
+            self.columns[metric] = array('d', (column[i] for i in order))
+    
+    @property
+    def lo(self) -> int:
+        return self._lo
+    
+    @property
+    def hi(self) -> int:
+        return len(self.epochs) if self._hi is None else self._hi
+    
+    def __len__(self) -> int:
+        return self.hi - self._lo
+    
+    def insert(self, reading: Dict[str, Any]) -> None:
+        """Insert a reading, keeping the timestamp column sorted.
+        
+        The position is found by bisection; readings newer than the last
+        one are appended without moving any data.
+        
+        Raises:
+            ValueError: If the series is a slice or the timestamp is invalid
+        """
+        if self._is_slice:
+            raise ValueError("Cannot insert into a TimeSeries slice")
+        
+        epoch_us = to_epoch_us(reading.get('timestamp', ''))
+        if epoch_us is None:
+            raise ValueError(f"Invalid timestamp {reading.get('timestamp')!r}")
+        
+        if not self.epochs or epoch_us >= self.epochs[-1]:
+            self.epochs.append(epoch_us)
+            for metric in self.metrics:
+                value = reading.get(metric)
+                self.columns[metric].append(NAN if value is None else float(value))
+            return
+        
+        pos = bisect_right(self.epochs, epoch_us)
+        self.epochs.insert(pos, epoch_us)
+        for metric in self.metrics:
+            value = reading.get(metric)
+            self.columns[metric].insert(pos, NAN if value is None else float(value))
+    
+    def slice(self, start: TimeBound = None, end: TimeBound = None) -> 'TimeSeries':
+        """Return a read-only view of readings with start <= timestamp < end.
+        
+        The view shares this series' arrays; nothing is copied.
+        
+        Args:
+            start: Inclusive lower bound (datetime, ISO string or epoch
+                microseconds), or None for no bound
+            end: Exclusive upper bound, or None for no bound
+        """
+        lo, hi = self._lo, self.hi
+        if start is not None:
+            lo = bisect_left(self.epochs, bound_epoch_us(start), lo, hi)
+        if end is not None:
+            hi = bisect_left(self.epochs, bound_epoch_us(end), lo, hi)
+        
+        view = TimeSeries.__new__(TimeSeries)
+        view.metrics = self.metrics
+        view.epochs = self.epochs
+        view.columns = self.columns
+        view._lo = lo
+        view._hi = max(lo, hi)
+        view._is_slice = True
+        return view
+    
+    def values(self, metric: str) -> Iterator[float]:
+        """Yield the non-null values of a metric in time order."""
+        column = self.columns[metric]
+        for i in range(self._lo, self.hi):
+            value = column[i]
+            if not math.isnan(value):
+                yield value
+    
+    def first_epoch(self) -> Optional[int]:
+        return self.epochs[self._lo] if len(self) else None
+    
+    def last_epoch(self) -> Optional[int]:
+        return self.epochs[self.hi - 1] if len(self) else None
+    
+    def reading(self, i: int) -> Dict[str, Any]:
+        """Return the i-th reading of the series as a dict."""
+        if not 0 <= i < len(self):
+            raise IndexError("TimeSeries index out of range")
+        pos = self._lo + i
+        reading: Dict[str, Any] = {"timestamp": from_epoch_us(self.epochs[pos]).isoformat()}
+        for metric in self.metrics:
+            value = self.columns[metric][pos]
+            reading[metric] = None if math.isnan(value) else value
+        return reading
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.reading(i)
+    
+    def to_readings(self) -> List[Dict[str, Any]]:
+        """Convert the series back to reading dicts with ISO timestamps."""
+        return list(self)
+    
+    def nbytes(self) -> int:
+        """Return the memory held by the visible rows' column data."""
+        width = self.epochs.itemsize + sum(self.columns[m].itemsize for m in self.metrics)
+        return len(self) * width
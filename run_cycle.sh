@@ -13,10 +13,25 @@ python3 pi/sensor_logger.py --once || true
 # 2) Generate coach (will use OpenAI if available, otherwise local fallback)
 python3 pi/coach.py || true
 
-# 3) Publish to Pages
+# 3) Publish to Pages (compacting the reading journal first when enabled;
+#    RAM-buffered readings are flushed and published by sensor_logger.py)
+if [ -n "${BUFFER_DIR:-}" ]; then
+  :
+elif [ "${JOURNAL:-0}" = "1" ]; then
+  if [ "${DATA_FORMAT:-json}" = "json" ]; then DATA_FILE=data.json; else DATA_FILE="data.${DATA_FORMAT}"; fi
+  python3 pi/logger.py compact "$DATA_FILE" --format "${DATA_FORMAT:-json}" \
+    --window-days "${WINDOW_DAYS:-60}" --rollup-days "${ROLLUP_DAYS:-0}" \
+    --hourly-days "${HOURLY_DAYS:-3650}" --compress-after-days "${COMPRESS_AFTER_DAYS:-0}" \
+    --compression "${COMPRESSION:-gzip}" --max-bytes "${MAX_DATA_BYTES:-0}" \
+    --publish data.json || true
+elif [ "${DATA_FORMAT:-json}" != "json" ]; then
+  python3 pi/logger.py export "data.${DATA_FORMAT}" data.json --format "${DATA_FORMAT}" || true
+fi
+python3 pi/summaries.py || true
 mkdir -p docs
 cp -f data.json  docs/data.json
 cp -f coach.json docs/coach.json
-git add docs/data.json docs/coach.json
+cp -f summaries.json docs/summaries.json || true
+git add docs/data.json docs/coach.json docs/summaries.json || true
 git commit -m "pages: auto publish $(date -u +%FT%TZ)" || true
 git push origin main || true
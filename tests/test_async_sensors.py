@@ -0,0 +1,182 @@
+"""
+Test the asyncio sensor interface
+"""
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from async_sensors import AsyncAquaponicsSensors
+from sensors import AquaponicsSensors
+
+
+class SlowTemp:
+    """Temperature sensor taking a DS18B20-like conversion time."""
+    
+    def __init__(self, delay: float, temp_c=22.5):
+        self.delay = delay
+        self.temp_c = temp_c
+    
+    def read_celsius(self):
+        time.sleep(self.delay)
+        return self.temp_c
+
+
+class SlowADC:
+    """ADC taking a fixed time per sample and tracking overlapping reads."""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+    
+    def read_voltage(self, channel: int) -> float:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return {0: 2.5, 1: 1.8}[channel]
+
+
+def mock_sensors(temp_delay=0.0, adc_delay=0.0, temp_c=22.5):
+    sensors = AquaponicsSensors(mock=True)
+    sensors.temp_sensor = SlowTemp(temp_delay, temp_c)
+    sensors.adc = SlowADC(adc_delay)
+    return sensors
+
+
+class TestAsyncReads:
+    """Test individual async reads match the synchronous interface."""
+    
+    def test_reads_match_sync(self):
+        sync = AquaponicsSensors(mock=True)
+        
+        async def read():
+            async with AsyncAquaponicsSensors(AquaponicsSensors(mock=True)) as sensors:
+                return (await sensors.read_ph(), await sensors.read_temperature(),
+                        await sensors.read_tds(), await sensors.read_tds(10.0))
+        
+        ph, temp_c, tds, tds_cold = asyncio.run(read())
+        assert ph == sync.read_ph()
+        assert temp_c == sync.read_temperature()
+        assert tds == sync.read_tds()
+        assert tds_cold == sync.read_tds(10.0)
+    
+    def test_read_all(self):
+        async def read():
+            async with AsyncAquaponicsSensors(mock_sensors(0.2, 0.1)) as sensors:
+                start = time.perf_counter()
+                reading = await sensors.read_all()
+                return reading, time.perf_counter() - start, sensors.last_timings
+        
+        reading, elapsed, timings = asyncio.run(read())
+        assert set(reading) == {'timestamp', 'ph', 'tds', 'temp_c'}
+        assert reading['temp_c'] == 22.5
+        assert reading['tds'] is not None
+        # Sequential reads would take 0.2 + 2 * 0.1 = 0.4 s
+        assert elapsed < 0.35
+        assert timings['total'] >= timings['temperature']
+    
+    def test_adc_reads_serialized(self):
+        sensors = mock_sensors(adc_delay=0.05)
+        
+        async def read():
+            async with AsyncAquaponicsSensors(sensors, max_workers=4) as wrapped:
+                await asyncio.gather(wrapped.read_ph(), wrapped.read_tds(25.0), wrapped.read_ph())
+        
+        asyncio.run(read())
+        assert sensors.adc.max_active == 1
+
+
+class TestTimeouts:
+    """Test that a stalled read does not hold up the event loop."""
+    
+    def test_stalled_temperature_times_out(self, capsys):
+        async def read():
+            async with AsyncAquaponicsSensors(mock_sensors(temp_delay=0.5), timeout=0.1) as sensors:
+                start = time.perf_counter()
+                reading = await sensors.read_all()
+                return reading, time.perf_counter() - start
+        
+        reading, elapsed = asyncio.run(read())
+        assert reading['temp_c'] is None
+        assert reading['ph'] is not None
+        # TDS falls back to 25°C compensation
+        assert reading['tds'] == AquaponicsSensors(mock=True).read_tds(25.0)
+        assert elapsed < 0.4
+        assert "timed out" in capsys.readouterr().out
+    
+    def test_stalled_adc_read_keeps_the_bus(self, capsys):
+        sensors = mock_sensors()
+        sensors.adc = SlowADC(0.0)
+        read_voltage = sensors.adc.read_voltage
+        calls = []
+        
+        def stall_first(channel):
+            calls.append(channel)
+            if len(calls) == 1:
+                time.sleep(0.3)
+            return read_voltage(channel)
+        
+        sensors.adc.read_voltage = stall_first
+        
+        async def read():
+            async with AsyncAquaponicsSensors(sensors, timeout=0.1, max_workers=4) as wrapped:
+                start = time.perf_counter()
+                first, second = await asyncio.gather(wrapped.read_ph(), wrapped.read_ph())
+                return first, second, time.perf_counter() - start
+        
+        first, second, elapsed = asyncio.run(read())
+        assert first is None
+        assert second == AquaponicsSensors(mock=True).read_ph()
+        # The second read waited for the stalled worker, not just its timeout
+        assert elapsed >= 0.3
+        assert "timed out" in capsys.readouterr().out
+    
+    def test_loop_stays_responsive(self):
+        async def read():
+            ticks = 0
+            
+            async def heartbeat():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+            
+            beat = asyncio.ensure_future(heartbeat())
+            async with AsyncAquaponicsSensors(mock_sensors(0.2, 0.05)) as sensors:
+                await sensors.read_all()
+            beat.cancel()
+            return ticks
+        
+        assert asyncio.run(read()) >= 5
+    
+    def test_several_tanks_concurrently(self):
+        async def read():
+            tanks = [AsyncAquaponicsSensors(mock_sensors(0.2, 0.05)) for _ in range(3)]
+            start = time.perf_counter()
+            readings = await asyncio.gather(*(tank.read_all() for tank in tanks))
+            elapsed = time.perf_counter() - start
+            for tank in tanks:
+                tank.close()
+            return readings, elapsed
+        
+        readings, elapsed = asyncio.run(read())
+        assert all(reading['temp_c'] == 22.5 for reading in readings)
+        assert elapsed < 0.5
+    
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            AsyncAquaponicsSensors(mock_sensors(), timeout=0)
+        with pytest.raises(ValueError):
+            AsyncAquaponicsSensors(mock_sensors(), max_workers=0)
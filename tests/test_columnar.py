@@ -0,0 +1,121 @@
+"""
+Test columnar.py - Memory-mapped binary column store
+"""
+
+import pytest
+import math
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from columnar import ColumnarStore, TIMESTAMP_FILE
+from logger import DataLogger
+from storage import create_store
+
+
+class TestColumnarStore:
+    """Test the mmap-backed columnar store."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / "data.columnar"
+        self.start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.readings = [
+            {
+                "timestamp": (self.start + timedelta(minutes=5 * i)).isoformat(),
+                "ph": (6.8, 6.85, 6.9, 6.95, 7.0)[i % 5],
+                "tds": 350.5 + i,
+                "temp_c": None if i % 7 == 0 else 22.25,
+            }
+            for i in range(100)
+        ]
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_factory(self):
+        assert isinstance(create_store(self.path), ColumnarStore)
+    
+    def test_save_and_load_round_trip(self):
+        store = ColumnarStore(self.path)
+        store.save(list(reversed(self.readings)))
+        
+        assert store.row_count() == 100
+        assert (self.path / TIMESTAMP_FILE).stat().st_size == 100 * 8
+        assert store.load() == self.readings
+    
+    def test_append_and_out_of_order_append(self):
+        store = ColumnarStore(self.path)
+        for reading in self.readings[:10]:
+            store.append(reading)
+        store.append(self.readings[20])
+        store.append(self.readings[15])
+        
+        loaded = store.load()
+        assert [r["timestamp"] for r in loaded] == sorted(r["timestamp"] for r in loaded)
+        assert len(loaded) == 12
+    
+    def test_zero_copy_columns(self):
+        store = ColumnarStore(self.path)
+        store.save(list(self.readings))
+        
+        with store.columns(self.start + timedelta(minutes=50), self.start + timedelta(minutes=100)) as view:
+            assert len(view) == 10
+            assert view.timestamps.format == 'q'
+            assert view.columns["tds"].format == 'f'
+            assert view.columns["tds"][0] == pytest.approx(360.5)
+            assert math.isnan(view.columns["temp_c"][4])  # i == 14
+    
+    def test_partial_row_is_ignored_and_repaired(self):
+        store = ColumnarStore(self.path)
+        store.save(list(self.readings[:3]))
+        
+        # Simulate a crash after only the timestamp column was appended
+        with open(self.path / TIMESTAMP_FILE, 'ab') as f:
+            f.write(b'\x00' * 8)
+        assert store.row_count() == 3
+        
+        store.append(self.readings[3])
+        assert store.load() == self.readings[:4]
+    
+    def test_drop_before(self):
+        store = ColumnarStore(self.path)
+        store.save(list(self.readings))
+        dropped = []
+        
+        removed = store.drop_before(self.start + timedelta(minutes=5 * 60), on_drop=dropped.extend)
+        
+        assert removed == 60
+        assert dropped == self.readings[:60]
+        assert store.load() == self.readings[60:]
+
+
+def test_data_logger_with_columnar_backend():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        data_logger = DataLogger(Path(temp_dir) / "data.columnar", window_days=7)
+        now = datetime.now(timezone.utc)
+        for hours_ago in (24 * 10, 48, 24, 1):
+            assert data_logger.append_reading({
+                "timestamp": (now - timedelta(hours=hours_ago)).isoformat(),
+                "ph": 7.0, "tds": 350.0, "temp_c": 22.5
+            }) is True
+        
+        # The 10-day-old reading is past the cutoff plus slack and is dropped
+        assert len(data_logger.load_data()) == 3
+        assert len(data_logger.get_recent_data(1)) == 1
+        assert data_logger.get_data_stats()["total_readings"] == 3
+    finally:
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -307,6 +307,24 @@ class TestDailyAverages:
         
         # Aug 16 should just be 7.2
         assert ph_averages["2025-08-16"] == pytest.approx(7.2)
+    
+    def test_matches_logger_aggregate(self, tmp_path):
+        """Test summaries.json daily averages match the frontend port."""
+        from logger import DataLogger
+        from summaries import daily_averages
+        
+        data_logger = DataLogger(tmp_path / "data.json", window_days=0)
+        data_logger.save_data(list(self.month_data))
+        latest = datetime.fromisoformat(self.month_data[-1]["timestamp"][:-1] + "+00:00")
+        
+        rows = daily_averages(data_logger, days=30, now=latest)
+        # The summaries cover whole UTC days, while the frontend's rolling
+        # window cuts its first day short, so compare with unfiltered days
+        expected = calculate_daily_averages(self.month_data, 'ph')
+        
+        assert len(rows) == 30
+        for row in rows:
+            assert row["ph"] == pytest.approx(expected[row["date"]], abs=1e-3)
 
 
 class TestTemperatureHandling:
@@ -0,0 +1,143 @@
+"""
+Test DS18B20 probe discovery and parallel reads against a fake sysfs tree
+"""
+
+import time
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from hal import DS18B20Probes, RealDS18B20, parse_w1_slave
+
+
+def add_probe(folder: Path, probe_id: str, millidegrees: int = 22500, crc: str = "YES") -> None:
+    """Create a w1_slave file as the w1-therm driver exposes it."""
+    device = folder / probe_id
+    device.mkdir(parents=True, exist_ok=True)
+    (device / "w1_slave").write_text(
+        f"72 01 4b 46 7f ff 0e 10 57 : crc=57 {crc}\n"
+        f"72 01 4b 46 7f ff 0e 10 57 t={millidegrees}\n"
+    )
+
+
+class TestParseW1Slave:
+    """Test w1_slave parsing."""
+    
+    def test_valid_reading(self):
+        assert parse_w1_slave(["aa : crc=57 YES\n", "aa t=21375\n"]) == 21.375
+    
+    def test_negative_reading(self):
+        assert parse_w1_slave(["aa : crc=57 YES\n", "aa t=-1250\n"]) == -1.25
+    
+    def test_crc_failure(self):
+        assert parse_w1_slave(["aa : crc=57 NO\n", "aa t=21375\n"]) is None
+    
+    def test_malformed(self):
+        assert parse_w1_slave([]) is None
+        assert parse_w1_slave(["aa : crc=57 YES\n", "aa\n"]) is None
+        assert parse_w1_slave(["aa : crc=57 YES\n", "aa t=abc\n"]) is None
+
+
+class TestDS18B20Probes:
+    """Test probe discovery caching and multi-probe reads."""
+    
+    def test_discovers_probes_sorted(self, tmp_path):
+        add_probe(tmp_path, "28-000000000002")
+        add_probe(tmp_path, "28-000000000001")
+        (tmp_path / "w1_bus_master1").mkdir()
+        
+        probes = DS18B20Probes(str(tmp_path))
+        assert probes.probe_ids == ["28-000000000001", "28-000000000002"]
+    
+    def test_discovery_is_cached(self, tmp_path):
+        add_probe(tmp_path, "28-000000000001")
+        probes = DS18B20Probes(str(tmp_path))
+        assert probes.probe_ids == ["28-000000000001"]
+        
+        add_probe(tmp_path, "28-000000000002")
+        assert probes.probe_ids == ["28-000000000001"]
+    
+    def test_rescan_after_interval(self, tmp_path):
+        add_probe(tmp_path, "28-000000000001")
+        probes = DS18B20Probes(str(tmp_path), rescan_seconds=0)
+        assert len(probes.probe_ids) == 1
+        
+        add_probe(tmp_path, "28-000000000002")
+        assert len(probes.probe_ids) == 2
+    
+    def test_rescan_when_none_found(self, tmp_path):
+        probes = DS18B20Probes(str(tmp_path))
+        assert probes.probe_ids == []
+        
+        add_probe(tmp_path, "28-000000000001")
+        assert probes.probe_ids == ["28-000000000001"]
+    
+    def test_rescan_after_probe_disappears(self, tmp_path):
+        add_probe(tmp_path, "28-000000000001")
+        add_probe(tmp_path, "28-000000000002")
+        probes = DS18B20Probes(str(tmp_path))
+        assert len(probes.probe_ids) == 2
+        
+        (tmp_path / "28-000000000002" / "w1_slave").unlink()
+        (tmp_path / "28-000000000002").rmdir()
+        assert probes.read_all() == {"28-000000000001": 22.5, "28-000000000002": None}
+        assert probes.probe_ids == ["28-000000000001"]
+    
+    def test_read_all(self, tmp_path):
+        add_probe(tmp_path, "28-000000000001", 18250)
+        add_probe(tmp_path, "28-000000000002", 24000)
+        add_probe(tmp_path, "28-000000000003", 24000, crc="NO")
+        
+        probes = DS18B20Probes(str(tmp_path))
+        assert probes.read_all() == {
+            "28-000000000001": 18.25,
+            "28-000000000002": 24.0,
+            "28-000000000003": None,
+        }
+    
+    def test_reads_are_concurrent(self, tmp_path):
+        """Cycle time stays near one conversion as probes are added."""
+        for i in range(4):
+            add_probe(tmp_path, f"28-00000000000{i}")
+        
+        class SlowProbes(DS18B20Probes):
+            def read_probe(self, probe_id):
+                time.sleep(0.2)
+                return super().read_probe(probe_id)
+        
+        probes = SlowProbes(str(tmp_path))
+        start = time.perf_counter()
+        temps = probes.read_all()
+        elapsed = time.perf_counter() - start
+        
+        assert len(temps) == 4
+        assert all(temp == 22.5 for temp in temps.values())
+        assert elapsed < 0.6
+
+
+class TestRealDS18B20:
+    """Test the single-value temperature sensor over the probe manager."""
+    
+    def test_reads_first_probe(self, tmp_path):
+        add_probe(tmp_path, "28-000000000002", 25000)
+        add_probe(tmp_path, "28-000000000001", 20000)
+        sensor = RealDS18B20(device_folder=str(tmp_path))
+        assert sensor.read_celsius() == 20.0
+    
+    def test_reads_selected_probe(self, tmp_path):
+        add_probe(tmp_path, "28-000000000001", 20000)
+        add_probe(tmp_path, "28-000000000002", 25000)
+        sensor = RealDS18B20("28-000000000002", device_folder=str(tmp_path))
+        assert sensor.read_celsius() == 25.0
+        assert sensor.read_probes() == {"28-000000000001": 20.0, "28-000000000002": 25.0}
+    
+    def test_no_probes(self, tmp_path):
+        sensor = RealDS18B20(device_folder=str(tmp_path))
+        assert sensor.read_celsius() is None
+        assert sensor.read_probes() == {}
+    
+    def test_missing_selected_probe(self, tmp_path):
+        sensor = RealDS18B20("28-000000000009", device_folder=str(tmp_path))
+        assert sensor.read_celsius() is None
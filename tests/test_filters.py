@@ -0,0 +1,77 @@
+"""
+Test oversampling noise filters
+"""
+
+import statistics
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from filters import ADC_LSB, FILTER_METHODS, MAD_SCALE, reduce_samples
+
+
+class TestReduceSamples:
+    """Test each reduction on bursts with and without outliers."""
+    
+    def test_constant_samples(self):
+        for method in FILTER_METHODS:
+            reduced = reduce_samples([1.5] * 10, method)
+            assert reduced.value == 1.5
+            assert reduced.spread == 0.0
+            assert reduced.samples == 10
+    
+    def test_empty(self):
+        assert reduce_samples([], "median") is None
+    
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            reduce_samples([1.0], "mean")
+    
+    def test_median(self):
+        reduced = reduce_samples([1.0, 5.0, 2.0, 100.0, 3.0], "median")
+        assert reduced.value == 3.0
+        # |x - 3| = 2, 2, 1, 97, 0 -> MAD 2
+        assert reduced.spread == pytest.approx(2 * MAD_SCALE)
+        assert reduced.rejected == 0
+    
+    def test_trimmed_mean_drops_tails(self):
+        samples = [0.0, 2.0, 2.1, 2.2, 2.3, 1.9, 2.0, 1.8, 2.4, 50.0]
+        reduced = reduce_samples(samples, "trimmed-mean")
+        kept = sorted(samples)[2:8]
+        assert reduced.value == pytest.approx(statistics.fmean(kept))
+        assert reduced.spread == pytest.approx(statistics.pstdev(kept))
+        assert reduced.rejected == 4
+    
+    def test_trimmed_mean_short_burst(self):
+        reduced = reduce_samples([1.0, 2.0], "trimmed-mean")
+        assert reduced.value == 1.5
+        assert reduced.rejected == 0
+    
+    def test_hampel_rejects_spikes_only(self):
+        clean = [2.50, 2.51, 2.49, 2.50, 2.52, 2.48, 2.50, 2.51]
+        reduced = reduce_samples(clean + [3.4, 0.1], "hampel")
+        assert reduced.rejected == 2
+        assert reduced.value == pytest.approx(statistics.fmean(clean))
+        assert reduced.spread == pytest.approx(statistics.pstdev(clean))
+    
+    def test_hampel_keeps_clean_burst(self):
+        clean = [2.50, 2.51, 2.49, 2.50, 2.52, 2.48]
+        reduced = reduce_samples(clean, "hampel")
+        assert reduced.rejected == 0
+        assert reduced.value == pytest.approx(statistics.fmean(clean))
+    
+    def test_hampel_zero_mad_keeps_one_step_neighbours(self):
+        # Most samples agree exactly, so the MAD is 0 before the floor
+        quiet = [2.5] * 7 + [2.5 + ADC_LSB, 2.5 - ADC_LSB]
+        reduced = reduce_samples(quiet + [3.4], "hampel")
+        assert reduced.rejected == 1
+        assert reduced.value == pytest.approx(statistics.fmean(quiet))
+    
+    def test_robust_to_outlier(self):
+        samples = [1.8] * 19 + [4.9]
+        for method in FILTER_METHODS:
+            assert reduce_samples(samples, method).value == pytest.approx(1.8)
@@ -11,7 +11,11 @@ import sys
 # Add pi module to path  
 sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
 
+import types
+
 from hal import (
+    RealADS1115,
+    sample_voltages,
     MockADC,
     MockOneWireTemp,
     create_adc,
@@ -280,6 +284,117 @@ class TestMockIntegration:
         assert temp is None or isinstance(temp, float)
 
 
+def install_fake_adafruit(monkeypatch):
+    """Install minimal busio/board/adafruit_ads1x15 modules and return the AnalogIn log."""
+    created = []
+    
+    class FakeADS1115:
+        P0, P1, P2, P3 = range(4)
+        
+        def __init__(self, i2c, address=0x48):
+            self.address = address
+            self.data_rate = 128
+            self.mode = "single"
+            self.conversions = 0
+    
+    class FakeAnalogIn:
+        def __init__(self, adc, pin):
+            self.adc = adc
+            self.pin = pin
+            created.append(pin)
+        
+        @property
+        def voltage(self):
+            self.adc.conversions += 1
+            return 0.5 + self.pin
+    
+    modules = {
+        "busio": types.SimpleNamespace(I2C=lambda scl, sda: object()),
+        "board": types.SimpleNamespace(SCL=3, SDA=2),
+        "adafruit_ads1x15": types.ModuleType("adafruit_ads1x15"),
+        "adafruit_ads1x15.ads1115": types.SimpleNamespace(ADS1115=FakeADS1115),
+        "adafruit_ads1x15.ads1x15": types.SimpleNamespace(Mode=types.SimpleNamespace(CONTINUOUS="continuous")),
+        "adafruit_ads1x15.analog_in": types.SimpleNamespace(AnalogIn=FakeAnalogIn),
+    }
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    return created
+
+
+class TestADCSession:
+    """Test the persistent ADS1115 session against fake Adafruit modules."""
+    
+    def test_analog_in_cached_per_channel(self, monkeypatch):
+        created = install_fake_adafruit(monkeypatch)
+        adc = RealADS1115()
+        
+        assert adc.read_voltage(0) == 0.5
+        assert adc.read_voltage(0) == 0.5
+        assert adc.read_voltage(1) == 1.5
+        assert created == [0, 1]
+    
+    def test_invalid_channel(self, monkeypatch):
+        install_fake_adafruit(monkeypatch)
+        with pytest.raises(ValueError):
+            RealADS1115().read_voltage(4)
+    
+    def test_burst_read(self, monkeypatch):
+        created = install_fake_adafruit(monkeypatch)
+        adc = RealADS1115()
+        
+        voltages = adc.read_voltages([0, 1], samples=5)
+        assert voltages == {0: [0.5] * 5, 1: [1.5] * 5}
+        assert adc.adc.conversions == 10
+        assert created == [0, 1]
+    
+    def test_data_rate_and_continuous_mode(self, monkeypatch):
+        install_fake_adafruit(monkeypatch)
+        adc = RealADS1115(data_rate=860, continuous=True)
+        assert adc.adc.data_rate == 860
+        assert adc.adc.mode == "continuous"
+        
+        default = RealADS1115()
+        assert default.adc.data_rate == 128
+        assert default.adc.mode == "single"
+    
+    def test_continuous_burst_paced_at_data_rate(self, monkeypatch):
+        import hal
+        install_fake_adafruit(monkeypatch)
+        clock = [0.0]
+        sleeps = []
+        
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+        
+        monkeypatch.setattr(hal.time, "monotonic", lambda: clock[0])
+        monkeypatch.setattr(hal.time, "sleep", sleep)
+        
+        adc = RealADS1115(data_rate=860, continuous=True)
+        adc.read_voltages([0, 1], samples=5)
+        
+        # One wait between consecutive samples of a channel, none after a switch
+        assert sleeps == [pytest.approx(hal.CONVERSION_MARGIN / 860)] * 8
+        
+        sleeps.clear()
+        RealADS1115().read_voltages([0, 1], samples=5)
+        assert sleeps == []
+    
+    def test_invalid_data_rate(self):
+        with pytest.raises(ValueError):
+            MockADC(data_rate=100)
+        with pytest.raises(ValueError):
+            create_adc(mock=True, data_rate=1000)
+    
+    def test_sample_voltages(self):
+        class SingleShotADC:
+            def read_voltage(self, channel):
+                return float(channel)
+        
+        assert sample_voltages(SingleShotADC(), [1, 2], 3) == {1: [1.0] * 3, 2: [2.0] * 3}
+        assert sample_voltages(MockADC(), [0], 2) == {0: [2.5, 2.5]}
+
+
 class TestMockReliability:
     """Test mock hardware reliability and edge cases."""
     
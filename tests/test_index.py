@@ -0,0 +1,185 @@
+"""
+Test index.py - Timestamp index and DataLogger range queries
+"""
+
+import pytest
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from index import TimestampIndex, TimestampSet, bisect_readings, to_epoch_us, from_epoch_us
+from logger import DataLogger
+
+
+class TestEpochConversion:
+    """Test timestamp to epoch conversion."""
+    
+    def test_iso_formats_agree(self):
+        z = to_epoch_us("2024-01-15T10:30:00Z")
+        offset = to_epoch_us("2024-01-15T10:30:00+00:00")
+        local = to_epoch_us("2024-01-15T12:30:00+02:00")
+        assert z == offset == local
+    
+    def test_naive_datetime_is_utc(self):
+        naive = datetime(2024, 1, 15, 10, 30)
+        aware = naive.replace(tzinfo=timezone.utc)
+        assert to_epoch_us(naive) == to_epoch_us(aware)
+    
+    def test_round_trip(self):
+        dt = datetime(2024, 1, 15, 10, 30, 0, 123456, tzinfo=timezone.utc)
+        assert from_epoch_us(to_epoch_us(dt)) == dt
+    
+    def test_invalid_timestamp(self):
+        assert to_epoch_us("not-a-timestamp") is None
+
+
+class TestTimestampIndex:
+    """Test bisection over the timestamp column."""
+    
+    def setup_method(self):
+        self.start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.readings = [
+            {"timestamp": (self.start + timedelta(hours=i)).isoformat(), "ph": 7.0}
+            for i in range(48)
+        ]
+    
+    def test_range_bounds(self):
+        index = TimestampIndex(self.readings)
+        window = index.range(self.start + timedelta(hours=10), self.start + timedelta(hours=20))
+        assert len(window) == 10
+        assert window[0] is self.readings[10]
+        assert window[-1] is self.readings[19]
+    
+    def test_open_bounds(self):
+        index = TimestampIndex(self.readings)
+        assert len(index.range()) == 48
+        assert len(index.range(start=self.start + timedelta(hours=40))) == 8
+        assert len(index.range(end="2024-01-01T05:00:00Z")) == 5
+    
+    def test_unsorted_and_invalid_input(self):
+        shuffled = list(reversed(self.readings)) + [{"timestamp": "garbage"}]
+        index = TimestampIndex(shuffled)
+        assert len(index) == 48
+        assert index.range() == self.readings
+    
+    def test_invalid_bound(self):
+        with pytest.raises(ValueError):
+            TimestampIndex(self.readings).range("garbage")
+    
+    def test_bisect_sorted_readings(self):
+        assert bisect_readings(self.readings, self.start + timedelta(hours=10)) == 10
+        assert bisect_readings(self.readings, self.start + timedelta(minutes=30)) == 1
+        assert bisect_readings(self.readings, self.start - timedelta(days=1)) == 0
+        assert bisect_readings(self.readings, self.start + timedelta(days=3)) == 48
+
+
+class TestTimestampSet:
+    """Test the packed sorted set used for duplicate checks."""
+    
+    def test_membership(self):
+        epochs = TimestampSet([30, 10, 20])
+        
+        assert list(epochs.epochs) == [10, 20, 30]
+        assert 20 in epochs and 25 not in epochs
+        assert epochs.newest() == 30
+    
+    def test_add_keeps_sorted_and_unique(self):
+        epochs = TimestampSet([10, 30])
+        
+        for epoch_us in (40, 20, 20, 10):
+            epochs.add(epoch_us)
+        
+        assert list(epochs.epochs) == [10, 20, 30, 40]
+    
+    def test_from_readings_skips_bad_timestamps(self):
+        epochs = TimestampSet.from_readings([{"timestamp": "2024-01-15T10:30:00Z"},
+                                             {"timestamp": "garbage"}])
+        
+        assert len(epochs) == 1
+        assert to_epoch_us("2024-01-15T10:30:00+00:00") in epochs
+    
+    def test_packed_memory(self):
+        epochs = TimestampSet(range(100000))
+        
+        assert epochs.epochs.itemsize * len(epochs) == 800000
+
+
+class TestDataLoggerRange:
+    """Test indexed range queries on DataLogger."""
+    
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_file = Path(self.temp_dir) / "test_data.json"
+        self.logger = DataLogger(self.data_file, window_days=7)
+        now = datetime.now(timezone.utc)
+        self.logger.save_data([
+            {"timestamp": (now - timedelta(hours=h)).isoformat(), "ph": 7.0, "tds": 350.0, "temp_c": 22.0}
+            for h in range(0, 24 * 10, 6)
+        ])
+    
+    def teardown_method(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_range_matches_linear_scan(self):
+        now = datetime.now(timezone.utc)
+        start, end = now - timedelta(days=3), now - timedelta(days=1)
+        expected = [
+            r for r in self.logger.load_data()
+            if start <= datetime.fromisoformat(r["timestamp"]) < end
+        ]
+        assert self.logger.range(start, end) == expected
+    
+    def test_index_invalidated_on_append(self):
+        assert len(self.logger.range()) == 40
+        self.logger.append_reading({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "ph": 7.0, "tds": 350.0, "temp_c": 22.0
+        })
+        assert len(self.logger.range()) == 29  # 7-day retention applied
+    
+    def test_prune_parses_only_probed_timestamps(self, monkeypatch):
+        import index
+        data = self.logger.load_data()
+        calls = []
+        original = index.to_epoch_us
+        monkeypatch.setattr(index, "to_epoch_us", lambda value: calls.append(value) or original(value))
+        
+        assert len(self.logger.prune_data(data)) == 28
+        assert len(calls) <= 7
+    
+    def test_prune_reuses_current_index(self, monkeypatch):
+        import logger
+        data = self.logger.get_index().readings
+        
+        def fail(readings):
+            raise AssertionError("prune_data rebuilt the index")
+        
+        monkeypatch.setattr(logger, "TimestampIndex", fail)
+        monkeypatch.setattr(logger, "bisect_readings", fail)
+        assert len(self.logger.prune_data(list(data))) == 28
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                          "data.columnar", "data.sqlite"])
+    def test_index_sees_other_writers(self, filename):
+        data_file = Path(self.temp_dir) / filename
+        reader = DataLogger(data_file, window_days=0)
+        writer = DataLogger(data_file, window_days=0)
+        now = datetime.now(timezone.utc)
+        writer.append_reading({"timestamp": (now - timedelta(minutes=2)).isoformat(), "ph": 7.0})
+        
+        assert len(reader.range()) == 1
+        assert len(reader.get_recent_data(1)) == 1
+        
+        writer.append_reading({"timestamp": (now - timedelta(minutes=1)).isoformat(), "ph": 7.1})
+        assert len(reader.range()) == 2
+        assert len(reader.get_recent_data(1)) == 2
+        assert reader.range(now - timedelta(seconds=90))[0]["ph"] == 7.1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
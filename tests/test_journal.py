@@ -0,0 +1,248 @@
+"""
+Test journal.py - Write-ahead journal and compaction
+"""
+
+import pytest
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from logger import DataLogger
+from journal import JournaledStore
+
+
+def make_reading(hours_ago=0, ph=7.0):
+    """Create a test reading N hours ago."""
+    timestamp = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return {
+        "timestamp": timestamp.isoformat(),
+        "ph": ph,
+        "tds": 350.0,
+        "temp_c": 22.5
+    }
+
+
+@pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments", "data.sqlite"])
+class TestJournaledLogger:
+    """Test appends go to the journal and compaction folds them in."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_append_touches_only_journal(self, filename):
+        data_file = Path(self.temp_dir) / filename
+        DataLogger(data_file).save_data([make_reading(hours_ago=h) for h in (5, 4)])
+        main_size = DataLogger(data_file).store.size_bytes()
+        
+        data_logger = DataLogger(data_file, window_days=7, journal=True)
+        assert data_logger.append_reading(make_reading(hours_ago=1)) is True
+        
+        assert data_logger.store.main.size_bytes() == main_size
+        assert data_logger.store.journal_file.stat().st_size < 200
+        
+        # Readers merge the store and the journal
+        assert len(data_logger.load_data()) == 3
+        now = datetime.now(timezone.utc)
+        assert len(data_logger.range(now - timedelta(hours=2))) == 1
+        assert data_logger.get_data_stats()["total_readings"] == 3
+    
+    def test_compaction_folds_prunes_and_publishes(self, filename):
+        data_file = Path(self.temp_dir) / filename
+        DataLogger(data_file).save_data([make_reading(hours_ago=24 * 10), make_reading(hours_ago=5)])
+        
+        data_logger = DataLogger(data_file, window_days=7, journal=True)
+        data_logger.append_readings([make_reading(hours_ago=2), make_reading(hours_ago=1)])
+        
+        publish_file = Path(self.temp_dir) / "published.json"
+        assert data_logger.compact(publish_file) is True
+        
+        assert not data_logger.store.journal_file.exists()
+        assert len(DataLogger(data_file).load_data()) == 3
+        assert data_logger.get_data_stats()["total_readings"] == 3
+        with open(publish_file) as f:
+            assert len(json.load(f)) == 3
+
+
+def test_interrupted_compaction_does_not_duplicate():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        data_file = Path(temp_dir) / "data.jsonl"
+        data_logger = DataLogger(data_file, window_days=7, journal=True)
+        readings = [make_reading(hours_ago=2), make_reading(hours_ago=1)]
+        data_logger.append_readings(readings)
+        
+        # Simulate a crash after the fold but before the journal was removed
+        store = data_logger.store
+        store.journal_file.rename(store.compacting_file)
+        store.main.append_many(readings)
+        data_logger.append_reading(make_reading())
+        
+        assert len(data_logger.load_data()) == 3
+        assert store.compact() == 1
+        assert len(store.main.load()) == 3
+        assert not store.compacting_file.exists()
+    finally:
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_shared_timestamps_kept_without_dedup(tmp_path):
+    """Only readings a compaction already folded are skipped, not every repeated timestamp."""
+    data_logger = DataLogger(tmp_path / "data.jsonl", window_days=7, journal=True)
+    reading = make_reading(hours_ago=1)
+    data_logger.append_reading(reading)
+    data_logger.compact()
+    
+    data_logger.append_reading(dict(reading, ph=6.5))
+    assert [r["ph"] for r in data_logger.load_data()] == [7.0, 6.5]
+    
+    data_logger.compact()
+    assert sorted(r["ph"] for r in data_logger.store.main.load()) == [6.5, 7.0]
+
+
+def test_concurrent_compactions_lose_nothing(tmp_path):
+    """A second compactor waits for the first instead of taking over its file."""
+    store = DataLogger(tmp_path / "data.jsonl", journal=True).store
+    first, second = make_reading(hours_ago=2), make_reading(hours_ago=1)
+    store.append(first)
+    
+    folding = threading.Event()
+    append_many = store.main.append_many
+    
+    def slow_append_many(readings):
+        folding.set()
+        time.sleep(0.2)
+        return append_many(readings)
+    
+    store.main.append_many = slow_append_many
+    compactor = threading.Thread(target=store.compact)
+    compactor.start()
+    folding.wait(5)
+    
+    store.append(second)
+    JournaledStore(store.main).compact()
+    compactor.join()
+    
+    assert [r["timestamp"] for r in store.main.load()] == [first["timestamp"], second["timestamp"]]
+    assert not store.compacting_file.exists()
+
+
+def test_journal_lines_are_fsynced(monkeypatch):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        import journal
+        synced = []
+        monkeypatch.setattr(journal.os, "fsync", lambda fd: synced.append(fd))
+        
+        store = JournaledStore(DataLogger(Path(temp_dir) / "data.json").store)
+        store.append(make_reading())
+        
+        assert len(synced) == 1
+    finally:
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+
+class TestBufferedLogger:
+    """Test readings staged in a RAM directory reach the data file on flush."""
+    
+    def setup_method(self):
+        """Set up test with temporary data and buffer directories."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_file = Path(self.temp_dir) / "card" / "data.json"
+        self.buffer_dir = Path(self.temp_dir) / "shm"
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_staging_writes_nothing_to_data_file(self):
+        DataLogger(self.data_file).save_data([make_reading(hours_ago=5)])
+        before = sorted((p.name, p.stat().st_size) for p in self.data_file.parent.iterdir())
+        
+        data_logger = DataLogger(self.data_file, buffer_dir=self.buffer_dir)
+        for hours_ago in (3, 2, 1):
+            assert data_logger.append_reading(make_reading(hours_ago=hours_ago)) is True
+        
+        after = sorted((p.name, p.stat().st_size) for p in self.data_file.parent.iterdir())
+        assert after == before
+        assert data_logger.io_stats == {"readings_written": 0, "bytes_written": 0}
+        assert (self.buffer_dir / "data.json.journal").exists()
+        assert len(data_logger.load_data()) == 4
+        assert data_logger.latest()[0]["timestamp"] == data_logger.load_data()[-1]["timestamp"]
+    
+    def test_flush_folds_buffer(self):
+        data_logger = DataLogger(self.data_file, buffer_dir=self.buffer_dir)
+        data_logger.append_readings([make_reading(hours_ago=h) for h in (3, 2, 1)])
+        
+        assert data_logger.compact() is True
+        
+        assert len(DataLogger(self.data_file).load_data()) == 3
+        assert data_logger.store.journal_readings() == []
+        assert data_logger.io_stats["readings_written"] == 3
+        assert data_logger.bytes_per_reading() > 0
+    
+    def test_statistics_materialized_at_flush(self):
+        data_logger = DataLogger(self.data_file, buffer_dir=self.buffer_dir, materialize_stats=True)
+        data_logger.append_readings([make_reading(hours_ago=h) for h in (3, 2, 1)])
+        assert not list(self.data_file.parent.glob("*.stats-*"))
+        
+        assert data_logger.compact() is True
+        
+        hourly = data_logger.bucket_stats_range(resolution="1h")
+        assert sum(r["ph"]["count"] for r in hourly) == 3
+    
+    def test_flush_due(self):
+        data_logger = DataLogger(self.data_file, buffer_dir=self.buffer_dir)
+        assert data_logger.flush_due(timedelta(hours=1)) is False
+        
+        data_logger.append_reading(make_reading(hours_ago=2))
+        
+        assert data_logger.flush_due(timedelta(hours=1)) is True
+        assert data_logger.flush_due(timedelta(hours=3)) is False
+        assert DataLogger(self.data_file).flush_due(timedelta(0)) is False
+
+
+def test_buffered_flush_writes_less_than_rewrites():
+    """Per-reading rewrites of data.json cost far more bytes than one flush."""
+    temp_dir = Path(tempfile.mkdtemp())
+    try:
+        history = [make_reading(hours_ago=h / 2) for h in range(200, 20, -1)]
+        readings = [make_reading(hours_ago=h / 2) for h in range(20, 0, -1)]
+        
+        rewriting = DataLogger(temp_dir / "rewrite" / "data.json", window_days=30)
+        rewriting.save_data(history)
+        for reading in readings:
+            rewriting.append_reading(reading)
+        
+        buffered = DataLogger(temp_dir / "buffered" / "data.json", window_days=30,
+                              buffer_dir=temp_dir / "shm")
+        buffered.save_data(history)
+        for reading in readings:
+            buffered.append_reading(reading)
+        buffered.compact()
+        
+        assert rewriting.io_stats["readings_written"] == buffered.io_stats["readings_written"] == 20
+        assert buffered.bytes_per_reading() * 10 < rewriting.bytes_per_reading()
+    finally:
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -287,6 +287,25 @@ class TestUtilityFunctions:
         results = validate_data_integrity(self.data_file)
         assert results["valid"] is False
         assert len(results["errors"]) > 0
+    
+    def test_validate_reports_non_dict_elements(self):
+        with open(self.data_file, 'w') as f:
+            json.dump([1, self.create_test_reading(0)], f)
+        
+        results = validate_data_integrity(self.data_file)
+        assert results["valid"] is False
+        assert results["errors"] == ["Reading 0: Not a dictionary"]
+        assert results["total_readings"] == 2
+        assert results["valid_readings"] == 1
+    
+    def test_validate_reports_truncated_array(self):
+        save_data_to_file([self.create_test_reading(i) for i in range(3)], self.data_file)
+        content = self.data_file.read_text()
+        self.data_file.write_text(content[:len(content) // 2])
+        
+        results = validate_data_integrity(self.data_file)
+        assert results["valid"] is False
+        assert results["errors"][-1].startswith("Failed to load data")
 
 
 class TestDataIntegrity:
@@ -341,5 +360,113 @@ class TestDataIntegrity:
         assert timestamps == sorted(timestamps)
 
 
+class TestStorageQuota:
+    """Test max_bytes is enforced on append, compressing segments before dropping."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.now = datetime.now(timezone.utc)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def readings(self, hours):
+        """Create half-hourly readings covering the last N hours."""
+        return [
+            {"timestamp": (self.now - timedelta(hours=h / 2)).isoformat(),
+             "ph": 7.0, "tds": 350.0, "temp_c": 22.0}
+            for h in range(hours * 2, 0, -1)
+        ]
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.sqlite"])
+    def test_oldest_dropped_to_fit_budget(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=30, max_bytes=40000)
+        readings = self.readings(300)
+        
+        assert data_logger.append_readings(readings[:-20]) is True
+        for reading in readings[-20:]:
+            assert data_logger.append_reading(reading) is True
+        
+        stored = data_logger.load_data()
+        assert data_logger.store.size_bytes() <= 40000
+        assert 0 < len(stored) < len(readings)
+        assert stored[-1]["timestamp"] == readings[-1]["timestamp"]
+        assert data_logger.get_data_stats()["total_readings"] == len(stored)
+        
+        # Only segment stores have a compression step; the rest drop straight away
+        assert not hasattr(data_logger.store, "compress_before")
+        assert not [p for p in Path(self.temp_dir).iterdir() if p.suffix in (".gz", ".xz")]
+    
+    def test_segments_compressed_before_dropping(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.segments", window_days=30,
+                                 segment_granularity="hour")
+        data_logger.append_readings(self.readings(48))
+        size = data_logger.store.size_bytes()
+        
+        data_logger.max_bytes = size - 1
+        data_logger.append_reading(dict(self.readings(1)[-1], timestamp=self.now.isoformat()))
+        
+        assert any(p.suffix == ".gz" for p in data_logger.store.segments())
+        assert len(data_logger.load_data()) == 97
+    
+    def test_segments_dropped_whole(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.segments", window_days=30,
+                                 segment_granularity="hour", max_bytes=6000)
+        
+        for reading in self.readings(48):
+            data_logger.append_reading(reading)
+        
+        assert data_logger.store.size_bytes() <= 6000
+        first = data_logger.store.segment_span(data_logger.store.segments()[0])[0]
+        expected = [r for r in self.readings(48) if r["timestamp"] >= first.isoformat()]
+        assert data_logger.load_data() == expected
+    
+    def test_dropped_readings_demoted(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", window_days=30,
+                                 rollup_days=60, max_bytes=5000)
+        
+        data_logger.append_readings(self.readings(48))
+        
+        kept = len(data_logger.load_data())
+        demoted = sum(r["ph"]["count"] for r in data_logger.rollups("5m"))
+        assert kept + demoted == 96
+    
+    def test_size_accounted_incrementally(self, monkeypatch):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", max_bytes=10 ** 6)
+        data_logger.append_readings(self.readings(2))
+        
+        measured = []
+        size_bytes = data_logger.store.size_bytes
+        monkeypatch.setattr(data_logger.store, "size_bytes",
+                            lambda: measured.append(1) or size_bytes())
+        for reading in self.readings(1):
+            data_logger.append_reading(dict(reading, timestamp=self.now.isoformat()))
+        
+        # The sidecar this logger wrote is trusted, so nothing measures the store
+        assert measured == []
+        assert data_logger.get_data_stats()["file_size_bytes"] == size_bytes()
+    
+    def test_sidecar_from_other_writer_is_checked(self):
+        path = Path(self.temp_dir) / "data.jsonl"
+        data_logger = DataLogger(path)
+        data_logger.append_readings(self.readings(2))
+        
+        DataLogger(path).append_reading(dict(self.readings(1)[-1], timestamp=self.now.isoformat()))
+        
+        assert data_logger.get_data_stats()["total_readings"] == 5
+        assert data_logger.get_data_stats()["file_size_bytes"] == data_logger.store.size_bytes()
+    
+    def test_quota_cutoff_is_bucket_aligned(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", window_days=30,
+                                 rollup_days=60, max_bytes=5000)
+        data_logger.append_readings(self.readings(48))
+        
+        cutoff = data_logger._quota_cutoff(data_logger.store, data_logger.store.size_bytes() * 4)
+        assert cutoff.second == 0 and cutoff.microsecond == 0 and cutoff.minute % 5 == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
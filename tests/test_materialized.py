@@ -0,0 +1,144 @@
+"""
+Test materialized.py - Running hourly/daily statistics
+"""
+
+import json
+import pytest
+import statistics
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from logger import DataLogger
+from materialized import MaterializedRollup, DAILY
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_reading(when, ph=7.0, tds=350.0):
+    """Create a test reading at a given time."""
+    return {"timestamp": when.isoformat(), "ph": ph, "tds": tds, "temp_c": None}
+
+
+class TestMaterializedRollup:
+    """Test the open bucket is updated in place and sealed ones never rewritten."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.rollup = MaterializedRollup(Path(self.temp_dir) / "stats.jsonl", DAILY)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def lines(self):
+        return self.rollup.path.read_text().splitlines()
+    
+    def test_open_bucket_rewritten_in_place(self):
+        values = [6.8, 7.0, 7.2, 6.9]
+        for i, value in enumerate(values):
+            self.rollup.add([make_reading(START + timedelta(hours=i), ph=value)])
+        
+        assert len(self.lines()) == 1
+        stats = self.rollup.get(START + timedelta(hours=12))
+        assert stats["ph"]["count"] == 4
+        assert stats["ph"]["mean"] == pytest.approx(statistics.mean(values))
+        assert stats["ph"]["std"] == pytest.approx(statistics.pstdev(values))
+        assert (stats["ph"]["min"], stats["ph"]["max"]) == (6.8, 7.2)
+        assert stats["temp_c"] is None
+    
+    def test_sealed_bucket_never_rewritten(self):
+        self.rollup.add([make_reading(START, ph=7.0)])
+        self.rollup.add([make_reading(START + timedelta(days=1), ph=6.0)])
+        sealed = self.lines()[0]
+        
+        # A late reading for the sealed day is appended as a delta record
+        self.rollup.add([make_reading(START + timedelta(hours=5), ph=8.0),
+                         make_reading(START + timedelta(days=1, hours=1), ph=6.2)])
+        
+        lines = self.lines()
+        assert lines[0] == sealed
+        assert len(lines) == 3
+        assert json.loads(lines[-1])["timestamp"] == (START + timedelta(days=1)).isoformat()
+        assert self.rollup.get(START)["ph"]["mean"] == pytest.approx(7.5)
+        assert self.rollup.get(START + timedelta(days=1))["ph"]["count"] == 2
+    
+    def test_torn_open_bucket_overwritten(self):
+        self.rollup.add([make_reading(START)])
+        with open(self.rollup.path, 'a') as f:
+            f.write('{"timestamp": "2024-01-0')
+        
+        self.rollup.add([make_reading(START + timedelta(days=2))])
+        
+        assert len(self.lines()) == 2
+        assert [r["timestamp"] for r in self.rollup.load_range()] == [
+            START.isoformat(), (START + timedelta(days=2)).isoformat()
+        ]
+
+
+class TestLoggerMaterializedStats:
+    """Test DataLogger keeps the statistics in step with appends."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.now = datetime.now(timezone.utc)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.sqlite"])
+    def test_appends_update_hour_and_day(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, materialize_stats=True)
+        readings = [make_reading(self.now - timedelta(minutes=m), ph=6.5 + m / 100)
+                    for m in (30, 20, 10)]
+        for reading in readings:
+            data_logger.append_reading(reading)
+        
+        daily = data_logger.bucket_stats(self.now, "1d")
+        expected = [r["ph"] for r in readings if r["timestamp"][:10] == self.now.isoformat()[:10]]
+        assert daily["ph"]["count"] == len(expected)
+        assert daily["ph"]["mean"] == pytest.approx(statistics.mean(expected))
+        assert data_logger.bucket_stats(self.now - timedelta(days=3)) is None
+        assert len(data_logger.bucket_stats_range(resolution="1h")) in (1, 2)
+    
+    def test_existing_data_seeds_statistics_once(self):
+        data_file = Path(self.temp_dir) / "data.jsonl"
+        DataLogger(data_file).append_readings(
+            [make_reading(self.now - timedelta(hours=h)) for h in (3, 2)])
+        
+        data_logger = DataLogger(data_file, materialize_stats=True)
+        data_logger.append_reading(make_reading(self.now))
+        
+        total = sum(r["ph"]["count"] for r in data_logger.bucket_stats_range(resolution="1h"))
+        assert total == 3
+    
+    def test_statistics_outlive_retention(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", window_days=7,
+                                 materialize_stats=True)
+        old = self.now - timedelta(days=10)
+        data_logger.append_reading(make_reading(old, ph=6.6))
+        data_logger.append_reading(make_reading(self.now))
+        
+        assert data_logger.range(end=self.now - timedelta(days=7)) == []
+        assert data_logger.bucket_stats(old)["ph"]["mean"] == 6.6
+    
+    def test_disabled_by_default(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl")
+        data_logger.append_reading(make_reading(self.now))
+        
+        assert data_logger.bucket_stats(self.now) is None
+        assert not list(Path(self.temp_dir).glob("*.stats-*"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
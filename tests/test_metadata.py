@@ -0,0 +1,141 @@
+"""
+Test metadata.py - Metadata sidecar maintained by DataLogger
+"""
+
+import pytest
+import json
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from logger import DataLogger
+from metadata import DataMetadata, read_metadata
+
+
+def make_reading(hours_ago=0, ph=7.0):
+    """Create a test reading N hours ago."""
+    timestamp = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return {
+        "timestamp": timestamp.isoformat(),
+        "ph": ph,
+        "tds": 350.0,
+        "temp_c": 22.5
+    }
+
+
+class TestDataMetadata:
+    """Test metadata accounting."""
+    
+    def test_from_readings(self):
+        readings = [make_reading(hours_ago=2), make_reading(hours_ago=1, ph=None)]
+        meta = DataMetadata.from_readings(readings)
+        
+        assert meta.count == 2
+        assert meta.first_timestamp == readings[0]["timestamp"]
+        assert meta.last_timestamp == readings[1]["timestamp"]
+        assert meta.null_counts == {"ph": 1, "tds": 0, "temp_c": 0}
+    
+    def test_round_trip(self):
+        meta = DataMetadata.from_readings([make_reading(ph=None)])
+        meta.size_bytes = 123
+        restored = DataMetadata.from_dict(meta.to_dict())
+        assert restored.to_dict() == meta.to_dict()
+
+
+@pytest.mark.parametrize("filename", ["test_data.json", "test_data.jsonl", "test_data.segments", "test_data.columnar"])
+class TestMetadataSidecar:
+    """Test the sidecar stays in step with the data for every backend."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_stats_follow_appends(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=7)
+        for h in (5, 4, 3):
+            data_logger.append_reading(make_reading(hours_ago=h))
+        data_logger.append_reading(make_reading(hours_ago=1, ph=None))
+        
+        stats = data_logger.get_data_stats()
+        assert stats["total_readings"] == 4
+        assert stats["null_counts"]["ph"] == 1
+        assert stats["file_size_bytes"] == data_logger.store.size_bytes()
+        
+        meta = read_metadata(data_logger.meta_file)
+        assert meta is not None
+        assert meta.count == 4
+    
+    def test_stats_do_not_load_data(self, filename, monkeypatch):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=7)
+        data_logger.save_data([make_reading(hours_ago=h) for h in range(48)])
+        
+        def fail():
+            raise AssertionError("get_data_stats loaded the data")
+        
+        monkeypatch.setattr(data_logger, "load_data", fail)
+        stats = data_logger.get_data_stats()
+        assert stats["total_readings"] == 48
+        assert stats["days_covered"] == 1
+    
+    def test_stale_sidecar_is_rebuilt(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=7)
+        data_logger.save_data([make_reading(hours_ago=h) for h in range(3)])
+        
+        # Missing sidecar
+        data_logger.meta_file.unlink()
+        assert data_logger.get_data_stats()["total_readings"] == 3
+        
+        # Sidecar that no longer matches the data size
+        with open(data_logger.meta_file) as f:
+            record = json.load(f)
+        record["count"] = 99
+        record["size_bytes"] += 1
+        with open(data_logger.meta_file, 'w') as f:
+            json.dump(record, f)
+        assert data_logger.get_data_stats()["total_readings"] == 3
+
+
+@pytest.mark.parametrize("filename,tail_rows", [("data.json", 6), ("data.jsonl", 0),
+                                                ("data.segments", 0), ("data.columnar", 0)])
+def test_sidecar_tail_only_for_json_array(filename, tail_rows, tmp_path):
+    """Line formats read latest() from the file, so their sidecar stays small."""
+    data_logger = DataLogger(tmp_path / filename, window_days=7)
+    data_logger.save_data([make_reading(hours_ago=h) for h in range(5, 0, -1)])
+    data_logger.append_reading(make_reading())
+    
+    text = data_logger.meta_file.read_text()
+    assert "\n" not in text
+    assert len(json.loads(text)["tail"]) == tail_rows
+    assert data_logger.latest()[0]["timestamp"] == data_logger.load_data()[-1]["timestamp"]
+
+
+def test_segment_retention_updates_metadata():
+    """Dropping expired segments adjusts the count without a rebuild."""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        data_logger = DataLogger(Path(temp_dir) / "data.segments", window_days=7)
+        data_logger.save_data([make_reading(hours_ago=24 * d, ph=None) for d in (12, 11)]
+                              + [make_reading(hours_ago=h) for h in (3, 2)])
+        
+        data_logger.append_reading(make_reading())
+        
+        stats = data_logger.get_data_stats()
+        assert stats["total_readings"] == 3
+        assert stats["null_counts"]["ph"] == 0
+        assert stats["oldest_reading"] == data_logger.load_data()[0]["timestamp"]
+    finally:
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
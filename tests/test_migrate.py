@@ -0,0 +1,133 @@
+"""
+Test migrate.py - Streaming migration between storage formats
+"""
+
+import json
+import pytest
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from logger import DataLogger
+from metadata import metadata_path, read_metadata
+from migrate import migrate, staging_path, store_digest
+from storage import create_store
+
+
+def make_readings(count):
+    """Create half-hourly readings ending now."""
+    now = datetime.now(timezone.utc)
+    return [
+        {"timestamp": (now - timedelta(minutes=30 * i)).isoformat(),
+         "ph": 6.5 + (i % 9) / 10, "tds": 340.25, "temp_c": None if i % 4 == 0 else 21.5}
+        for i in range(count, 0, -1)
+    ]
+
+
+class TestMigrate:
+    """Test readings are copied, verified and switched into place."""
+    
+    def setup_method(self):
+        """Set up test with a legacy data.json."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.src = self.temp_dir / "data.json"
+        self.readings = make_readings(250)
+        with open(self.src, 'w') as f:
+            json.dump(self.readings, f, indent=2)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize("dest_format", ["jsonl", "segments", "sqlite", "columnar"])
+    def test_migrates_every_reading(self, dest_format):
+        dest = self.temp_dir / f"data.{dest_format}"
+        
+        assert migrate(self.src, dest, "json", dest_format, batch_size=64) is True
+        
+        assert not staging_path(dest).exists()
+        migrated = DataLogger(dest, window_days=0)
+        assert store_digest(migrated.iter_readings()) == store_digest(self.readings)
+        assert migrated.get_data_stats()["total_readings"] == 250
+        assert migrated.latest()[0]["ph"] == pytest.approx(self.readings[-1]["ph"])
+    
+    def test_sidecar_matches_store(self):
+        dest = self.temp_dir / "data.jsonl"
+        
+        migrate(self.src, dest)
+        
+        meta = read_metadata(metadata_path(dest))
+        assert meta.count == 250
+        assert meta.size_bytes == dest.stat().st_size
+    
+    def test_resumes_interrupted_migration(self):
+        dest = self.temp_dir / "data.sqlite"
+        staging = create_store(staging_path(dest), "sqlite")
+        staging.append_many(self.readings[:100])
+        
+        assert migrate(self.src, dest, batch_size=64) is True
+        
+        assert store_digest(create_store(dest).iter_range()) == store_digest(self.readings)
+    
+    def test_resume_keeps_readings_sharing_a_timestamp(self):
+        # Two probes logged at each time; the interruption split a pair
+        paired = sorted(self.readings + [dict(r, ph=7.5) for r in self.readings],
+                        key=lambda r: r["timestamp"])
+        with open(self.src, 'w') as f:
+            json.dump(paired, f, indent=2)
+        dest = self.temp_dir / "data.sqlite"
+        create_store(staging_path(dest), "sqlite").append_many(paired[:101])
+        
+        assert migrate(self.src, dest, batch_size=64) is True
+        
+        assert store_digest(create_store(dest).iter_range()) == store_digest(paired)
+    
+    def test_out_of_order_source_appends_columns(self, monkeypatch):
+        from columnar import ColumnarStore
+        src = self.temp_dir / "data.jsonl"
+        late = self.readings[:-1]
+        create_store(src, "jsonl").append_many(late[:-10] + [self.readings[-1]] + late[-10:])
+        monkeypatch.setattr(ColumnarStore, "load", lambda store: pytest.fail("full load used"))
+        dest = self.temp_dir / "data.columnar"
+        
+        assert migrate(src, dest, batch_size=64) is True
+        
+        assert store_digest(create_store(dest).iter_range()) == store_digest(self.readings)
+    
+    def test_verification_failure_keeps_source(self):
+        dest = self.temp_dir / "data.jsonl"
+        staging = create_store(staging_path(dest), "jsonl")
+        staging.append_many([dict(r, ph=0.0) for r in self.readings[:10]])
+        
+        assert migrate(self.src, dest) is False
+        
+        assert not dest.exists()
+        assert migrate(self.src, dest, restart=True) is True
+    
+    def test_existing_destination_refused(self):
+        dest = self.temp_dir / "data.jsonl"
+        dest.write_text("")
+        
+        assert migrate(self.src, dest) is False
+    
+    def test_catch_up_copies_new_readings(self):
+        dest = self.temp_dir / "data.columnar"
+        migrate(self.src, dest)
+        newer = {"timestamp": datetime.now(timezone.utc).isoformat(),
+                 "ph": 7.1, "tds": 345.0, "temp_c": 22.0}
+        DataLogger(self.src, window_days=0).append_reading(newer)
+        
+        assert migrate(self.src, dest, catch_up=True) is True
+        
+        assert len(create_store(dest).load()) == 251
+        assert migrate(self.src, dest, catch_up=True) is True
+        assert len(create_store(dest).load()) == 251
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
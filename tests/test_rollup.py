@@ -0,0 +1,167 @@
+"""
+Test rollup.py - Tiered retention with downsampled aggregates
+"""
+
+import pytest
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from logger import DataLogger
+from rollup import aggregate, TieredRetention, FIVE_MINUTES, HOURLY
+
+
+def make_reading(when, ph=7.0):
+    """Create a test reading at a given time."""
+    return {"timestamp": when.isoformat(), "ph": ph, "tds": 350.0, "temp_c": None}
+
+
+class TestAggregate:
+    """Test bucketing of readings and rollup records."""
+    
+    def test_five_minute_buckets(self):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        readings = [make_reading(start + timedelta(minutes=m), ph=6.0 + m) for m in range(10)]
+        
+        rollups = aggregate(readings, FIVE_MINUTES)
+        
+        assert [r["timestamp"] for r in rollups] == [
+            "2024-01-01T00:00:00+00:00", "2024-01-01T00:05:00+00:00"
+        ]
+        assert rollups[0]["ph"] == {"mean": 8.0, "min": 6.0, "max": 10.0, "count": 5}
+        assert rollups[1]["tds"]["count"] == 5
+        assert rollups[0]["temp_c"] is None
+    
+    def test_rollups_combine_weighted(self):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        readings = ([make_reading(start, ph=6.0)] * 3
+                    + [make_reading(start + timedelta(minutes=30), ph=8.0)])
+        
+        hourly = aggregate(aggregate(readings, FIVE_MINUTES), HOURLY)
+        
+        assert len(hourly) == 1
+        assert hourly[0]["ph"] == {"mean": 6.5, "min": 6.0, "max": 8.0, "count": 4}
+
+
+class TestTieredRetention:
+    """Test readings are demoted instead of discarded."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.now = datetime.now(timezone.utc)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments", "data.sqlite"])
+    def test_prune_demotes_to_five_minute_tier(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=7, rollup_days=30)
+        old = [make_reading(self.now - timedelta(days=10, minutes=m)) for m in range(12, 0, -1)]
+        data_logger.save_data(old + [make_reading(self.now - timedelta(hours=1))])
+        
+        data_logger.append_reading(make_reading(self.now))
+        
+        assert len(data_logger.load_data()) == 2
+        rollups = data_logger.rollups("5m")
+        assert sum(r["ph"]["count"] for r in rollups) == 12
+        
+        # Demoting again (e.g. after a crash) never double counts
+        data_logger.prune_data(old)
+        assert sum(r["ph"]["count"] for r in data_logger.rollups("5m")) == 12
+    
+    def test_five_minute_tier_ages_into_hourly(self):
+        tiers = TieredRetention(Path(self.temp_dir) / "data.json", rollup_days=30, hourly_days=365)
+        readings = [make_reading(self.now - timedelta(days=40, minutes=m)) for m in range(0, 120, 5)]
+        readings += [make_reading(self.now - timedelta(days=400))]
+        
+        tiers.demote(readings, now=self.now)
+        
+        assert tiers.load_range("5m") == []
+        hourly = tiers.load_range("1h")
+        assert 2 <= len(hourly) <= 3
+        assert sum(r["ph"]["count"] for r in hourly) == 24
+    
+    def test_bucket_demoted_across_batches(self):
+        tiers = TieredRetention(Path(self.temp_dir) / "data.json", rollup_days=30, hourly_days=365)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        readings = [make_reading(start + timedelta(minutes=m), ph=6.0 + m) for m in range(7)]
+        
+        # The quota can cut the history mid-bucket, splitting 00:00-00:05
+        five_minute = tiers.tiers["5m"]
+        five_minute.add(readings[:2])
+        five_minute.add(readings[2:])
+        five_minute.add(readings)
+        
+        assert tiers.load_range("5m") == aggregate(readings, FIVE_MINUTES)
+        assert "through" not in tiers.load_range("5m")[-1]
+    
+    def test_cutoff_is_bucket_aligned(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.json", window_days=7, rollup_days=30)
+        cutoff = data_logger._retention_cutoff()
+        assert cutoff.second == 0 and cutoff.microsecond == 0 and cutoff.minute % 5 == 0
+
+
+
+class TestAggregateQuery:
+    """Test DataLogger.aggregate bucketed queries."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.readings = [make_reading(self.start + timedelta(minutes=m), ph=6.0 + (m % 3))
+                         for m in range(0, 180, 10)]
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                          "data.columnar", "data.sqlite"])
+    def test_hourly_buckets_match_aggregate(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=0)
+        data_logger.save_data(list(self.readings))
+        
+        result = data_logger.aggregate(self.start, self.start + timedelta(hours=2), bucket="1h")
+        
+        assert result == aggregate(self.readings[:12], HOURLY)
+        assert result[0]["temp_c"] is None
+    
+    def test_funcs_and_metrics_selected(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", window_days=0)
+        data_logger.save_data(list(self.readings))
+        
+        result = data_logger.aggregate(bucket="1d", metrics=["ph"], funcs=["min", "count"])
+        
+        assert result == [{"timestamp": "2024-01-01T00:00:00+00:00",
+                           "ph": {"min": 6.0, "count": 18}}]
+    
+    def test_unknown_arguments_rejected(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl")
+        for kwargs in ({"bucket": "1w"}, {"metrics": ["orp"]}, {"funcs": ["stddev"]}):
+            with pytest.raises(ValueError):
+                data_logger.aggregate(**kwargs)
+    
+    def test_aged_out_history_served_from_tiers(self):
+        now = datetime.now(timezone.utc)
+        data_logger = DataLogger(Path(self.temp_dir) / "data.sqlite", window_days=7, rollup_days=30)
+        old = [make_reading(now - timedelta(days=10, minutes=m)) for m in range(12, 0, -1)]
+        data_logger.save_data(old + [make_reading(now - timedelta(hours=1))])
+        data_logger.append_reading(make_reading(now))
+        
+        result = data_logger.aggregate(now - timedelta(days=20), bucket="1d")
+        
+        assert sum(r["ph"]["count"] for r in result) == 14
+        assert data_logger.aggregate(now - timedelta(days=20), bucket="5m", funcs=["count"])[0]["ph"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
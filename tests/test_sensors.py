@@ -0,0 +1,181 @@
+"""
+Test the high-level AquaponicsSensors interface
+"""
+
+import time
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+import pytest
+
+from sensors import AquaponicsSensors
+
+
+class SlowTemp:
+    """Temperature sensor taking a DS18B20-like conversion time."""
+    
+    def __init__(self, delay: float, temp_c=22.5):
+        self.delay = delay
+        self.temp_c = temp_c
+    
+    def read_celsius(self):
+        time.sleep(self.delay)
+        return self.temp_c
+
+
+class SlowADC:
+    """ADC taking a fixed time per sample."""
+    
+    def __init__(self, delay: float, voltages=None):
+        self.delay = delay
+        self.voltages = voltages or {0: 2.5, 1: 1.8}
+    
+    def read_voltage(self, channel: int) -> float:
+        time.sleep(self.delay)
+        return self.voltages[channel]
+
+
+class TestReadAllOverlap:
+    """Test that the temperature conversion overlaps the ADC reads."""
+    
+    def test_cycle_close_to_slowest_stage(self):
+        sensors = AquaponicsSensors(mock=True)
+        sensors.temp_sensor = SlowTemp(0.3)
+        sensors.adc = SlowADC(0.15)
+        
+        start = time.perf_counter()
+        reading = sensors.read_all()
+        elapsed = time.perf_counter() - start
+        
+        # Sequential reads would take 0.3 + 2 * 0.15 = 0.6 s
+        assert elapsed < 0.5
+        assert reading['temp_c'] == 22.5
+        assert reading['ph'] is not None
+        assert reading['tds'] is not None
+    
+    def test_tds_compensated_with_concurrent_temperature(self):
+        sensors = AquaponicsSensors(mock=True)
+        expected = sensors.read_tds(temp_c=10.0)
+        
+        sensors.temp_sensor = SlowTemp(0.05, temp_c=10.0)
+        assert sensors.read_all()['tds'] == expected
+    
+    def test_tds_defaults_to_25c_without_temperature(self):
+        sensors = AquaponicsSensors(mock=True)
+        expected = sensors.read_tds(temp_c=25.0)
+        
+        sensors.temp_sensor = SlowTemp(0.0, temp_c=None)
+        reading = sensors.read_all()
+        assert reading['temp_c'] is None
+        assert reading['tds'] == expected
+    
+    def test_timings_reported_outside_reading(self):
+        sensors = AquaponicsSensors(mock=True)
+        sensors.temp_sensor = SlowTemp(0.1)
+        reading = sensors.read_all()
+        
+        assert set(reading) == {'timestamp', 'ph', 'tds', 'temp_c'}
+        assert set(sensors.last_timings) == {'temperature', 'ph', 'tds', 'temperature_wait', 'total'}
+        assert sensors.last_timings['temperature'] >= 0.1
+        assert sensors.last_timings['total'] >= sensors.last_timings['temperature']
+        assert 'temperature' in sensors.format_timings()
+    
+    def test_adc_failure_isolated(self):
+        class FailingADC:
+            def read_voltage(self, channel):
+                raise OSError("I2C bus error")
+        
+        sensors = AquaponicsSensors(mock=True)
+        sensors.adc = FailingADC()
+        reading = sensors.read_all()
+        
+        assert reading['ph'] is None
+        assert reading['tds'] is None
+        assert reading['temp_c'] == 22.5
+
+
+class NoisyADC:
+    """ADC returning a queue of samples per channel."""
+    
+    def __init__(self, samples):
+        self.samples = {channel: list(values) for channel, values in samples.items()}
+        self.bursts = []
+    
+    def read_voltage(self, channel: int) -> float:
+        return self.samples[channel].pop(0)
+    
+    def read_voltages(self, channels, samples=1):
+        self.bursts.append((list(channels), samples))
+        return {channel: [self.read_voltage(channel) for _ in range(samples)] for channel in channels}
+
+
+class TestOversampling:
+    """Test oversampled pH and TDS reads."""
+    
+    def test_single_sample_by_default(self):
+        sensors = AquaponicsSensors(mock=True)
+        sensors.adc = NoisyADC({0: [2.5], 1: [1.8]})
+        reading = sensors.read_all()
+        
+        assert reading['ph'] is not None
+        assert sensors.adc.bursts == []
+        assert sensors.last_noise == {}
+    
+    def test_median_rejects_spike(self):
+        clean = AquaponicsSensors(mock=True)
+        sensors = AquaponicsSensors(mock=True, oversample=9)
+        sensors.adc = NoisyADC({0: [2.5] * 8 + [4.9], 1: [0.2] + [1.8] * 8})
+        reading = sensors.read_all()
+        
+        assert reading['ph'] == clean.read_ph()
+        assert reading['tds'] == clean.read_tds(22.5)
+        assert sensors.adc.bursts == [([0], 9), ([1], 9)]
+        assert sensors.last_noise['ph'] == {"voltage": 2.5, "spread": 0.0, "samples": 9, "rejected": 0}
+        assert 'ph ±0.0 mV over 9 samples' in sensors.format_noise()
+    
+    def test_hampel_reports_rejected(self):
+        sensors = AquaponicsSensors(mock=True, oversample=10, oversample_filter="hampel")
+        sensors.adc = NoisyADC({0: [2.50, 2.51, 2.49, 2.50, 2.52, 2.48, 2.50, 2.51, 2.50, 0.0]})
+        assert sensors.read_ph() is not None
+        assert sensors.last_noise['ph']['rejected'] == 1
+        assert sensors.last_noise['ph']['spread'] > 0
+    
+    def test_falls_back_to_single_reads(self):
+        class SingleShotADC:
+            def __init__(self):
+                self.reads = 0
+            
+            def read_voltage(self, channel):
+                self.reads += 1
+                return 2.5
+        
+        sensors = AquaponicsSensors(mock=True, oversample=4, oversample_filter="trimmed-mean")
+        sensors.adc = SingleShotADC()
+        assert sensors.read_ph() is not None
+        assert sensors.adc.reads == 4
+    
+    def test_diagnostics_report_oversampling(self):
+        sensors = AquaponicsSensors(mock=True, oversample=4)
+        results = sensors.test_sensors()
+        assert results['oversampling'] == {"samples": 4, "filter": "median"}
+        assert results['sensors']['ph']['noise']['samples'] == 4
+    
+    def test_diagnostics_take_one_burst_per_channel(self):
+        sensors = AquaponicsSensors(mock=True, oversample=4)
+        sensors.adc = NoisyADC({0: [2.50, 2.52, 2.48, 2.50], 1: [1.80, 1.82, 1.78, 1.80]})
+        results = sensors.test_sensors()
+        
+        assert sensors.adc.bursts == [([0], 4), ([1], 4)]
+        ph = results['sensors']['ph']
+        assert ph['status'] == "ok"
+        assert ph['value'] == sensors.convert_ph(ph['voltage'])
+        assert results['sensors']['tds']['status'] == "ok"
+    
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            AquaponicsSensors(mock=True, oversample=0)
+        with pytest.raises(ValueError):
+            AquaponicsSensors(mock=True, oversample_filter="mode")
@@ -0,0 +1,157 @@
+"""
+Test sqlite_store.py - SQLite backend and SqliteDataLogger
+"""
+
+import pytest
+import json
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from logger import DataLogger, SqliteDataLogger
+from sqlite_store import SqliteStore
+from storage import create_store
+
+
+def make_reading(hours_ago=0, ph=7.0):
+    """Create a test reading N hours ago."""
+    timestamp = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return {
+        "timestamp": timestamp.isoformat(),
+        "ph": ph,
+        "tds": 350.0,
+        "temp_c": 22.5
+    }
+
+
+class TestSqliteDataLogger:
+    """Test the SQLite-backed logger."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = Path(self.temp_dir) / "data.sqlite"
+        self.logger = SqliteDataLogger(self.db_file, window_days=7)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_factory_and_wal_mode(self):
+        assert isinstance(create_store(self.db_file), SqliteStore)
+        self.logger.append_reading(make_reading())
+        
+        with closing(sqlite3.connect(str(self.db_file))) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    
+    def test_append_and_range(self):
+        for h in (5, 3, 4, 1):
+            assert self.logger.append_reading(make_reading(hours_ago=h)) is True
+        
+        data = self.logger.load_data()
+        assert len(data) == 4
+        assert data == sorted(data, key=lambda r: r["timestamp"])
+        assert len(self.logger.get_recent_data(1)) == 4
+        
+        now = datetime.now(timezone.utc)
+        window = self.logger.range(now - timedelta(hours=4, minutes=30), now - timedelta(hours=2))
+        assert len(window) == 2
+    
+    def test_delete_pruning(self):
+        self.logger.save_data([make_reading(hours_ago=24 * 10, ph=None), make_reading(hours_ago=2)])
+        self.logger.append_reading(make_reading())
+        
+        assert len(self.logger.load_data()) == 2
+        stats = self.logger.get_data_stats()
+        assert stats["total_readings"] == 2
+        assert stats["null_counts"]["ph"] == 0
+        assert not self.logger.meta_file.exists()
+    
+    def test_concurrent_reader_sees_appends(self):
+        self.logger.append_reading(make_reading(hours_ago=2))
+        reader = DataLogger(self.db_file)
+        assert len(reader.load_data()) == 1
+        
+        self.logger.append_reading(make_reading(hours_ago=1))
+        assert len(reader.load_data()) == 2
+    
+    def test_import_json(self):
+        json_file = Path(self.temp_dir) / "data.json"
+        readings = [make_reading(hours_ago=h) for h in (24 * 10, 3, 2, 1)]
+        with open(json_file, 'w') as f:
+            json.dump(readings, f)
+        
+        assert self.logger.import_json(json_file) == 3
+        assert self.logger.load_data() == readings[1:]
+        
+        # Re-running imports nothing new
+        assert self.logger.import_json(json_file) == 0
+        assert self.logger.get_data_stats()["total_readings"] == 3
+
+
+
+class TestSqliteStats:
+    """Test the trigger-maintained count and null counts."""
+    
+    def setup_method(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = Path(self.temp_dir) / "data.sqlite"
+    
+    def teardown_method(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def scanned(self):
+        with closing(sqlite3.connect(str(self.db_file))) as conn:
+            row = conn.execute("SELECT COUNT(*), SUM(ph IS NULL), SUM(tds IS NULL), "
+                               "SUM(temp_c IS NULL) FROM readings").fetchone()
+        return row[0], {"ph": row[1] or 0, "tds": row[2] or 0, "temp_c": row[3] or 0}
+    
+    def test_stats_follow_every_write(self):
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        
+        def at(hour, ph):
+            return {"timestamp": (base + timedelta(hours=hour)).isoformat(),
+                    "ph": ph, "tds": 350.0, "temp_c": 22.5}
+        
+        store = SqliteStore(self.db_file)
+        store.save([at(h, None if h % 2 else 7.0) for h in range(5)])
+        store.append_many([at(5, None), at(6, None)])
+        assert store.replace_many([at(6, 6.5)]) == 1
+        store.drop_before(base + timedelta(hours=2))
+        
+        meta = store.metadata()
+        assert (meta.count, meta.null_counts) == self.scanned()
+        assert meta.count == 5
+        assert meta.null_counts["ph"] == 2
+        
+        store.save([])
+        assert store.metadata().count == 0
+    
+    def test_existing_database_seeded(self):
+        with closing(sqlite3.connect(str(self.db_file))) as conn, conn:
+            conn.execute("CREATE TABLE readings (epoch_us INTEGER NOT NULL, timestamp TEXT NOT NULL, "
+                         "ph REAL, tds REAL, temp_c REAL)")
+            conn.executemany("INSERT INTO readings VALUES (?, ?, ?, ?, ?)",
+                             [(i, f"2024-01-01T00:00:0{i}+00:00", None if i else 7.0, 350.0, 22.0)
+                              for i in range(3)])
+        
+        store = SqliteStore(self.db_file)
+        meta = store.metadata()
+        assert meta.count == 3
+        assert meta.null_counts["ph"] == 2
+        
+        store.append(make_reading())
+        assert SqliteStore(self.db_file).metadata().count == 4
+        assert (store.metadata().count, store.metadata().null_counts) == self.scanned()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,699 @@
+"""
+Test storage.py - Storage backends behind DataLogger
+"""
+
+import pytest
+import json
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from storage import JsonArrayStore, JsonLinesStore, SegmentStore, create_store
+from logger import DataLogger, GroupCommitLogger, export_data_file, validate_data_integrity
+
+
+def make_reading(hours_ago=0, ph=7.0):
+    """Create a test reading N hours ago."""
+    timestamp = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return {
+        "timestamp": timestamp.isoformat(),
+        "ph": ph,
+        "tds": 350.0,
+        "temp_c": 22.5
+    }
+
+
+class TestCreateStore:
+    """Test storage backend selection."""
+    
+    def test_infer_from_suffix(self):
+        assert isinstance(create_store(Path("data.json")), JsonArrayStore)
+        assert isinstance(create_store(Path("data.jsonl")), JsonLinesStore)
+    
+    def test_infer_segments(self, tmp_path):
+        assert isinstance(create_store(tmp_path), SegmentStore)
+        assert isinstance(create_store(Path("data.segments")), SegmentStore)
+    
+    def test_explicit_format(self):
+        assert isinstance(create_store(Path("data.json"), "jsonl"), JsonLinesStore)
+    
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            create_store(Path("data.json"), "csv")
+
+
+class TestJsonLinesLogger:
+    """Test DataLogger with the append-only JSON Lines backend."""
+    
+    def setup_method(self):
+        """Set up test with temporary file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_file = Path(self.temp_dir) / "test_data.jsonl"
+        self.logger = DataLogger(self.data_file, window_days=7)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_append_writes_one_line(self):
+        """Each append adds exactly one line to the file."""
+        for i in range(3):
+            assert self.logger.append_reading(make_reading(hours_ago=3 - i)) is True
+        
+        lines = self.data_file.read_text().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[-1])["ph"] == 7.0
+        
+        data = self.logger.load_data()
+        assert len(data) == 3
+        assert data[0]["timestamp"] <= data[-1]["timestamp"]
+    
+    def test_torn_line_is_skipped(self):
+        """A partially written last line does not lose the other readings."""
+        self.logger.append_reading(make_reading(hours_ago=1))
+        with open(self.data_file, 'a') as f:
+            f.write('{"timestamp": "2024-')
+        
+        assert len(self.logger.load_data()) == 1
+    
+    def test_prune_on_append_when_head_expires(self):
+        """Old readings are rewritten out once they pass the slack window."""
+        self.logger.save_data([make_reading(hours_ago=24 * 10), make_reading(hours_ago=2)])
+        
+        self.logger.append_reading(make_reading(hours_ago=0))
+        
+        data = self.logger.load_data()
+        assert len(data) == 2
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+        for entry in data:
+            assert datetime.fromisoformat(entry["timestamp"]) >= cutoff
+    
+    def test_recent_data_and_stats(self):
+        self.logger.save_data([make_reading(hours_ago=h) for h in (100, 50, 10, 1)])
+        
+        assert len(self.logger.get_recent_data(1)) == 2
+        stats = self.logger.get_data_stats()
+        assert stats["total_readings"] == 4
+        assert stats["file_size_bytes"] == self.data_file.stat().st_size
+    
+    def test_export_to_json_array(self):
+        """Exported file matches the dashboard's JSON array format."""
+        readings = [make_reading(hours_ago=h, ph=6.5 + h / 10) for h in (3, 2, 1)]
+        for reading in readings:
+            self.logger.append_reading(reading)
+        
+        dest = Path(self.temp_dir) / "data.json"
+        assert export_data_file(self.data_file, dest) is True
+        
+        with open(dest) as f:
+            exported = json.load(f)
+        assert exported == readings
+        assert JsonArrayStore(dest).load() == readings
+
+
+
+class TestSegmentStore:
+    """Test DataLogger with time-partitioned segment files."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_dir = Path(self.temp_dir) / "data.segments"
+        self.logger = DataLogger(self.data_dir, window_days=7)
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_readings_go_to_daily_segments(self):
+        readings = [
+            {"timestamp": "2024-01-15T23:30:00+00:00", "ph": 7.0, "tds": 350.0, "temp_c": 22.0},
+            {"timestamp": "2024-01-16T00:30:00+00:00", "ph": 7.1, "tds": 351.0, "temp_c": 22.1},
+            {"timestamp": "2024-01-16T01:00:00Z", "ph": 7.2, "tds": 352.0, "temp_c": 22.2},
+        ]
+        store = SegmentStore(self.data_dir)
+        for reading in readings:
+            store.append(reading)
+        
+        assert [s.name for s in store.segments()] == ["2024-01-15.jsonl", "2024-01-16.jsonl"]
+        assert store.load() == readings
+    
+    def test_hourly_granularity(self):
+        store = SegmentStore(self.data_dir, granularity="hour")
+        store.append({"timestamp": "2024-01-15T23:30:00+00:00", "ph": 7.0})
+        assert [s.name for s in store.segments()] == ["2024-01-15T23.jsonl"]
+    
+    def test_range_reads_only_overlapping_segments(self, monkeypatch):
+        self.logger.save_data([make_reading(hours_ago=24 * d) for d in range(5)])
+        
+        opened = []
+        original = JsonLinesStore.load
+        
+        def spy(store):
+            opened.append(store.path.name)
+            return original(store)
+        
+        monkeypatch.setattr(JsonLinesStore, "load", spy)
+        recent = self.logger.get_recent_data(1)
+        
+        assert 1 <= len(recent) <= 2
+        assert len(opened) <= 2
+    
+    def test_retention_unlinks_expired_segments(self):
+        self.logger.save_data([make_reading(hours_ago=24 * d) for d in (12, 10, 2, 1)])
+        assert len(SegmentStore(self.data_dir).segments()) == 4
+        
+        assert self.logger.append_reading(make_reading()) is True
+        
+        segments = SegmentStore(self.data_dir).segments()
+        assert len(segments) in (2, 3)
+        assert all(r["timestamp"] >= (datetime.now(timezone.utc) - timedelta(days=8)).isoformat()
+                   for r in self.logger.load_data())
+    
+    def test_save_removes_emptied_segments(self):
+        self.logger.save_data([make_reading(hours_ago=24 * d) for d in (3, 2, 1)])
+        self.logger.save_data([make_reading(hours_ago=1)])
+        
+        assert len(SegmentStore(self.data_dir).segments()) == 1
+        assert self.logger.get_data_stats()["total_readings"] == 1
+
+
+
+class TestParseCache:
+    """Test the mtime/size-validated parse cache."""
+    
+    def setup_method(self):
+        """Set up test with temporary file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_file = Path(self.temp_dir) / "test_data.json"
+        DataLogger(self.data_file).save_data([make_reading(hours_ago=h) for h in range(5)])
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def count_parses(self, monkeypatch):
+        calls = []
+        original = JsonArrayStore._parse
+        
+        def spy(store):
+            calls.append(store.path)
+            return original(store)
+        
+        monkeypatch.setattr(JsonArrayStore, "_parse", spy)
+        return calls
+    
+    def test_reading_cycle_parses_once(self, monkeypatch):
+        """append + stats + validation in one process parse the file at most once."""
+        from storage import invalidate_parse_cache
+        invalidate_parse_cache()
+        calls = self.count_parses(monkeypatch)
+        
+        data_logger = DataLogger(self.data_file, window_days=7)
+        assert data_logger.append_reading(make_reading()) is True
+        assert data_logger.get_data_stats()["total_readings"] == 6
+        assert validate_data_integrity(self.data_file)["valid_readings"] == 6
+        
+        assert len(calls) == 1
+    
+    def test_external_rewrite_is_detected(self, monkeypatch):
+        data_logger = DataLogger(self.data_file)
+        assert len(data_logger.load_data()) == 5
+        
+        # Rewrite the file behind the logger's back
+        with open(self.data_file, 'w') as f:
+            json.dump([make_reading()], f)
+        
+        calls = self.count_parses(monkeypatch)
+        assert len(data_logger.load_data()) == 1
+        assert len(calls) == 1
+    
+    def test_jsonl_append_extends_cache(self, monkeypatch):
+        jsonl_file = Path(self.temp_dir) / "test_data.jsonl"
+        data_logger = DataLogger(jsonl_file, window_days=7)
+        data_logger.save_data([make_reading(hours_ago=2)])
+        
+        calls = []
+        monkeypatch.setattr(JsonLinesStore, "iter_file", lambda store: calls.append(1) or iter(()))
+        data_logger.append_reading(make_reading(hours_ago=1))
+        
+        assert len(data_logger.load_data()) == 2
+        assert calls == []
+    
+    def test_jsonl_append_detects_concurrent_writer(self, monkeypatch):
+        import storage
+        jsonl_file = Path(self.temp_dir) / "test_data.jsonl"
+        data_logger = DataLogger(jsonl_file, window_days=7)
+        data_logger.save_data([make_reading(hours_ago=3)])
+        assert len(data_logger.load_data()) == 1
+        
+        # Another process appends after the cache was checked, before our write
+        original = storage.invalidate_parse_cache
+        
+        def invalidate(path=None):
+            original(path)
+            with open(jsonl_file, 'a') as f:
+                f.write(json.dumps(make_reading(hours_ago=2)) + "\n")
+        
+        monkeypatch.setattr(storage, "invalidate_parse_cache", invalidate)
+        data_logger.store.append_many([make_reading(hours_ago=1)])
+        monkeypatch.setattr(storage, "invalidate_parse_cache", original)
+        
+        assert len(data_logger.load_data()) == 3
+    
+    def test_cache_bounded(self):
+        from storage import _PARSE_CACHE, PARSE_CACHE_SIZE, invalidate_parse_cache
+        invalidate_parse_cache()
+        for i in range(PARSE_CACHE_SIZE + 3):
+            DataLogger(Path(self.temp_dir) / f"data_{i}.jsonl").save_data([make_reading()])
+        
+        assert len(_PARSE_CACHE) == PARSE_CACHE_SIZE
+        assert any(key.endswith(f"data_{PARSE_CACHE_SIZE + 2}.jsonl") for key in _PARSE_CACHE)
+
+
+@pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                      "data.columnar", "data.sqlite"])
+class TestAppendReadings:
+    """Test batch appends cost a single store write."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_batch_is_one_write(self, filename, monkeypatch):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=7)
+        store_type = type(data_logger.store)
+        writes = []
+        for method in ("save", "append_many"):
+            original = getattr(store_type, method)
+            monkeypatch.setattr(store_type, method,
+                                lambda store, data, original=original: writes.append(1) or original(store, data))
+        
+        readings = [make_reading(hours_ago=h / 60) for h in range(1000, 0, -1)]
+        assert data_logger.append_readings(readings) is True
+        
+        assert len(writes) == 1
+        assert data_logger.get_data_stats()["total_readings"] == 1000
+        assert data_logger.load_data()[-1]["timestamp"] == readings[-1]["timestamp"]
+    
+    def test_invalid_batch_writes_nothing(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=7)
+        assert data_logger.append_readings([make_reading(), {"ph": 7.0}]) is False
+        assert data_logger.load_data() == []
+
+
+class TestGroupCommitLogger:
+    """Test buffered appends flush on size and time thresholds."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", window_days=7)
+        self.now = 0.0
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_flush_on_size(self):
+        buffered = GroupCommitLogger(self.data_logger, max_rows=3, clock=lambda: self.now)
+        buffered.append_reading(make_reading(hours_ago=3))
+        buffered.append_reading(make_reading(hours_ago=2))
+        assert buffered.pending == 2
+        assert self.data_logger.load_data() == []
+        
+        buffered.append_reading(make_reading(hours_ago=1))
+        assert buffered.pending == 0
+        assert len(self.data_logger.load_data()) == 3
+    
+    def test_flush_on_time(self):
+        buffered = GroupCommitLogger(self.data_logger, max_delay=30.0, clock=lambda: self.now)
+        buffered.append_reading(make_reading(hours_ago=2))
+        self.now = 31.0
+        buffered.append_reading(make_reading(hours_ago=1))
+        assert buffered.pending == 0
+        assert len(self.data_logger.load_data()) == 2
+    
+    def test_context_manager_flushes(self):
+        with GroupCommitLogger(self.data_logger) as buffered:
+            buffered.append_readings(make_reading(hours_ago=h) for h in range(5))
+            assert buffered.pending == 5
+        assert len(self.data_logger.load_data()) == 5
+
+
+class TestIterReadings:
+    """Test streaming reads in bounded memory."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.readings = [make_reading(hours_ago=h) for h in range(48, 0, -1)]
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                          "data.columnar", "data.sqlite"])
+    def test_matches_range(self, filename):
+        from storage import invalidate_parse_cache
+        data_logger = DataLogger(Path(self.temp_dir) / filename)
+        data_logger.save_data(list(self.readings))
+        invalidate_parse_cache()
+        
+        now = datetime.now(timezone.utc)
+        since, until = now - timedelta(hours=30), now - timedelta(hours=10)
+        streamed = list(data_logger.iter_readings(since, until))
+        assert streamed == data_logger.range(since, until)
+        
+        projected = next(data_logger.iter_readings(fields=["ph"]))
+        assert set(projected) == {"timestamp", "ph"}
+    
+    def test_json_array_decoded_incrementally(self, monkeypatch):
+        from storage import iter_json_array
+        data_file = Path(self.temp_dir) / "data.json"
+        with open(data_file, 'w') as f:
+            json.dump(self.readings + [[1, 2], 12345.678, "x"], f, indent=2)
+        
+        # A tiny chunk size splits every element and number across reads
+        elements = list(iter_json_array(data_file, chunk_size=7))
+        assert elements == self.readings + [[1, 2], 12345.678, "x"]
+        
+        monkeypatch.setattr(json, "load", lambda f: pytest.fail("json.load used"))
+        assert len(list(DataLogger(data_file).iter_readings())) == 48
+    
+    def test_json_array_format_errors(self, capsys):
+        from storage import iter_json_array, StorageFormatError
+        data_file = Path(self.temp_dir) / "data.json"
+        
+        data_file.write_text('{"not": "a list"}')
+        with pytest.raises(StorageFormatError):
+            list(iter_json_array(data_file))
+        
+        data_file.write_text('[{"timestamp": "2024-01-01T00:00:00Z"}, {"ph"')
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_array(data_file))
+        
+        # Readings before a truncation are yielded, then the error reported
+        assert len(list(DataLogger(data_file).iter_readings())) == 1
+        assert "Error loading data" in capsys.readouterr().out
+    
+    def test_streamed_export_matches_json_dump(self):
+        data_file = Path(self.temp_dir) / "data.jsonl"
+        DataLogger(data_file).save_data(list(self.readings))
+        dest = Path(self.temp_dir) / "export.json"
+        
+        assert export_data_file(data_file, dest) is True
+        assert dest.read_text() == json.dumps(self.readings, indent=2)
+        
+        # Out-of-order appends fall back to a sorted export
+        DataLogger(data_file).append_reading(make_reading(hours_ago=100))
+        assert export_data_file(data_file, dest) is True
+        with open(dest) as f:
+            exported = json.load(f)
+        assert [r["timestamp"] for r in exported] == sorted(r["timestamp"] for r in exported)
+        
+        empty = DataLogger(Path(self.temp_dir) / "empty.jsonl")
+        assert empty.export_json(dest) is True
+        assert dest.read_text() == "[]"
+
+
+@pytest.mark.parametrize("method", ["gzip", "lzma"])
+class TestColdCompression:
+    """Test cold segments are compressed and read transparently."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_dir = Path(self.temp_dir) / "data.segments"
+        self.readings = [make_reading(hours_ago=h) for h in range(24 * 10, 0, -6)]
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_readers_decompress_transparently(self, method):
+        data_logger = DataLogger(self.data_dir, window_days=30)
+        data_logger.save_data(list(self.readings))
+        plain_size = data_logger.store.size_bytes()
+        
+        cutoff = datetime.now(timezone.utc) - timedelta(days=3)
+        assert data_logger.store.compress_before(cutoff, method) >= 6
+        
+        suffix = ".gz" if method == "gzip" else ".xz"
+        cold = [p for p in data_logger.store.segments() if p.suffix == suffix]
+        hot = [p for p in data_logger.store.segments() if p.suffix == ".jsonl"]
+        assert cold and hot
+        assert data_logger.store.size_bytes() < plain_size
+        
+        assert data_logger.load_data() == self.readings
+        assert len(data_logger.get_recent_data(5)) == 19
+        assert validate_data_integrity(self.data_dir)["valid_readings"] == 40
+    
+    def test_late_reading_merges_into_compressed_segment(self, method):
+        store = SegmentStore(self.data_dir)
+        store.save(list(self.readings))
+        cutoff = datetime.now(timezone.utc) - timedelta(days=3)
+        store.compress_before(cutoff, method)
+        
+        late = make_reading(hours_ago=24 * 9 + 1)
+        store.append(late)
+        assert len(store.load()) == 41
+        
+        store.compress_before(cutoff, method)
+        assert len(store.load()) == 41
+        assert all(p.suffix != ".jsonl" or p.name >= late["timestamp"][:10] for p in store.segments())
+    
+    def test_logger_compresses_cold_segments_on_append(self, method):
+        data_logger = DataLogger(self.data_dir, window_days=30,
+                                 compress_after_days=3, compression=method)
+        data_logger.save_data(list(self.readings))
+        
+        data_logger.append_reading(make_reading())
+        
+        assert any(p.suffix in (".gz", ".xz") for p in data_logger.store.segments())
+        stats = data_logger.get_data_stats()
+        assert stats["total_readings"] == 41
+        assert stats["file_size_bytes"] == data_logger.store.size_bytes()
+
+
+
+class TestDedupAppends:
+    """Test appends with a dedup policy are idempotent."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.readings = [make_reading(hours_ago=h) for h in range(10, 0, -1)]
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                          "data.columnar", "data.sqlite"])
+    def test_replay_is_idempotent(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, dedup="keep-first")
+        data_logger.append_readings(self.readings)
+        
+        assert data_logger.append_readings(self.readings[3:6]) is True
+        assert data_logger.append_reading(self.readings[-1]) is True
+        
+        assert len(data_logger.load_data()) == 10
+        assert data_logger.get_data_stats()["total_readings"] == 10
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                          "data.columnar", "data.sqlite"])
+    def test_keep_last_overwrites(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, dedup="keep-last")
+        data_logger.append_readings(self.readings)
+        
+        retry = dict(self.readings[4], ph=6.5)
+        assert data_logger.append_readings([retry, make_reading(hours_ago=0)]) is True
+        
+        stored = data_logger.load_data()
+        assert len(stored) == 11
+        assert stored[4]["ph"] == 6.5
+    
+    @pytest.mark.parametrize("filename", ["data.jsonl", "data.sqlite"])
+    def test_merge_fills_nulls(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, dedup="merge")
+        data_logger.append_readings([dict(r, temp_c=None) for r in self.readings])
+        
+        data_logger.append_reading(dict(self.readings[2], ph=None, temp_c=21.0))
+        
+        stored = data_logger.load_data()[2]
+        assert (stored["ph"], stored["temp_c"]) == (7.0, 21.0)
+        assert data_logger.get_data_stats()["null_counts"]["temp_c"] == 9
+    
+    def test_duplicates_within_batch(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", dedup="keep-last")
+        reading = make_reading()
+        
+        data_logger.append_readings([reading, dict(reading, ph=6.0), dict(reading, ph=6.2)])
+        
+        assert [r["ph"] for r in data_logger.load_data()] == [6.2]
+    
+    def test_equal_instants_are_duplicates(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", window_days=0,
+                                 dedup="keep-first")
+        data_logger.append_reading({"timestamp": "2024-01-15T10:30:00+00:00", "ph": 7.0})
+        
+        data_logger.append_reading({"timestamp": "2024-01-15T12:30:00+02:00", "ph": 6.0})
+        
+        assert len(data_logger.load_data()) == 1
+    
+    def test_newer_readings_skip_the_index(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", dedup="keep-first")
+        for reading in self.readings:
+            data_logger.append_reading(reading)
+        
+        assert data_logger._stored is None
+    
+    @pytest.mark.parametrize("filename", ["data.jsonl", "data.segments", "data.sqlite"])
+    def test_sees_other_writers(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, dedup="keep-first")
+        data_logger.append_readings(self.readings[:-1])
+        data_logger.append_reading(self.readings[2])
+        assert data_logger._stored is not None
+        
+        DataLogger(Path(self.temp_dir) / filename).append_reading(self.readings[-1])
+        data_logger.append_reading(self.readings[-1])
+        
+        assert len(data_logger.load_data()) == 10
+    
+    def test_late_reading_does_not_hide_duplicates(self):
+        path = Path(self.temp_dir) / "data.jsonl"
+        day = datetime(2024, 1, 15, tzinfo=timezone.utc)
+        
+        def at(hour):
+            return {"timestamp": day.replace(hour=hour).isoformat(), "ph": 7.0}
+        
+        data_logger = DataLogger(path, window_days=0, dedup="keep-first")
+        data_logger.append_readings([at(10), at(11)])
+        data_logger.append_reading(at(9))
+        
+        # sensor_logger builds a fresh DataLogger every cycle
+        DataLogger(path, window_days=0, dedup="keep-first").append_reading(at(11))
+        
+        assert [r["timestamp"] for r in DataLogger(path).load_data()].count(at(11)["timestamp"]) == 1
+    
+    def test_retention_trims_the_index(self):
+        old = [make_reading(hours_ago=24 * d) for d in (12, 11)]
+        data_logger = DataLogger(Path(self.temp_dir) / "data.segments", window_days=7,
+                                 dedup="keep-first")
+        data_logger.save_data(old + self.readings)
+        
+        # Builds the timestamp set, then retention drops the old readings
+        data_logger.append_readings([self.readings[0], make_reading()])
+        
+        assert len(data_logger._stored) == len(data_logger.load_data()) == 11
+    
+    def test_default_appends_duplicates(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl")
+        data_logger.append_readings(self.readings + self.readings[:2])
+        
+        assert len(data_logger.load_data()) == 12
+    
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            DataLogger(Path(self.temp_dir) / "data.jsonl", dedup="newest")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+
+class TestLatest:
+    """Test latest-reading queries read only the end of the store."""
+    
+    def setup_method(self):
+        """Set up test with temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.readings = [make_reading(hours_ago=h, ph=6.0 + h / 100) for h in range(48, 0, -1)]
+    
+    def teardown_method(self):
+        """Clean up temporary files."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                          "data.columnar", "data.sqlite"])
+    def test_latest_without_full_load(self, filename, monkeypatch):
+        from storage import invalidate_parse_cache
+        data_logger = DataLogger(Path(self.temp_dir) / filename)
+        data_logger.append_readings(self.readings)
+        invalidate_parse_cache()
+        
+        monkeypatch.setattr(type(data_logger.store), "load",
+                            lambda store: pytest.fail("full load used"))
+        
+        latest = data_logger.latest(5)
+        assert [r["timestamp"] for r in latest] == [r["timestamp"] for r in self.readings[-5:]]
+        assert data_logger.latest()[0]["ph"] == self.readings[-1]["ph"]
+    
+    @pytest.mark.parametrize("filename", ["data.jsonl", "data.segments"])
+    def test_line_formats_read_backwards_without_sidecar(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename)
+        data_logger.append_readings(self.readings)
+        data_logger.meta_file.unlink()
+        
+        assert data_logger.latest(30) == self.readings[-30:]
+    
+    @pytest.mark.parametrize("filename", ["data.json", "data.jsonl", "data.segments",
+                                          "data.columnar", "data.sqlite"])
+    def test_late_append_does_not_displace_newest(self, filename):
+        data_logger = DataLogger(Path(self.temp_dir) / filename, window_days=7)
+        data_logger.append_readings(self.readings[-10:])
+        data_logger.append_readings(self.readings[-20:-10])
+        data_logger.meta_file.unlink(missing_ok=True)
+        
+        assert data_logger.latest() == [self.readings[-1]]
+        assert data_logger.latest(12) == self.readings[-12:]
+    
+    def test_json_array_beyond_sidecar_tail(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.json")
+        data_logger.append_readings(self.readings)
+        
+        assert data_logger.latest(40) == self.readings[-40:]
+        assert DataLogger(Path(self.temp_dir) / "empty.json").latest() == []
+    
+    def test_sidecar_tail_follows_retention(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.jsonl", window_days=1)
+        data_logger.append_readings([make_reading(hours_ago=h) for h in (50, 49)])
+        data_logger.append_reading(self.readings[-1])
+        
+        assert data_logger.latest(3) == [self.readings[-1]]
+    
+    def test_journal_readings_included(self):
+        data_logger = DataLogger(Path(self.temp_dir) / "data.json", journal=True)
+        data_logger.save_data(self.readings[:-2])
+        data_logger.append_readings(self.readings[-2:])
+        data_logger.meta_file.unlink()
+        
+        assert data_logger.latest(3) == self.readings[-3:]
+    
+    def test_read_last_lines(self):
+        from storage import read_last_lines
+        path = Path(self.temp_dir) / "lines.txt"
+        path.write_text("first\n\nsecond\nthird\n{\"torn\":")
+        
+        assert read_last_lines(path, 2, block_size=4) == ["third", "{\"torn\":"]
+        assert read_last_lines(path, 10, block_size=4) == ["first", "second", "third", "{\"torn\":"]
+        assert read_last_lines(path, 0) == []
@@ -0,0 +1,114 @@
+"""
+Test timeseries.py - Columnar in-memory readings
+"""
+
+import math
+import pytest
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+import sys
+
+# Add pi module to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "pi"))
+
+from index import to_epoch_us
+from logger import DataLogger
+from timeseries import TimeSeries
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_reading(minutes, ph=7.0, tds=350.0, temp_c=None):
+    """Create a test reading a number of minutes after START."""
+    return {"timestamp": (START + timedelta(minutes=minutes)).isoformat(),
+            "ph": ph, "tds": tds, "temp_c": temp_c}
+
+
+class TestTimeSeries:
+    """Test conversion, ordering and slicing."""
+    
+    def test_round_trip(self):
+        readings = [make_reading(m, ph=6.5 + m / 10) for m in range(5)]
+        
+        series = TimeSeries.from_readings(readings)
+        
+        assert len(series) == 5
+        assert series.to_readings() == readings
+    
+    def test_null_stored_as_nan(self):
+        series = TimeSeries.from_readings([make_reading(0, temp_c=None)])
+        
+        assert math.isnan(series.columns["temp_c"][0])
+        assert series.reading(0)["temp_c"] is None
+        assert list(series.values("temp_c")) == []
+    
+    def test_unordered_input_sorted(self):
+        readings = [make_reading(m) for m in (3, 1, 2, 0)]
+        
+        series = TimeSeries.from_readings(readings)
+        
+        assert list(series.epochs) == sorted(series.epochs)
+        assert series.first_epoch() == to_epoch_us(START)
+    
+    def test_invalid_timestamp_skipped(self):
+        readings = [make_reading(0), {"timestamp": "garbage", "ph": 7.0}]
+        
+        assert len(TimeSeries.from_readings(readings)) == 1
+    
+    def test_insert_keeps_order(self):
+        series = TimeSeries.from_readings([make_reading(0), make_reading(10)])
+        
+        series.insert(make_reading(20, ph=7.2))
+        series.insert(make_reading(5, ph=6.8))
+        
+        assert [r["ph"] for r in series] == [7.0, 6.8, 7.0, 7.2]
+    
+    def test_slice_is_half_open(self):
+        series = TimeSeries.from_readings([make_reading(m) for m in range(10)])
+        
+        window = series.slice(START + timedelta(minutes=2), START + timedelta(minutes=5))
+        
+        assert len(window) == 3
+        assert window.reading(0)["timestamp"] == make_reading(2)["timestamp"]
+        assert window.epochs is series.epochs
+    
+    def test_slice_of_slice(self):
+        series = TimeSeries.from_readings([make_reading(m, ph=float(m)) for m in range(10)])
+        
+        window = series.slice(START + timedelta(minutes=2)).slice(end=START + timedelta(minutes=4))
+        
+        assert list(window.values("ph")) == [2.0, 3.0]
+    
+    def test_slice_is_read_only(self):
+        series = TimeSeries.from_readings([make_reading(0)])
+        
+        with pytest.raises(ValueError):
+            series.slice().insert(make_reading(1))
+    
+    def test_compact_memory(self):
+        series = TimeSeries.from_readings([make_reading(m) for m in range(100)])
+        
+        assert series.nbytes() == 100 * 32
+
+
+class TestLoadSeries:
+    """Test DataLogger.load_series."""
+    
+    @pytest.mark.parametrize("storage_format", ["json", "jsonl", "sqlite"])
+    def test_load_series_window(self, storage_format):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_logger = DataLogger(Path(tmpdir) / "data.json",
+                                     storage_format=storage_format, window_days=36500)
+            now = datetime.now(timezone.utc)
+            data_logger.append_readings([
+                {"timestamp": (now - timedelta(hours=h)).isoformat(), "ph": 7.0,
+                 "tds": 350.0, "temp_c": 22.0}
+                for h in range(10, 0, -1)
+            ])
+            
+            series = data_logger.load_series(now - timedelta(hours=5, minutes=30))
+            
+            assert len(series) == 5
+            assert list(series.values("temp_c")) == [22.0] * 5